@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from cbng_reviewer.models import EditGroup, Edit, ClientError
+from cbng_reviewer.models import EditGroup, Edit, ClientError, CLASSIFICATIONS
 
 
 class EditGroupSerializer(serializers.ModelSerializer):
@@ -28,3 +28,10 @@ class ClientErrorSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClientError
         fields = ["message", "source", "lineno", "colno", "stack", "page_url"]
+
+
+class BulkClassificationSerializer(serializers.Serializer):
+    edit_id = serializers.IntegerField()
+    username = serializers.CharField(max_length=150)
+    classification = serializers.ChoiceField(choices=CLASSIFICATIONS)
+    comment = serializers.CharField(required=False, allow_null=True, allow_blank=True)
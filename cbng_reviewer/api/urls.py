@@ -10,6 +10,10 @@ urlpatterns = [
     path("v1/", include(v1_router.urls)),
     path("v1/internal/client-error/", views.store_client_error),
     path("v1/reviewer/next-edit/", views.get_next_edit_id_for_review),
+    path("v1/reviewer/next-edits/", views.get_next_edit_ids_for_review),
     path("v1/reviewer/classify-edit/", views.store_edit_classification),
+    path("v1/reviewer/classify-edit-and-next/", views.store_edit_classification_and_get_next_edit_id),
+    path("v1/reviewer/bulk-classify/", views.store_bulk_classifications),
     path("v1/edit/<int:edit_id>/dump-wpedit/", views.dump_edit_as_wp_edit),
+    path("v1/edit/<int:edit_id>/diff/", views.render_edit_diff),
 ]
@@ -1,17 +1,22 @@
-import random
 from typing import Optional
 
-from django.db.models import Q, Subquery
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
 from django.http import StreamingHttpResponse, Http404, HttpResponse
 from rest_framework import viewsets
 from rest_framework.decorators import action, api_view
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
-from cbng_reviewer.api.serializers import EditGroupSerializer, ClientErrorSerializer
-from cbng_reviewer.libs.django import reviewer_required
+from cbng_reviewer.api.serializers import EditGroupSerializer, ClientErrorSerializer, BulkClassificationSerializer
+from cbng_reviewer.libs.bulk_classifications import BulkClassifications
+from cbng_reviewer.libs.django import reviewer_required, admin_required
+from cbng_reviewer.libs.edit_cache import EditCache
 from cbng_reviewer.libs.edit_set.dumper import EditSetDumper
-from cbng_reviewer.models import EditGroup, Edit, Classification, CLASSIFICATION_IDS
+from cbng_reviewer.libs.models.classification import PendingClassification
+from cbng_reviewer.libs.review_queue import ReviewQueue
+from cbng_reviewer.models import EditGroup, Edit, Classification, User, CLASSIFICATION_IDS
 
 
 class EditGroupViewSet(viewsets.ModelViewSet):
@@ -97,9 +102,7 @@ class EditGroupViewSet(viewsets.ModelViewSet):
         return StreamingHttpResponse(_xml_generator(), content_type="text/xml")
 
 
-@reviewer_required()
-@api_view(["POST"])
-def store_edit_classification(request):
+def _store_edit_classification(request) -> HttpResponse:
     edit = get_object_or_404(Edit, id=request.data.get("edit_id"))
     if Classification.objects.filter(edit=edit, user=request.user).exists():
         return Response({"message": "Review already stored"})
@@ -123,41 +126,81 @@ def store_edit_classification(request):
         classification=user_classification,
         comment=comment,
     )
+    ReviewQueue().release_edit_ids(request.user, [edit.id])
     return Response({"message": "Review stored"})
 
 
+@reviewer_required()
+@api_view(["POST"])
+def store_edit_classification(request):
+    return _store_edit_classification(request)
+
+
+@reviewer_required()
+@api_view(["POST"])
+def store_edit_classification_and_get_next_edit_id(request):
+    with transaction.atomic():
+        response = _store_edit_classification(request)
+        if response.status_code != 200 or response.data.get("require_confirmation"):
+            return response
+
+        # Prefer anything the reviewer already holds, so we stay in step with their pre-fetched edits
+        next_edit_id = next(iter(ReviewQueue().reserve_edit_ids(request.user, 1)), None)
+
+    return Response(response.data | {"next_edit_id": next_edit_id})
+
+
 @reviewer_required()
 @api_view()
 def get_next_edit_id_for_review(request):
-    already_classified = Subquery(Classification.objects.filter(user=request.user).values("edit_id"))
-
-    # Loop over our groups, ordered by weight and status, preferring a larger weight and in progress edits
-    for potential_group in (
-        Edit.objects.filter(groups__weight__gt=0, is_deleted=False, status__in=[0, 1])
-        .exclude(id__in=already_classified)
-        .order_by("-groups__weight", "-status")
-        .values("groups__weight", "status")
-        .distinct()
-    ):
-        # Find any edits we have available in this group
-        potential_edits = (
-            Edit.objects.filter(
-                groups__weight=potential_group["groups__weight"],
-                is_deleted=False,
-                status=potential_group["status"],
-            )
-            .exclude(id__in=already_classified)
-            .distinct()
-            .values_list("id", flat=True)
-        )
-        if count := potential_edits.count():
-            # Return a random entry from the group
-            edit_id = potential_edits[random.randint(0, count - 1)]  # nosec: B311
-            return Response({"edit_id": edit_id})
-
+    if edit_id := ReviewQueue().get_next_edit_id(request.user):
+        return Response({"edit_id": edit_id})
     return Response({"edit_id": None, "message": "No Pending Edit Found"})
 
 
+@reviewer_required()
+@api_view()
+def get_next_edit_ids_for_review(request):
+    try:
+        count = int(request.query_params.get("count", settings.CBNG_REVIEW_RESERVATION_MAX_EDITS))
+    except ValueError:
+        return HttpResponse(status=400, content="Invalid count")
+    count = max(1, min(count, settings.CBNG_REVIEW_RESERVATION_MAX_EDITS))
+
+    if edit_ids := ReviewQueue().reserve_edit_ids(request.user, count):
+        EditCache().schedule_warm(edit_ids)
+        return Response({"edit_ids": edit_ids, "expires_in": settings.CBNG_REVIEW_RESERVATION_SECONDS})
+    return Response({"edit_ids": [], "message": "No Pending Edit Found"})
+
+
+@admin_required()
+@api_view(["POST"])
+def store_bulk_classifications(request):
+    serializer = BulkClassificationSerializer(
+        data=request.data, many=True, max_length=settings.CBNG_BULK_CLASSIFICATION_MAX_ENTRIES
+    )
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+
+    usernames = {entry["username"] for entry in serializer.validated_data}
+    users = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+    if missing_usernames := usernames - users.keys():
+        return Response({"message": "Unknown users", "usernames": sorted(missing_usernames)}, status=400)
+
+    classifications = BulkClassifications().store(
+        [
+            PendingClassification(
+                edit_id=entry["edit_id"],
+                user_id=users[entry["username"]],
+                classification=entry["classification"],
+                comment=entry.get("comment") or None,
+            )
+            for entry in serializer.validated_data
+        ]
+    )
+    return Response({"stored": len(classifications), "skipped": len(serializer.validated_data) - len(classifications)})
+
+
 @reviewer_required()
 @api_view(["POST"])
 def store_client_error(request):
@@ -171,6 +214,15 @@ def store_client_error(request):
 @api_view()
 def dump_edit_as_wp_edit(request, edit_id):
     edit = get_object_or_404(Edit, id=edit_id)
-    if wp_edit := EditSetDumper().generate_wp_edit(edit):
+    if wp_edit := EditCache().get_wp_edit(edit):
         return HttpResponse(wp_edit, content_type="text/xml")
     raise Http404
+
+
+@reviewer_required()
+@api_view()
+def render_edit_diff(request, edit_id):
+    edit = get_object_or_404(Edit, id=edit_id)
+    if html := EditCache().get_diff(edit):
+        return HttpResponse(html, content_type="text/html")
+    raise Http404
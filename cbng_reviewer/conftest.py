@@ -1,6 +1,7 @@
 import pathlib
 
 import pytest
+from django.core.cache import caches
 from django.core.management import call_command
 
 
@@ -32,3 +33,11 @@ def collect_static_files(request):
     need_static = any(item.get_closest_marker("interactive") for item in request.session.items)
     if need_static:
         call_command("collectstatic", verbosity=0, interactive=False)
+
+
+# Ensure cached state does not leak between tests
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    for cache in caches.all():
+        cache.clear()
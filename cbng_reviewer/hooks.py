@@ -10,38 +10,172 @@ def notify_irc_about_pending_account(instance, created, **kwargs):
         from cbng_reviewer.libs.irc import IrcRelay
         from cbng_reviewer.libs.messages import Messages
 
-        IrcRelay().send_message(Messages().notify_irc_about_pending_account(instance))
+        IrcRelay().queue_message(Messages().notify_irc_about_pending_account(instance))
 
 
 def notify_irc_about_deleted_account(instance, **kwargs):
     from cbng_reviewer.libs.irc import IrcRelay
     from cbng_reviewer.libs.messages import Messages
 
-    IrcRelay().send_message(Messages().notify_irc_about_deleted_account(instance))
+    IrcRelay().queue_message(Messages().notify_irc_about_deleted_account(instance))
 
 
-def update_edit_classification_from_classification(instance, **kwargs):
-    from cbng_reviewer import tasks
+def send_classified_many_from_classification(instance, **kwargs):
+    from cbng_reviewer.models import Classification
+    from cbng_reviewer.signals import classified_many
 
-    try:
-        tasks.update_edit_classification.apply_async([instance.edit_id])
-    except kombu.exceptions.OperationalError as e:
-        logger.error(f"Failed to create update_edit_classification task: {e}")
+    classified_many.send(sender=Classification, edit_ids=[instance.edit_id])
 
 
-def import_training_data_for_edit(instance, created, **kwargs):
+def send_created_many_from_edit(instance, created, **kwargs):
     if created:
-        from cbng_reviewer import tasks
+        from cbng_reviewer.models import Edit
+        from cbng_reviewer.signals import created_many
+
+        created_many.send(sender=Edit, edit_ids=[instance.id])
+
+
+def update_edit_classification_from_classified_edits(edit_ids, **kwargs):
+    from cbng_reviewer.libs.debounce import EditClassificationDebouncer
+
+    EditClassificationDebouncer().schedule_many(edit_ids)
+
+
+def import_training_data_for_created_edits(edit_ids, **kwargs):
+    from django.db import transaction
+    from cbng_reviewer import tasks
 
+    def _apply_async():
         try:
-            tasks.import_training_data.apply_async([instance.id])
+            if len(edit_ids) == 1:
+                tasks.import_training_data.apply_async([edit_ids[0]])
+            else:
+                tasks.import_training_data_for_edits.apply_async([list(edit_ids)])
         except kombu.exceptions.OperationalError as e:
             logger.error(f"Failed to create import_training_data task: {e}")
 
+    # Wait for the creating transaction, so the task sees the edits & anything imported alongside them
+    transaction.on_commit(_apply_async)
+
+
+def notify_irc_about_created_edits(edit_ids, **kwargs):
+    from cbng_reviewer.libs.irc import IrcRelay
+    from cbng_reviewer.libs.messages import Messages
+    from cbng_reviewer.models import Edit
+
+    # Imported edits may already be reviewed, so are not pending
+    if edits := list(Edit.objects.filter(id__in=edit_ids).exclude(status=2)):
+        IrcRelay().queue_message(Messages().notify_irc_about_edits_pending(edits))
+
+
+def publish_created_edit_events(edit_ids, **kwargs):
+    from cbng_reviewer.libs.edit_events import EditEventStream
+
+    EditEventStream().publish("created", edit_ids)
+
+
+def publish_classified_edit_events(edit_ids, **kwargs):
+    from cbng_reviewer.libs.edit_events import EditEventStream
+
+    EditEventStream().publish("classified", edit_ids)
+
+
+def update_review_queue_from_edit(instance, update_fields=None, **kwargs):
+    # Skip saves which can not change the queue state (e.g. `update_training_data_flag`)
+    if update_fields is not None and not {"status", "is_deleted", "core_score"} & set(update_fields):
+        return
+
+    from cbng_reviewer.libs.review_queue import ReviewQueue
+
+    ReviewQueue().refresh_edits([instance.id])
+
+
+def update_review_queue_from_edit_groups(instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # pk_set is not provided on clear, so remember which edits are about to leave the group
+        instance._review_queue_cleared_edit_ids = list(instance.edit_set.values_list("id", flat=True))
+        return
+
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+
+    from cbng_reviewer.libs.review_queue import ReviewQueue
+
+    # reverse => instance is an EditGroup and pk_set contains edit ids
+    if not reverse:
+        edit_ids = [instance.id]
+    elif action == "post_clear":
+        edit_ids = instance.__dict__.pop("_review_queue_cleared_edit_ids", [])
+    else:
+        edit_ids = pk_set or set()
+    ReviewQueue().refresh_edits(edit_ids)
+
+
+def track_edit_group_weight_change(instance, update_fields=None, **kwargs):
+    # Only a weight change moves edits between buckets, renames etc. leave the queue untouched
+    instance._review_queue_weight_changed = False
+    if instance.pk is None or (update_fields is not None and "weight" not in update_fields):
+        return
+
+    from cbng_reviewer.models import EditGroup
+
+    stored_weight = EditGroup.objects.filter(pk=instance.pk).values_list("weight", flat=True).first()
+    instance._review_queue_weight_changed = stored_weight is not None and stored_weight != instance.weight
+
+
+def update_review_queue_from_edit_group(instance, created, **kwargs):
+    if created or not instance.__dict__.pop("_review_queue_weight_changed", False):
+        return
+
+    from django.db import transaction
+    from cbng_reviewer import tasks
+
+    def _refresh_review_queue():
+        try:
+            tasks.refresh_review_queue_for_edit_group.apply_async([instance.id])
+        except kombu.exceptions.OperationalError as e:
+            logger.error(f"Failed to create refresh_review_queue_for_edit_group task: {e}")
+
+    transaction.on_commit(_refresh_review_queue)
+
+
+def _increment_edit_counters(instance, delta: int):
+    from django.db.models import F
+    from cbng_reviewer.models import Edit, CLASSIFICATION_COUNTER_FIELDS
+
+    counter_field = CLASSIFICATION_COUNTER_FIELDS[instance.classification]
+    counters = {counter_field: F(counter_field) + delta}
+    if not instance.user.is_bot:
+        counters["human_classifications"] = F("human_classifications") + delta
+    Edit.objects.filter(id=instance.edit_id).update(**counters)
+
+
+def update_edit_counters_from_classification(instance, created, **kwargs):
+    from cbng_reviewer.models import Edit
+
+    if not created:
+        # We can not tell what changed, so recount
+        Edit.objects.filter(id=instance.edit_id).update(**instance.edit.get_classification_counts())
+        return
+
+    _increment_edit_counters(instance, 1)
+
+
+def update_edit_counters_from_deleted_classification(instance, **kwargs):
+    _increment_edit_counters(instance, -1)
+
+
+def update_user_accuracy_from_classification(instance, created, **kwargs):
+    from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
 
-def notify_irc_about_pending_edit(instance, created, **kwargs):
     if created:
-        from cbng_reviewer.libs.irc import IrcRelay
-        from cbng_reviewer.libs.messages import Messages
+        UserAccuracyTracker().apply_classification(instance, 1)
+    else:
+        # We can not tell what changed, so recount
+        UserAccuracyTracker().recount_users([instance.user_id])
+
+
+def update_user_accuracy_from_deleted_classification(instance, **kwargs):
+    from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
 
-        IrcRelay().send_message(Messages().notify_irc_about_edit_pending(instance))
+    UserAccuracyTracker().apply_classification(instance, -1)
@@ -0,0 +1,129 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Iterable, List
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from cbng_reviewer.libs.models.classification import PendingClassification
+from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
+from cbng_reviewer.models import Classification, Edit, User, CLASSIFICATION_IDS, CLASSIFICATION_COUNTER_FIELDS
+from cbng_reviewer.signals import classified_many
+
+logger = logging.getLogger(__name__)
+
+
+class BulkClassifications:
+    """
+    Stores many classifications at once, skipping any edit/user pair which already exists.
+
+    Should another writer store the same pair mid-import, the batch is retried a row at a time,
+    so only the rows which were actually inserted are counted.
+
+    `bulk_create` does not send the model signals, so the new classifications are counted towards
+    the edit counters & user accuracy directly, then `classified_many` is sent once for the touched edits.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self._batch_size = batch_size
+
+    def _increment_edit_counters(self, classifications: List[Classification]) -> None:
+        bot_user_ids = set(
+            User.objects.filter(
+                id__in={classification.user_id for classification in classifications}, is_bot=True
+            ).values_list("id", flat=True)
+        )
+
+        edit_counters = defaultdict(Counter)
+        for classification in classifications:
+            edit_counters[classification.edit_id][CLASSIFICATION_COUNTER_FIELDS[classification.classification]] += 1
+            if classification.user_id not in bot_user_ids:
+                edit_counters[classification.edit_id]["human_classifications"] += 1
+
+        # Edits sharing the same increments are updated together
+        edit_ids_by_counters = defaultdict(list)
+        for edit_id, counters in edit_counters.items():
+            edit_ids_by_counters[tuple(sorted(counters.items()))].append(edit_id)
+
+        for counters, edit_ids in edit_ids_by_counters.items():
+            Edit.objects.filter(id__in=edit_ids).update(**{field: F(field) + delta for field, delta in counters})
+
+    def _build_classification(self, pending_classification: PendingClassification) -> Classification:
+        return Classification(
+            edit_id=pending_classification.edit_id,
+            user_id=pending_classification.user_id,
+            classification=pending_classification.classification,
+            comment=pending_classification.comment,
+        )
+
+    def _insert(self, pending: List[PendingClassification]) -> List[Classification]:
+        try:
+            with transaction.atomic():
+                return Classification.objects.bulk_create(
+                    [self._build_classification(pending_classification) for pending_classification in pending],
+                    batch_size=self._batch_size,
+                )
+        except IntegrityError:
+            if len(pending) == 1:
+                return []
+
+        # Something was stored (or removed) since we checked, so find out exactly which rows make it in
+        logger.info("Conflict storing classifications, storing them one at a time")
+        return [
+            classification
+            for pending_classification in pending
+            for classification in self._insert([pending_classification])
+        ]
+
+    def store(self, pending_classifications: Iterable[PendingClassification]) -> List[Classification]:
+        pending = {}
+        for pending_classification in pending_classifications:
+            if pending_classification.classification not in CLASSIFICATION_IDS:
+                logger.warning(f"Ignoring invalid classification: {pending_classification}")
+                continue
+            # First one wins, matching the unique constraint
+            pending.setdefault((pending_classification.edit_id, pending_classification.user_id), pending_classification)
+
+        edit_ids = {edit_id for edit_id, _ in pending}
+        user_ids = {user_id for _, user_id in pending}
+        with transaction.atomic():
+            existing_edit_ids = set(Edit.objects.filter(id__in=edit_ids).values_list("id", flat=True))
+            existing_pairs = set(
+                Classification.objects.filter(edit_id__in=edit_ids, user_id__in=user_ids).values_list(
+                    "edit_id", "user_id"
+                )
+            )
+
+            # Only what was actually inserted is counted, so re-importing the same entries is a no-op
+            classifications = self._insert(
+                [
+                    pending_classification
+                    for (edit_id, user_id), pending_classification in pending.items()
+                    if edit_id in existing_edit_ids and (edit_id, user_id) not in existing_pairs
+                ]
+            )
+            if not classifications:
+                return []
+
+            self._increment_edit_counters(classifications)
+            UserAccuracyTracker().apply_classifications(classifications)
+
+        classified_many.send(
+            sender=Classification,
+            edit_ids=sorted({classification.edit_id for classification in classifications}),
+        )
+        logger.info(f"Stored {len(classifications)} classifications")
+        return classifications
+
+    def store_in_batches(self, pending_classifications: Iterable[PendingClassification]) -> int:
+        """Store the classifications `batch_size` at a time, so callers do not need to buffer them all."""
+        stored, batch = 0, []
+        for pending_classification in pending_classifications:
+            batch.append(pending_classification)
+            if len(batch) >= self._batch_size:
+                stored += len(self.store(batch))
+                batch = []
+
+        if batch:
+            stored += len(self.store(batch))
+        return stored
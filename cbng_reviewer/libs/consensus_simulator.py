@@ -0,0 +1,83 @@
+import itertools
+import logging
+from typing import Iterable, List, Tuple
+
+from django.db.models import Count, Q
+
+from cbng_reviewer.libs.models.consensus import ConsensusSimulation
+from cbng_reviewer.models import Edit, get_consensus_classification
+
+logger = logging.getLogger(__name__)
+
+
+class ConsensusSimulator:
+    """
+    Evaluates consensus thresholds against the stored classification counters.
+
+    Edits are collapsed into their distinct vote combinations in one query, the corpus only has a handful
+    of those, so each threshold combination is evaluated over the groups rather than the edits.
+    """
+
+    def __init__(self):
+        self._vote_matrix = self._load_vote_matrix()
+
+    def _load_vote_matrix(self) -> List[Tuple[int, int, int, int, int, int | None, int]]:
+        # Skip the edits `update_classification` would not touch
+        return list(
+            Edit.objects.exclude(
+                Q(status=2, classification__isnull=False)
+                & (
+                    Q(is_deleted=True)
+                    | Q(vandalism_classifications=0, constructive_classifications=0, skipped_classifications=0)
+                )
+            )
+            .values_list(
+                "vandalism_classifications",
+                "constructive_classifications",
+                "skipped_classifications",
+                "human_classifications",
+                "status",
+                "classification",
+            )
+            .annotate(edits=Count("id"))
+            .order_by()
+        )
+
+    def simulate(
+        self, minimum_classifications: int, minimum_human_classifications: int, ratio: float = 3
+    ) -> ConsensusSimulation:
+        completed, newly_completed, no_longer_completed, changed_classification = 0, 0, 0, 0
+        for vandalism, constructive, skipped, human, status, classification, edits in self._vote_matrix:
+            new_classification = get_consensus_classification(
+                vandalism, constructive, skipped, human, minimum_classifications, minimum_human_classifications, ratio
+            )
+            is_completed = status == 2
+            if new_classification is not None:
+                completed += edits
+                if not is_completed:
+                    newly_completed += edits
+                elif new_classification != classification:
+                    changed_classification += edits
+            elif is_completed:
+                no_longer_completed += edits
+
+        return ConsensusSimulation(
+            minimum_classifications=minimum_classifications,
+            minimum_human_classifications=minimum_human_classifications,
+            ratio=ratio,
+            completed=completed,
+            newly_completed=newly_completed,
+            no_longer_completed=no_longer_completed,
+            changed_classification=changed_classification,
+        )
+
+    def simulate_all(
+        self,
+        minimum_classifications: Iterable[int],
+        minimum_human_classifications: Iterable[int],
+        ratios: Iterable[float],
+    ) -> List[ConsensusSimulation]:
+        return [
+            self.simulate(*combination)
+            for combination in itertools.product(minimum_classifications, minimum_human_classifications, ratios)
+        ]
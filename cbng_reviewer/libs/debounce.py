@@ -0,0 +1,94 @@
+import logging
+from typing import List
+
+import kombu.exceptions
+import redis
+from django.conf import settings
+from django.db import transaction
+
+from cbng_reviewer.libs.redis_client import get_redis_client
+from cbng_reviewer.models import Edit
+
+logger = logging.getLogger(__name__)
+
+
+class EditClassificationDebouncer:
+    """
+    Coalesces classification recomputes, so a burst of classifications results in one task per edit.
+
+    Edit ids are collected into a Redis set, the first addition schedules a delayed drain
+    which then recomputes the set in batches.
+    """
+
+    pending_key = "cbng_reviewer:pending_edit_classification"
+    scheduled_key = "cbng_reviewer:pending_edit_classification:scheduled"
+
+    def __init__(self):
+        self._client = get_redis_client()
+
+    def _apply_async(self, *args, **kwargs) -> None:
+        from cbng_reviewer import tasks
+
+        try:
+            tasks.update_edit_classification.apply_async(*args, **kwargs)
+        except kombu.exceptions.OperationalError as e:
+            logger.error(f"Failed to create update_edit_classification task: {e}")
+
+    def schedule(self, edit_id: int) -> None:
+        self.schedule_many([edit_id])
+
+    def schedule_many(self, edit_ids: List[int]) -> None:
+        from cbng_reviewer import tasks
+
+        if not edit_ids:
+            return
+
+        delay = settings.CBNG_EDIT_CLASSIFICATION_DEBOUNCE_SECONDS
+        try:
+            self._client.sadd(self.pending_key, *edit_ids)
+            # The flag expires well after the drain is due, so a lost task can not wedge the set
+            if not self._client.set(self.scheduled_key, 1, nx=True, ex=delay * 10):
+                return
+        except redis.RedisError as e:
+            logger.error(f"Failed to debounce classification update for {edit_ids}: {e}")
+            for edit_id in edit_ids:
+                self._apply_async([edit_id], countdown=delay)
+            return
+
+        try:
+            tasks.update_pending_edit_classifications.apply_async(countdown=delay)
+        except kombu.exceptions.OperationalError as e:
+            logger.error(f"Failed to create update_pending_edit_classifications task: {e}")
+            self._client.delete(self.scheduled_key)
+
+    def drain(self, batch_size: int = 100) -> int:
+        from cbng_reviewer.libs.edit_set.utils import (
+            CLASSIFICATION_EDIT_FIELDS,
+            update_edit_classification_from_counters,
+        )
+
+        # Clear the flag first, anything added from here on schedules another drain
+        self._client.delete(self.scheduled_key)
+
+        drained, locked_edit_ids = 0, set()
+        while edit_ids := self._client.spop(self.pending_key, batch_size):
+            edit_ids = {int(edit_id) for edit_id in edit_ids}
+            with transaction.atomic():
+                # Skip anything another worker is recomputing right now, rather than waiting on the lock
+                edits = list(
+                    Edit.objects.select_for_update(skip_locked=True)
+                    .filter(id__in=edit_ids)
+                    .only(*CLASSIFICATION_EDIT_FIELDS)
+                )
+                # The counters are kept current by the classification signals, so decide from the locked rows
+                # rather than recounting, which would overwrite increments racing with us
+                update_edit_classification_from_counters(edits, batch_size=batch_size)
+            available_edit_ids = [edit.id for edit in edits]
+            locked_edit_ids |= edit_ids - set(available_edit_ids)
+            drained += len(available_edit_ids)
+
+        # Locked (rather than missing) edits go back in the set for the next drain
+        if locked_edit_ids := list(Edit.objects.filter(id__in=locked_edit_ids).values_list("id", flat=True)):
+            logger.info(f"Classification update already in progress for {locked_edit_ids}, deferring")
+            self.schedule_many(locked_edit_ids)
+        return drained
@@ -0,0 +1,88 @@
+import difflib
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from cbng_reviewer.libs.models.diff import DiffLine
+from cbng_reviewer.models import Edit, CurrentRevision, PreviousRevision
+
+logger = logging.getLogger(__name__)
+
+
+class DiffRenderer:
+    def __init__(self, context_lines: int = 2):
+        self._context_lines = context_lines
+
+    def _diff_words(self, previous: str, current: str) -> Tuple[str, str]:
+        previous_words, current_words = re.split(r"(\s+)", previous), re.split(r"(\s+)", current)
+
+        previous_html, current_html = [], []
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(
+            None, previous_words, current_words, autojunk=False
+        ).get_opcodes():
+            previous_text, current_text = escape("".join(previous_words[i1:i2])), escape("".join(current_words[j1:j2]))
+            if tag == "equal":
+                previous_html.append(previous_text)
+                current_html.append(current_text)
+                continue
+            if previous_text:
+                previous_html.append(f"<del>{previous_text}</del>")
+            if current_text:
+                current_html.append(f"<ins>{current_text}</ins>")
+        return "".join(previous_html), "".join(current_html)
+
+    def get_diff_lines(self, previous: str, current: str) -> List[DiffLine]:
+        previous_lines, current_lines = previous.splitlines(), current.splitlines()
+
+        diff_lines = []
+        for group in difflib.SequenceMatcher(None, previous_lines, current_lines).get_grouped_opcodes(
+            self._context_lines
+        ):
+            if diff_lines:
+                diff_lines.append(DiffLine(change_type="gap"))
+
+            for tag, i1, i2, j1, j2 in group:
+                if tag == "equal":
+                    for i, j in zip(range(i1, i2), range(j1, j2)):
+                        html = escape(previous_lines[i])
+                        diff_lines.append(DiffLine("context", i + 1, html, j + 1, html))
+                    continue
+
+                # Pair up replaced lines for a word level diff, anything left over is a plain removal/addition
+                for offset in range(max(i2 - i1, j2 - j1)):
+                    i, j = i1 + offset, j1 + offset
+                    if i < i2 and j < j2:
+                        previous_html, current_html = self._diff_words(previous_lines[i], current_lines[j])
+                        diff_lines.append(DiffLine("change", i + 1, previous_html, j + 1, current_html))
+                    elif i < i2:
+                        diff_lines.append(DiffLine("change", i + 1, f"<del>{escape(previous_lines[i])}</del>"))
+                    else:
+                        diff_lines.append(
+                            DiffLine(
+                                "change",
+                                current_line_number=j + 1,
+                                current_html=f"<ins>{escape(current_lines[j])}</ins>",
+                            )
+                        )
+        return diff_lines
+
+    def render_edit(self, edit: Edit) -> Optional[str]:
+        current = CurrentRevision.objects.filter(edit=edit).values_list("text", flat=True).first()
+        if current is None:
+            logger.debug(f"[{edit.id}] No current revision stored")
+            return None
+        previous = PreviousRevision.objects.filter(edit=edit).values_list("text", flat=True).first()
+
+        return render_to_string(
+            "cbng_reviewer/diff.html",
+            {
+                "edit": edit,
+                "diff_lines": self.get_diff_lines(
+                    bytes(previous).decode("utf-8") if previous is not None else "",
+                    bytes(current).decode("utf-8"),
+                ),
+            },
+        )
@@ -0,0 +1,124 @@
+import logging
+from typing import Optional, List, Tuple, Any
+
+import kombu.exceptions
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from cbng_reviewer.libs.diff import DiffRenderer
+from cbng_reviewer.libs.edit_set.dumper import EditSetDumper
+from cbng_reviewer.models import Edit, QueuedEdit
+
+logger = logging.getLogger(__name__)
+
+
+class EditCache:
+    """
+    Shared cache of the rendered WPEdit payload & diff for an edit.
+
+    The WPEdit payload includes the review state, so it is stored alongside a fingerprint of that state;
+    a stale entry is treated as a miss. Both are dropped when the training data is (re-)imported.
+
+    Edits are mapped onto a fixed number of slots (`CBNG_EDIT_CACHE_SLOTS`) per payload type, each entry
+    recording the edit it holds, so a newer edit simply replaces an older one sharing its slot.
+    Together with payloads larger than `CBNG_EDIT_CACHE_MAX_ENTRY_BYTES` being rendered on demand rather
+    than cached, that bounds the cache size regardless of the backend eviction policy.
+    """
+
+    def __init__(self):
+        self._cache = caches["edits"]
+
+    def _get_slot(self, edit_id: int) -> int:
+        return edit_id % settings.CBNG_EDIT_CACHE_SLOTS
+
+    def _get_wp_edit_key(self, edit_id: int) -> str:
+        return f"wp-edit-{self._get_slot(edit_id)}"
+
+    def _get_diff_key(self, edit_id: int) -> str:
+        return f"edit-diff-{self._get_slot(edit_id)}"
+
+    def _get(self, key: str, edit_id: int) -> Optional[Any]:
+        return self._unpack(self._cache.get(key), edit_id)
+
+    def _unpack(self, cached: Optional[Tuple[int, Any]], edit_id: int) -> Optional[Any]:
+        if cached is not None:
+            cached_edit_id, value = cached
+            if cached_edit_id == edit_id:
+                return value
+        return None
+
+    def _set(self, key: str, edit_id: int, value: Any, size: int) -> None:
+        if size <= settings.CBNG_EDIT_CACHE_MAX_ENTRY_BYTES:
+            self._cache.set(key, (edit_id, value))
+
+    def _get_fingerprint(self, edit: Edit) -> Tuple:
+        return (
+            edit.status,
+            edit.classification,
+            edit.number_of_reviewers,
+            edit.number_of_agreeing_reviewers,
+        )
+
+    def get_wp_edit(self, edit: Edit) -> Optional[str]:
+        fingerprint = self._get_fingerprint(edit)
+        if cached := self._get(self._get_wp_edit_key(edit.id), edit.id):
+            cached_fingerprint, wp_edit = cached
+            if tuple(cached_fingerprint) == fingerprint:
+                return wp_edit
+
+        if wp_edit := EditSetDumper().generate_wp_edit(edit):
+            self._set(self._get_wp_edit_key(edit.id), edit.id, (fingerprint, wp_edit), len(wp_edit))
+        return wp_edit
+
+    def get_diff(self, edit: Edit) -> Optional[str]:
+        if (html := self._get(self._get_diff_key(edit.id), edit.id)) is not None:
+            return html
+
+        if html := DiffRenderer().render_edit(edit):
+            self._set(self._get_diff_key(edit.id), edit.id, html, len(html))
+        return html
+
+    def invalidate_edit(self, edit: Edit) -> None:
+        self._cache.delete_many([self._get_wp_edit_key(edit.id), self._get_diff_key(edit.id)])
+
+    def get_reserved_edit_ids(self, limit: int) -> List[int]:
+        # Reserved edits have been handed to a reviewer, so are the ones about to be loaded
+        return list(
+            QueuedEdit.objects.filter(reserved_until__gt=timezone.now())
+            .order_by("reserved_until", "edit_id")
+            .values_list("edit_id", flat=True)[:limit]
+        )
+
+    def schedule_warm(self, edit_ids: List[int]) -> None:
+        from cbng_reviewer import tasks
+
+        def _apply_async():
+            try:
+                tasks.warm_edit_cache.apply_async([edit_ids])
+            except kombu.exceptions.OperationalError as e:
+                logger.error(f"Failed to create warm_edit_cache task: {e}")
+
+        transaction.on_commit(_apply_async)
+
+    def warm(self, edit_ids: Optional[List[int]] = None) -> int:
+        if edit_ids is None:
+            edit_ids = self.get_reserved_edit_ids(settings.CBNG_EDIT_CACHE_WARM_MAX_EDITS)
+        cached = self._cache.get_many(
+            [self._get_wp_edit_key(edit_id) for edit_id in edit_ids]
+            + [self._get_diff_key(edit_id) for edit_id in edit_ids]
+        )
+
+        warmed = 0
+        for edit in Edit.objects.filter(id__in=edit_ids, has_training_data=True):
+            wp_edit_cached = self._unpack(cached.get(self._get_wp_edit_key(edit.id)), edit.id) is not None
+            if wp_edit_cached and self._unpack(cached.get(self._get_diff_key(edit.id)), edit.id) is not None:
+                continue
+
+            logger.debug(f"Warming cache for {edit.id}")
+            if not wp_edit_cached:
+                self.get_wp_edit(edit)
+            self.get_diff(edit)
+            warmed += 1
+        return warmed
@@ -0,0 +1,77 @@
+import logging
+from typing import Iterable, List
+
+import redis
+from django.conf import settings
+from django.db import transaction
+
+from cbng_reviewer.libs.models.edit_event import EditEvent
+from cbng_reviewer.libs.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class EditEventStream:
+    """
+    Append-only Redis stream of edit lifecycle events, for downstream tools to consume incrementally.
+
+    Consumers read through a consumer group, so each only receives the events it has not yet acknowledged.
+    """
+
+    stream_key = "cbng_reviewer:edit_events"
+    event_types = {"created", "classified", "completed", "deleted", "training_data_imported"}
+
+    def _get_client(self) -> redis.Redis:
+        return get_redis_client()
+
+    def _send(self, event_type: str, edit_ids: List[int]) -> None:
+        try:
+            with self._get_client().pipeline(transaction=False) as pipeline:
+                for edit_id in edit_ids:
+                    pipeline.xadd(
+                        self.stream_key,
+                        {"type": event_type, "edit_id": edit_id},
+                        maxlen=settings.CBNG_EDIT_EVENT_STREAM_MAX_LENGTH,
+                        approximate=True,
+                    )
+                pipeline.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to publish {event_type} events for {edit_ids}: {e}")
+
+    def publish(self, event_type: str, edit_ids: Iterable[int]) -> bool:
+        if event_type not in self.event_types:
+            raise ValueError(f"Unknown edit event type: {event_type}")
+
+        edit_ids = list(edit_ids)
+        if not settings.CBNG_ENABLE_EDIT_EVENT_STREAM or not edit_ids:
+            return False
+
+        # Only announce what consumers can actually read back from the database
+        transaction.on_commit(lambda: self._send(event_type, edit_ids))
+        return True
+
+    def create_consumer_group(self, group: str, start_id: str = "$") -> bool:
+        try:
+            self._get_client().xgroup_create(self.stream_key, group, id=start_id, mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+            return False
+        return True
+
+    def read(self, group: str, consumer: str, count: int = 100, block_ms: int | None = None) -> List[EditEvent]:
+        response = self._get_client().xreadgroup(group, consumer, {self.stream_key: ">"}, count=count, block=block_ms)
+        return [
+            EditEvent(
+                id=event_id.decode("utf-8"),
+                type=fields[b"type"].decode("utf-8"),
+                edit_id=int(fields[b"edit_id"]),
+            )
+            for _, events in (response or [])
+            for event_id, fields in events
+        ]
+
+    def acknowledge(self, group: str, events: Iterable[EditEvent]) -> int:
+        if event_ids := [event.id for event in events]:
+            return self._get_client().xack(self.stream_key, group, *event_ids)
+        return 0
@@ -124,3 +124,18 @@ class EditSetParser:
             return False
 
         return True
+
+    def read_file_in_batches(self, path: PosixPath, callback_func: Callable, batch_size: int = 500) -> bool:
+        """Hand the edits to `callback_func` as `wp_edits`, `batch_size` at a time."""
+        batch = []
+
+        def _add_to_batch(wp_edit: WpEdit):
+            batch.append(wp_edit)
+            if len(batch) >= batch_size:
+                callback_func(wp_edits=list(batch))
+                batch.clear()
+
+        result = self.read_file(path, _add_to_batch)
+        if batch:
+            callback_func(wp_edits=batch)
+        return result
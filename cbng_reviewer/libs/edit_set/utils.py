@@ -1,13 +1,26 @@
 import logging
+from typing import Dict, Iterable, List, Optional
 
 from django.conf import settings
 from django.db import transaction
 
 from cbng_reviewer.libs.models.edit_set import WpEdit
-from cbng_reviewer.models import EditGroup, Edit, TrainingData, PreviousRevision, CurrentRevision
+from cbng_reviewer.models import (
+    EditGroup,
+    Edit,
+    TrainingData,
+    PreviousRevision,
+    CurrentRevision,
+    Classification,
+    CLASSIFICATION_COUNTER_AGGREGATES,
+)
 
 logger = logging.getLogger(__name__)
 
+CLASSIFICATION_RESULT_FIELDS = ["status", "classification", "number_of_reviewers", "number_of_agreeing_reviewers"]
+# Everything `Edit.apply_classification_counters` reads or writes
+CLASSIFICATION_EDIT_FIELDS = ["is_deleted", *CLASSIFICATION_RESULT_FIELDS, *CLASSIFICATION_COUNTER_AGGREGATES.keys()]
+
 
 def import_training_data(edit: Edit, wp_edit: WpEdit):
     TrainingData.objects.filter(edit=edit).delete()
@@ -48,7 +61,116 @@ def import_training_data(edit: Edit, wp_edit: WpEdit):
             text=wp_edit.previous.text.encode("utf-8"),
         )
 
+    from cbng_reviewer.libs.edit_cache import EditCache
+    from cbng_reviewer.libs.edit_events import EditEventStream
+
+    EditCache().invalidate_edit(edit)
     edit.update_training_data_flag(True)
+    EditEventStream().publish("training_data_imported", [edit.id])
+
+
+def add_edits_to_edit_group(edit_group: EditGroup, edit_ids: Iterable[int]) -> List[int]:
+    from cbng_reviewer.signals import created_many
+
+    edit_ids = {int(edit_id) for edit_id in edit_ids}
+    existing_edit_ids = set(Edit.objects.filter(id__in=edit_ids).values_list("id", flat=True))
+    created_edit_ids = sorted(edit_ids - existing_edit_ids)
+    if created_edit_ids:
+        logger.info(f"Creating entries for {created_edit_ids}")
+        # Skip the per-row model signals, `created_many` announces the whole batch once it is grouped
+        Edit.objects.bulk_create([Edit(id=edit_id) for edit_id in created_edit_ids], ignore_conflicts=True)
+
+    grouped_edit_ids = set(edit_group.edit_set.filter(id__in=edit_ids).values_list("id", flat=True))
+    if ungrouped_edit_ids := sorted(edit_ids - grouped_edit_ids):
+        logger.info(f"Adding {ungrouped_edit_ids} to {edit_group.name}")
+        edit_group.edit_set.add(*ungrouped_edit_ids)
+
+    if created_edit_ids:
+        created_many.send(sender=Edit, edit_ids=created_edit_ids)
+    return created_edit_ids
+
+
+def _get_wp_edit_review_state(wp_edit: WpEdit) -> Dict[str, int]:
+    review_state = {"classification": 0 if wp_edit.is_vandalism else 1, "status": 2}
+    if wp_edit.reviewers is not None:
+        review_state["number_of_reviewers"] = wp_edit.reviewers
+    if wp_edit.reviewers_agreeing is not None:
+        review_state["number_of_agreeing_reviewers"] = wp_edit.reviewers_agreeing
+    return review_state
+
+
+def import_wp_edits_to_edit_group(
+    target_group: EditGroup,
+    wp_edits: Iterable[WpEdit],
+    skip_existing: bool,
+    dynamic_group_from_source: bool = False,
+    force_status: bool = False,
+) -> List[int]:
+    from cbng_reviewer.libs.review_queue import ReviewQueue
+    from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
+    from cbng_reviewer.signals import created_many
+
+    wp_edits = {wp_edit.edit_id: wp_edit for wp_edit in wp_edits}
+    with transaction.atomic():
+        existing_edits = Edit.objects.in_bulk(wp_edits.keys())
+        created_edit_ids = sorted(wp_edits.keys() - existing_edits.keys())
+        if created_edit_ids:
+            logger.info(f"Creating entries for {created_edit_ids}")
+            # Skip the per-row model signals, `created_many` announces the whole batch once it is imported.
+            # We know the review state, so set it as we go
+            Edit.objects.bulk_create(
+                [Edit(id=edit_id, **_get_wp_edit_review_state(wp_edits[edit_id])) for edit_id in created_edit_ids],
+                ignore_conflicts=True,
+            )
+
+        if force_status and existing_edits:
+            previous_states, review_fields = {}, set()
+            for edit in existing_edits.values():
+                previous_states[edit.id] = (edit.status, edit.classification)
+                for field, value in _get_wp_edit_review_state(wp_edits[edit.id]).items():
+                    setattr(edit, field, value)
+                    review_fields.add(field)
+
+            # `bulk_update` skips the model signals, so keep the queue & accuracy in step ourselves
+            Edit.objects.bulk_update(existing_edits.values(), sorted(review_fields))
+            ReviewQueue().refresh_edits(existing_edits.keys())
+            UserAccuracyTracker().apply_edit_changes(previous_states)
+
+        # Ensure we exist in the correct group - also for existing edits
+        groups, group_edit_ids = {}, {}
+        for edit_id, wp_edit in wp_edits.items():
+            group_name = wp_edit.editdb_source if dynamic_group_from_source and wp_edit.editdb_source else None
+            if group_name not in groups:
+                groups[group_name] = (
+                    EditGroup.objects.get_or_create(name=group_name, related_to=target_group)[0]
+                    if group_name
+                    else target_group
+                )
+            group_edit_ids.setdefault(group_name, []).append(edit_id)
+
+        for group_name, edit_ids in group_edit_ids.items():
+            group = groups[group_name]
+            grouped_edit_ids = set(group.edit_set.filter(id__in=edit_ids).values_list("id", flat=True))
+            if ungrouped_edit_ids := sorted(set(edit_ids) - grouped_edit_ids):
+                logger.info(f"Adding {ungrouped_edit_ids} to {group.contextual_name}")
+                group.edit_set.add(*ungrouped_edit_ids)
+
+        # Add training data as required
+        edits = Edit.objects.in_bulk(wp_edits.keys())
+        for edit_id, wp_edit in wp_edits.items():
+            if skip_existing and edits[edit_id].has_training_data:
+                continue
+
+            if wp_edit.has_complete_training_data:
+                logger.info(f"Importing training data from {wp_edit}")
+                import_training_data(edits[edit_id], wp_edit)
+            else:
+                logger.info(f"Missing training data for {wp_edit}")
+                # Do nothing - `import_training_data` or `update_deleted_edits` will deal with this
+
+    if created_edit_ids:
+        created_many.send(sender=Edit, edit_ids=created_edit_ids)
+    return created_edit_ids
 
 
 def import_wp_edit_to_edit_group(
@@ -57,54 +179,107 @@ def import_wp_edit_to_edit_group(
     skip_existing: bool,
     dynamic_group_from_source: bool = False,
     force_status: bool = False,
-):
-    try:
-        edit = Edit.objects.get(id=wp_edit.edit_id)
-        created = False
-    except Edit.DoesNotExist:
-        # Avoid triggering the model signals - we manage the whole import process
-        # Otherwise we will try and run `import_training_data` potentially before creating the training data,
-        # resulting in something that might not be what was in the source file
-        edit = Edit.objects.bulk_create([Edit(id=wp_edit.edit_id)])[0]
-        created = True
-
-    if created or force_status:
-        # If we are a new entry, then set that status to what we know
-        edit.classification = 0 if wp_edit.is_vandalism else 1
-        edit.status = 2
-
-        if wp_edit.reviewers is not None:
-            edit.number_of_reviewers = wp_edit.reviewers
-        if wp_edit.reviewers_agreeing is not None:
-            edit.number_of_agreeing_reviewers = wp_edit.reviewers_agreeing
-
-        edit.save()
-
-    group = target_group
-    if dynamic_group_from_source and wp_edit.editdb_source:
-        group, _ = EditGroup.objects.get_or_create(name=wp_edit.editdb_source, related_to=target_group)
-
-    # Ensure we exist in the correct group - also for existing edits
-    if not edit.groups.filter(pk=group.pk).exists():
-        logger.info(f"Adding {edit.id} to {group.contextual_name}")
-        edit.groups.add(group)
-        edit.save()
-
-    # Add training data as required
-    if not (skip_existing and edit.has_training_data):
-        if wp_edit.has_complete_training_data:
-            logger.info(f"Importing training data from {wp_edit}")
-            import_training_data(edit, wp_edit)
-        else:
-            logger.info(f"Missing training data for {wp_edit}")
-            # Do nothing - `import_training_data` or `update_deleted_edits` will deal with this
+) -> List[int]:
+    return import_wp_edits_to_edit_group(
+        target_group, [wp_edit], skip_existing, dynamic_group_from_source, force_status
+    )
 
 
 def mark_edit_as_deleted(edit: Edit):
     if not edit.is_deleted:
+        from cbng_reviewer.libs.edit_events import EditEventStream
         from cbng_reviewer.libs.irc import IrcRelay
         from cbng_reviewer.libs.messages import Messages
+        from cbng_reviewer.libs.review_queue import ReviewQueue
 
         with transaction.atomic():
             Edit.objects.filter(id=edit.id).update(is_deleted=True)
-        IrcRelay().send_message(Messages().notify_irc_about_edit_deletion(edit))
+            ReviewQueue().refresh_edits([edit.id])
+        IrcRelay().queue_message(Messages().notify_irc_about_edit_deletion(edit))
+        EditEventStream().publish("deleted", [edit.id])
+
+
+def _get_classification_counts(edit_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+    classifications = Classification.objects.all()
+    if edit_ids is not None:
+        classifications = classifications.filter(edit_id__in=edit_ids)
+    return {
+        row.pop("edit_id"): row
+        for row in classifications.values("edit_id").annotate(**CLASSIFICATION_COUNTER_AGGREGATES).order_by()
+    }
+
+
+def repair_classification_counters(batch_size: int = 1000) -> int:
+    counter_fields = list(CLASSIFICATION_COUNTER_AGGREGATES.keys())
+    counts = _get_classification_counts()
+
+    changed_edits = []
+    for edit in Edit.objects.only(*counter_fields).iterator(chunk_size=batch_size):
+        edit_counts = counts.get(edit.id, {})
+        if any(getattr(edit, field) != edit_counts.get(field, 0) for field in counter_fields):
+            logger.info(f"Repairing classification counters for {edit.id}")
+            for field in counter_fields:
+                setattr(edit, field, edit_counts.get(field, 0))
+            changed_edits.append(edit)
+
+    Edit.objects.bulk_update(changed_edits, counter_fields, batch_size=batch_size)
+    return len(changed_edits)
+
+
+def update_edit_classification_from_counters(edits: Iterable[Edit], batch_size: int = 1000) -> List[Edit]:
+    """Apply the consensus rules using the counters already on the edits, only writing the results."""
+    from cbng_reviewer.libs.edit_events import EditEventStream
+    from cbng_reviewer.libs.irc import IrcRelay
+    from cbng_reviewer.libs.messages import Messages
+    from cbng_reviewer.libs.review_queue import ReviewQueue
+    from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
+
+    changed_edits, completed_edits, previous_states = [], [], {}
+    for edit in edits:
+        original = [getattr(edit, field) for field in CLASSIFICATION_RESULT_FIELDS]
+        previous_states[edit.id] = (edit.status, edit.classification)
+
+        original_status = edit.status
+        if not edit.apply_classification_counters():
+            continue
+
+        if [getattr(edit, field) for field in CLASSIFICATION_RESULT_FIELDS] != original:
+            changed_edits.append(edit)
+        if edit.status != original_status and edit.status == 2 and edit.classification is not None:
+            completed_edits.append(edit)
+
+    with transaction.atomic():
+        Edit.objects.bulk_update(changed_edits, CLASSIFICATION_RESULT_FIELDS, batch_size=batch_size)
+        # `bulk_update` skips the model signals, so keep the queue in step ourselves
+        ReviewQueue(batch_size=batch_size).refresh_edits([edit.id for edit in changed_edits])
+        UserAccuracyTracker().apply_edit_changes({edit.id: previous_states[edit.id] for edit in changed_edits})
+
+    if completed_edits:
+        IrcRelay().queue_message(Messages().notify_irc_about_edit_completions(completed_edits))
+        EditEventStream().publish("completed", [edit.id for edit in completed_edits])
+    return changed_edits
+
+
+def bulk_update_edit_classification(
+    force: bool = False, batch_size: int = 1000, edit_ids: Optional[List[int]] = None
+) -> List[Edit]:
+    edits = Edit.objects.all() if force else Edit.objects.exclude(status=2)
+    if edit_ids is not None:
+        edits = edits.filter(id__in=edit_ids)
+
+    # Walk the table in id order, committing each chunk, so nothing is held for the whole run.
+    # The counters are maintained by the classification signals (`repair_classification_counters` fixes any drift),
+    # so decide from the locked rows rather than recounting over increments racing with us.
+    changed_edits, last_edit_id = [], 0
+    while chunk_edit_ids := list(
+        edits.filter(id__gt=last_edit_id).order_by("id").values_list("id", flat=True)[:batch_size]
+    ):
+        last_edit_id = chunk_edit_ids[-1]
+        with transaction.atomic():
+            chunk_edits = Edit.objects.select_for_update().filter(id__in=chunk_edit_ids).order_by("id")
+            changed_edits.extend(
+                update_edit_classification_from_counters(
+                    chunk_edits.only(*CLASSIFICATION_EDIT_FIELDS), batch_size=batch_size
+                )
+            )
+    return changed_edits
@@ -1,26 +1,45 @@
 import logging
 import socket
-from typing import Optional
+import time
+from datetime import timedelta
+from typing import List, Optional, Tuple
 
+import kombu.exceptions
+import redis
 import requests
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
 from cbng_reviewer.libs.models.message import Message
+from cbng_reviewer.libs.redis_client import get_redis_client
+from cbng_reviewer.models import IrcOutboxMessage
 
 logger = logging.getLogger(__name__)
 
 
 class IrcRelay:
-    def send_message(self, message: Message, channel: Optional[str] = None) -> bool:
+    # Set while a drain of the outbox is scheduled, so a burst of messages results in one task
+    outbox_scheduled_key = "cbng_reviewer:irc_outbox:scheduled"
+
+    def _get_target(self, message: Message, channel: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
         target_channel = channel if channel else message.channel
         text = message.body.strip() if message.body else None
 
         if not target_channel or not text:
             logger.warning(f"Skipping irc message due to missing channel or text: {target_channel} / {text}")
-            return False
+            return None, None
 
         if not settings.CBNG_ENABLE_IRC_MESSAGING:
             logger.debug(f"Skipping sending message to {target_channel} ({text})")
+            return None, None
+
+        return target_channel, text
+
+    def send_message(self, message: Message, channel: Optional[str] = None) -> bool:
+        target_channel, text = self._get_target(message, channel)
+        if not target_channel:
             return False
 
         # HTTP
@@ -30,6 +49,7 @@ class IrcRelay:
             r = requests.put(f"http://{settings.IRC_RELAY_HOST}:{settings.IRC_RELAY_PORT}", json=payload, timeout=1)
             if r.status_code != 200:
                 logger.error(f"Failed to send to IRC Relay (HTTP) {payload}: {r.status_code} / {r.content}")
+                return False
             return True
 
         # UDP
@@ -45,3 +65,88 @@ class IrcRelay:
         except Exception as e:
             logger.error(f"Failed to send to IRC Relay {payload}: {e}")
         return False
+
+    def queue_message(self, message: Message, channel: Optional[str] = None) -> bool:
+        """Store the message for `send_queued_messages`, keeping the relay out of the caller's transaction."""
+        target_channel, text = self._get_target(message, channel)
+        if not target_channel:
+            return False
+
+        IrcOutboxMessage.objects.create(channel=target_channel, body=text)
+        transaction.on_commit(self.schedule_queued_messages)
+        return True
+
+    def schedule_queued_messages(self, countdown: int = 0) -> None:
+        from cbng_reviewer import tasks
+
+        try:
+            # The flag expires well after the drain is due, so a lost task can not wedge the outbox
+            if not get_redis_client().set(self.outbox_scheduled_key, 1, nx=True, ex=countdown + 300):
+                return
+        except redis.RedisError as e:
+            logger.error(f"Failed to check for a scheduled irc outbox drain: {e}")
+
+        try:
+            tasks.send_queued_irc_messages.apply_async(countdown=countdown)
+        except kombu.exceptions.OperationalError as e:
+            logger.error(f"Failed to create send_queued_irc_messages task: {e}")
+
+    def _send_queued_message(self, outbox_message: IrcOutboxMessage) -> bool:
+        try:
+            return self.send_message(Message(body=outbox_message.body), outbox_message.channel)
+        except requests.RequestException as e:
+            logger.error(f"Failed to send queued irc message {outbox_message.id}: {e}")
+            return False
+
+    def _claim_queued_messages(self, last_id: int) -> List[IrcOutboxMessage]:
+        now = timezone.now()
+        with transaction.atomic():
+            # Skip anything another drainer is claiming or still holds
+            outbox_messages = list(
+                IrcOutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(id__gt=last_id)
+                .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+                .order_by("id")[: settings.CBNG_IRC_OUTBOX_BATCH_SIZE]
+            )
+            IrcOutboxMessage.objects.filter(id__in=[outbox_message.id for outbox_message in outbox_messages]).update(
+                claimed_until=now + timedelta(seconds=settings.CBNG_IRC_OUTBOX_CLAIM_SECONDS)
+            )
+        return outbox_messages
+
+    def send_queued_messages(self) -> int:
+        try:
+            # Clear the flag first, anything queued from here on schedules another drain
+            get_redis_client().delete(self.outbox_scheduled_key)
+        except redis.RedisError as e:
+            logger.error(f"Failed to clear the scheduled irc outbox drain: {e}")
+
+        sent, last_id, has_failures = 0, 0, False
+        # Messages are claimed a batch at a time, so no lock is held while sending
+        while outbox_messages := self._claim_queued_messages(last_id):
+            last_id = outbox_messages[-1].id
+
+            sent_ids, failed_ids = [], []
+            for outbox_message in outbox_messages:
+                if self._send_queued_message(outbox_message):
+                    sent_ids.append(outbox_message.id)
+                else:
+                    failed_ids.append(outbox_message.id)
+
+                # Keep within the relay's flood limits
+                time.sleep(settings.CBNG_IRC_OUTBOX_SEND_INTERVAL_SECONDS)
+
+            with transaction.atomic():
+                IrcOutboxMessage.objects.filter(id__in=sent_ids).delete()
+
+                failed = IrcOutboxMessage.objects.filter(id__in=failed_ids)
+                if exhausted_ids := list(
+                    failed.filter(attempts__gte=settings.CBNG_IRC_OUTBOX_MAX_ATTEMPTS - 1).values_list("id", flat=True)
+                ):
+                    logger.warning(f"Dropping queued irc messages {exhausted_ids} after too many attempts")
+                    IrcOutboxMessage.objects.filter(id__in=exhausted_ids).delete()
+                has_failures |= bool(failed.update(attempts=F("attempts") + 1, claimed_until=None))
+            sent += len(sent_ids)
+
+        if has_failures:
+            self.schedule_queued_messages(countdown=settings.CBNG_IRC_OUTBOX_RETRY_SECONDS)
+        return sent
@@ -1,5 +1,6 @@
 import logging
-from typing import Optional
+from collections import Counter
+from typing import Optional, List
 
 from django.conf import settings
 from django.template import loader
@@ -54,6 +55,17 @@ class Messages:
             channel=settings.IRC_RELAY_CHANNEL_FEED,
         )
 
+    def notify_irc_about_edit_completions(self, edits: List[Edit]) -> Message:
+        if len(edits) == 1:
+            return self.notify_irc_about_edit_completion(edits[0])
+
+        classifications = Counter(edit.get_classification_display() for edit in edits)
+        summary = ", ".join(f"{count} {name}" for name, count in sorted(classifications.items()))
+        return Message(
+            body=f"\x0314[[\x036 Reviews Completed \x0314]]\x0301 {len(edits)} edits classified ({summary})",
+            channel=settings.IRC_RELAY_CHANNEL_FEED,
+        )
+
     def notify_irc_about_edit_deletion(self, edit: Edit) -> Message:
         return Message(
             body=f"\x0314[[\x035 Edit Has Been Marked As Deleted \x0314]]\x0301 {edit.id}",
@@ -65,3 +77,12 @@ class Messages:
             body=f"\x0314[[\x032 New Edit Pending Review \x0314]]\x0301 {edit.id}",
             channel=settings.IRC_RELAY_CHANNEL_FEED,
         )
+
+    def notify_irc_about_edits_pending(self, edits: List[Edit]) -> Message:
+        if len(edits) == 1:
+            return self.notify_irc_about_edit_pending(edits[0])
+
+        return Message(
+            body=f"\x0314[[\x032 New Edits Pending Review \x0314]]\x0301 {len(edits)} edits added",
+            channel=settings.IRC_RELAY_CHANNEL_FEED,
+        )
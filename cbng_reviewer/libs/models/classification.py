@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class PendingClassification:
+    edit_id: int
+    user_id: int
+    classification: int
+    comment: Optional[str] = None
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ConsensusSimulation:
+    minimum_classifications: int
+    minimum_human_classifications: int
+    ratio: float
+    completed: int
+    newly_completed: int
+    no_longer_completed: int
+    changed_classification: int
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class DiffLine:
+    change_type: str  # "context", "change" or "gap"
+    previous_line_number: Optional[int] = None
+    previous_html: Optional[str] = None
+    current_line_number: Optional[int] = None
+    current_html: Optional[str] = None
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class EditEvent:
+    id: str
+    type: str  # "created", "classified", "completed", "deleted" or "training_data_imported"
+    edit_id: int
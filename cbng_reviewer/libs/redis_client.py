@@ -0,0 +1,12 @@
+import redis
+from django.conf import settings
+
+
+def get_redis_client() -> redis.Redis:
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        socket_connect_timeout=1,
+    )
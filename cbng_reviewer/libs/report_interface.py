@@ -3,7 +3,10 @@ from typing import Set
 
 import requests
 from django.conf import settings
+from django.db import transaction
 
+from cbng_reviewer.libs.edit_set.utils import add_edits_to_edit_group
+from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
 from cbng_reviewer.models import EditGroup, Edit
 
 logger = logging.getLogger(__name__)
@@ -24,22 +27,14 @@ class ReportInterface:
 
     def create_entries_for_reported_edits(self, include_in_progress: bool = False):
         edit_group, _ = EditGroup.objects.get_or_create(name=settings.CBNG_REPORT_EDIT_SET)
-        for edit_id in self.fetch_edit_ids_requiring_review(include_in_progress):
-            edit, created = Edit.objects.get_or_create(id=edit_id)
-            edit.classification = 1
-
-            if created:
-                logger.info(f"Created edit {edit.id}, adding to {edit_group.name}")
-                edit.groups.add(edit_group)
-
-            elif not edit.groups.filter(pk=edit_group.pk).exists():
-                logger.info(f"Adding edit {edit.id} to {edit_group.name}")
-                edit.groups.add(edit_group)
-
-            else:
-                logger.debug(f"Edit {edit.id} already exists if target group")
-
-            edit.save()
+        edit_ids = self.fetch_edit_ids_requiring_review(include_in_progress)
+        add_edits_to_edit_group(edit_group, edit_ids)
+
+        with transaction.atomic():
+            edits = Edit.objects.filter(id__in=edit_ids).exclude(classification=1)
+            previous_states = UserAccuracyTracker().get_edit_states(edits.values_list("id", flat=True))
+            edits.update(classification=1)
+            UserAccuracyTracker().apply_edit_changes(previous_states)
 
     def fetch_vandalism_score(self, edit_id: int) -> float | None:
         r = requests.get(
@@ -0,0 +1,284 @@
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, List, Dict, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Exists, OuterRef, QuerySet, Q
+from django.db.models.functions import Random, Coalesce
+from django.utils import timezone
+
+from cbng_reviewer.models import Edit, EditGroup, QueuedEdit, Classification, User
+
+logger = logging.getLogger(__name__)
+
+# Entries whose group has since been deleted are scheduled together, as a group of their own
+NO_EDIT_GROUP = 0
+
+
+class ReviewQueue:
+    """
+    Maintains `QueuedEdit`, a projection of the edits that are currently available for review.
+
+    Each entry carries the bucket (highest group weight & status) for the edit,
+    so selecting the next edit is an index seek on a single table rather than a scan over `Edit` x `groups`.
+
+    The highest group weight is also kept on `Edit.weight`, so (re)building the queue does not need the join either.
+
+    Optionally (`CBNG_REVIEW_QUEUE_FAIR_SHARE`) groups are served in proportion to their weight,
+    otherwise the highest weighted group is served until it is empty.
+    The fair share state is kept in the local cache, so selecting an edit never writes to the database.
+    Optionally (`CBNG_REVIEW_QUEUE_UNCERTAINTY`) edits with a core score closest to the threshold are served first,
+    within the bucket picked by the scheduler.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self._batch_size = batch_size
+
+    def _get_reviewable_edits(self, edit_ids: Optional[Iterable[int]] = None) -> QuerySet:
+        queryset = Edit.objects.filter(is_deleted=False, status__in=[0, 1], weight__gt=0)
+        if edit_ids is not None:
+            queryset = queryset.filter(id__in=edit_ids)
+        return queryset.values_list("id", "weight", "status", "core_score").order_by()
+
+    def _get_uncertainty(self, core_score: Optional[float]) -> Optional[float]:
+        if core_score is None:
+            return None
+        return abs(core_score - settings.CBNG_CORE_VANDALISM_THRESHOLD)
+
+    def _update_edit_weights(self, edit_ids: List[int]) -> None:
+        weights: Dict[int, List[int]] = defaultdict(list)
+        for edit_id, weight in (
+            Edit.objects.filter(id__in=edit_ids)
+            .annotate(group_weight=Coalesce(Max("groups__weight"), 0))
+            .values_list("id", "group_weight")
+            .order_by()
+        ):
+            weights[weight].append(edit_id)
+
+        for weight, weight_edit_ids in weights.items():
+            Edit.objects.filter(id__in=weight_edit_ids).exclude(weight=weight).update(weight=weight)
+
+    def _chunk(self, items: Iterable) -> Iterable[List]:
+        items = list(items)
+        for i in range(0, len(items), self._batch_size):
+            yield items[i : i + self._batch_size]
+
+    def _get_edit_groups(self, edit_ids: List[int]) -> Dict[int, int]:
+        # Each edit is scheduled as part of its highest weighted group
+        edit_groups: Dict[int, int] = {}
+        for edit_id, edit_group_id in (
+            Edit.groups.through.objects.filter(edit_id__in=edit_ids, editgroup__weight__gt=0)
+            .order_by("edit_id", "-editgroup__weight", "editgroup_id")
+            .values_list("edit_id", "editgroup_id")
+        ):
+            edit_groups.setdefault(edit_id, edit_group_id)
+        return edit_groups
+
+    def _refresh_chunk(self, edit_ids: List[int]) -> None:
+        self._update_edit_weights(edit_ids)
+        reviewable = {
+            edit_id: (weight, status, self._get_uncertainty(core_score))
+            for edit_id, weight, status, core_score in self._get_reviewable_edits(edit_ids)
+        }
+        edit_groups = self._get_edit_groups(list(reviewable.keys()))
+
+        with transaction.atomic():
+            QueuedEdit.objects.filter(edit_id__in=set(edit_ids) - reviewable.keys()).delete()
+            QueuedEdit.objects.bulk_create(
+                [
+                    QueuedEdit(
+                        edit_id=edit_id,
+                        weight=weight,
+                        status=status,
+                        edit_group_id=edit_groups.get(edit_id),
+                        uncertainty=uncertainty,
+                    )
+                    for edit_id, (weight, status, uncertainty) in reviewable.items()
+                ],
+                ignore_conflicts=True,
+            )
+
+            # Existing entries are not touched by `ignore_conflicts`, move them to the correct bucket
+            buckets: Dict[Tuple[int, int, Optional[int]], List[int]] = defaultdict(list)
+            for edit_id, (weight, status, _) in reviewable.items():
+                buckets[(weight, status, edit_groups.get(edit_id))].append(edit_id)
+
+            for (weight, status, edit_group_id), bucket_edit_ids in buckets.items():
+                QueuedEdit.objects.filter(edit_id__in=bucket_edit_ids).exclude(
+                    weight=weight, status=status, edit_group_id=edit_group_id
+                ).update(weight=weight, status=status, edit_group_id=edit_group_id, random_key=Random())
+
+            uncertainties: Dict[Optional[float], List[int]] = defaultdict(list)
+            for edit_id, (_, _, uncertainty) in reviewable.items():
+                uncertainties[uncertainty].append(edit_id)
+
+            for uncertainty, uncertainty_edit_ids in uncertainties.items():
+                QueuedEdit.objects.filter(edit_id__in=uncertainty_edit_ids).exclude(uncertainty=uncertainty).update(
+                    uncertainty=uncertainty
+                )
+
+    def refresh_edits(self, edit_ids: Iterable[int]) -> None:
+        for chunk in self._chunk(edit_ids):
+            self._refresh_chunk(chunk)
+
+    def refresh_edit_group(self, edit_group: EditGroup) -> None:
+        self.refresh_edits(Edit.objects.filter(groups=edit_group).values_list("id", flat=True))
+
+    def rebuild(self) -> int:
+        for chunk in self._chunk(Edit.objects.values_list("id", flat=True)):
+            self._update_edit_weights(chunk)
+
+        created = 0
+        with transaction.atomic():
+            QueuedEdit.objects.all().delete()
+            for chunk in self._chunk(self._get_reviewable_edits()):
+                edit_groups = self._get_edit_groups([edit_id for edit_id, _, _, _ in chunk])
+                created += len(
+                    QueuedEdit.objects.bulk_create(
+                        [
+                            QueuedEdit(
+                                edit_id=edit_id,
+                                weight=weight,
+                                status=status,
+                                edit_group_id=edit_groups.get(edit_id),
+                                uncertainty=self._get_uncertainty(core_score),
+                            )
+                            for edit_id, weight, status, core_score in chunk
+                        ]
+                    )
+                )
+        return created
+
+    def _get_unreserved_filter(self, user: User, now: datetime) -> Q:
+        return Q(reserved_until__isnull=True) | Q(reserved_until__lte=now) | Q(reserved_by=user)
+
+    def _get_available_edits(self, user: User, exclude_edit_ids: Iterable[int] = ()) -> QuerySet:
+        return (
+            QueuedEdit.objects.filter(self._get_unreserved_filter(user, timezone.now()))
+            .filter(~Exists(Classification.objects.filter(user=user, edit_id=OuterRef("edit_id"))))
+            .exclude(edit_id__in=exclude_edit_ids)
+            .order_by("random_key")
+        )
+
+    def _get_edit_id_by_uncertainty(self, bucket: QuerySet) -> Optional[int]:
+        # The edit scored closest to the vandalism threshold is the most informative to review
+        return (
+            bucket.filter(uncertainty__isnull=False)
+            .order_by("uncertainty", "edit_id")
+            .values_list("edit_id", flat=True)
+            .first()
+        )
+
+    def _get_edit_id_from_bucket(self, bucket: QuerySet) -> Optional[int]:
+        if settings.CBNG_REVIEW_QUEUE_UNCERTAINTY:
+            # Edits which are yet to be scored are served at random, once the scored edits in the bucket run out
+            if edit_id := self._get_edit_id_by_uncertainty(bucket):
+                return edit_id
+
+        # Seek to a random point in the bucket, wrapping around if there is nothing after it
+        start = random.random()  # nosec: B311
+        if edit_id := bucket.filter(random_key__gte=start).values_list("edit_id", flat=True).first():
+            return edit_id
+        return bucket.filter(random_key__lt=start).values_list("edit_id", flat=True).first()
+
+    def _get_next_edit_id_by_priority(self, available: QuerySet) -> Optional[int]:
+        # Loop over our buckets, ordered by weight and status, preferring a larger weight and in progress edits
+        for weight, status in (
+            QueuedEdit.objects.order_by("-weight", "-status").values_list("weight", "status").distinct()
+        ):
+            if edit_id := self._get_edit_id_from_bucket(available.filter(weight=weight, status=status)):
+                return edit_id
+        return None
+
+    def _get_fair_share_edit_groups(self) -> Dict[int, int]:
+        # The set of queued groups changes slowly, so is only re-read every `CBNG_REVIEW_QUEUE_GROUPS_CACHE_SECONDS`
+        return cache.get_or_set(
+            "review-queue-edit-groups",
+            lambda: {
+                edit_group_id or NO_EDIT_GROUP: weight
+                for edit_group_id, weight in QueuedEdit.objects.values_list("edit_group_id")
+                .annotate(Max("weight"))
+                .order_by()
+            },
+            settings.CBNG_REVIEW_QUEUE_GROUPS_CACHE_SECONDS,
+        )
+
+    def _get_fair_share_passes(self, edit_groups: Dict[int, int]) -> Dict[int, float]:
+        # Groups which have been idle (re-)join at the current pass, rather than catching up on missed turns
+        passes = cache.get("review-queue-passes", {})
+        current_pass = min((passes[key] for key in edit_groups if key in passes), default=0.0)
+        return {key: max(passes.get(key, current_pass), current_pass) for key in edit_groups}
+
+    def _advance_fair_share_pass(self, edit_group_key: int) -> None:
+        edit_groups = self._get_fair_share_edit_groups()
+        passes = self._get_fair_share_passes(edit_groups)
+        if edit_group_key in passes:
+            passes[edit_group_key] += 1.0 / edit_groups[edit_group_key]
+        cache.set("review-queue-passes", passes, None)
+
+    def _get_next_edit_id_by_fair_share(self, available: QuerySet) -> Tuple[Optional[int], Optional[int]]:
+        # Stride scheduling; the group with the lowest pass is served next, then advances by 1 / weight once
+        # an edit is reserved from it, so over time each group is served in proportion to its weight
+        edit_groups = self._get_fair_share_edit_groups()
+        passes = self._get_fair_share_passes(edit_groups)
+        for edit_group_key in sorted(edit_groups, key=lambda key: (passes[key], -edit_groups[key], key)):
+            if edit_group_key == NO_EDIT_GROUP:
+                edit_group_edits = available.filter(edit_group__isnull=True)
+            else:
+                edit_group_edits = available.filter(edit_group_id=edit_group_key)
+
+            for status in (1, 0):
+                if edit_id := self._get_edit_id_from_bucket(edit_group_edits.filter(status=status)):
+                    return edit_id, edit_group_key
+        return None, None
+
+    def _get_next_edit_id(
+        self, user: User, exclude_edit_ids: Iterable[int] = ()
+    ) -> Tuple[Optional[int], Optional[int]]:
+        available = self._get_available_edits(user, exclude_edit_ids)
+        if settings.CBNG_REVIEW_QUEUE_FAIR_SHARE:
+            return self._get_next_edit_id_by_fair_share(available)
+        return self._get_next_edit_id_by_priority(available), None
+
+    def get_next_edit_id(self, user: User, exclude_edit_ids: Iterable[int] = ()) -> Optional[int]:
+        return self._get_next_edit_id(user, exclude_edit_ids)[0]
+
+    def reserve_edit_ids(self, user: User, count: int) -> List[int]:
+        now = timezone.now()
+        reserved_until = now + timedelta(seconds=settings.CBNG_REVIEW_RESERVATION_SECONDS)
+
+        # Hand back anything we still hold first, so re-fetching does not leak reservations
+        edit_ids = list(
+            QueuedEdit.objects.filter(reserved_by=user, reserved_until__gt=now)
+            .filter(~Exists(Classification.objects.filter(user=user, edit_id=OuterRef("edit_id"))))
+            .order_by("-weight", "-status", "edit_id")
+            .values_list("edit_id", flat=True)[:count]
+        )
+
+        skipped_edit_ids = set()
+        while len(edit_ids) < count:
+            edit_id, edit_group_key = self._get_next_edit_id(user, set(edit_ids) | skipped_edit_ids)
+            if edit_id is None:
+                break
+
+            # Only take the edit if nobody else reserved it since we selected it
+            if (
+                QueuedEdit.objects.filter(edit_id=edit_id)
+                .filter(self._get_unreserved_filter(user, now))
+                .update(reserved_by=user, reserved_until=reserved_until)
+            ):
+                edit_ids.append(edit_id)
+                if edit_group_key is not None:
+                    self._advance_fair_share_pass(edit_group_key)
+            else:
+                skipped_edit_ids.add(edit_id)
+
+        QueuedEdit.objects.filter(edit_id__in=edit_ids).update(reserved_until=reserved_until)
+        return edit_ids
+
+    def release_edit_ids(self, user: User, edit_ids: Iterable[int]) -> None:
+        QueuedEdit.objects.filter(edit_id__in=edit_ids, reserved_by=user).update(reserved_by=None, reserved_until=None)
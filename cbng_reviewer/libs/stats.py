@@ -3,11 +3,10 @@ from typing import Tuple, Optional, List, Dict
 
 import requests
 from django.conf import settings
-from django.db import models
 from django.db.models import Count, Q
 
 from cbng_reviewer.models import EditGroup, Classification, Edit, TrainingData, CurrentRevision, PreviousRevision
-from cbng_reviewer.models import User
+from cbng_reviewer.models import User, UserAccuracy
 
 logger = logging.getLogger(__name__)
 
@@ -46,17 +45,7 @@ class Statistics:
 
     def calculate_user_accuracy(self, users: List[User]) -> Dict[int, Tuple[Optional[float], int]]:
         user_accuracy = {}
-        for row in (
-            Classification.objects.filter(user__in=users, edit__status=2)
-            .exclude(edit__classification=None)
-            .exclude(classification=2)
-            .exclude(edit__classification=2)
-            .values("user_id")
-            .annotate(
-                total=Count("id"),
-                correct=Count("id", filter=Q(classification=models.F("edit__classification"))),
-            )
-        ):
+        for row in UserAccuracy.objects.filter(user__in=users).values("user_id", "total", "correct"):
             accuracy = None
             if row["total"] > settings.CBNG_MINIMUM_EDITS_FOR_USER_ACCURACY:
                 accuracy = (row["correct"] / row["total"]) * 100.0 if row["correct"] > 0 else 0.0
@@ -0,0 +1,126 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from cbng_reviewer.models import Classification, Edit, User, UserAccuracy
+
+logger = logging.getLogger(__name__)
+
+
+class UserAccuracyTracker:
+    """
+    Maintains `UserAccuracy` as edits complete or change classification.
+
+    Each classification counts towards its user against the current state of the edit,
+    so the stored totals are adjusted by the difference whenever either side changes.
+    """
+
+    def _get_contribution(
+        self, classification: int, edit_status: int, edit_classification: Optional[int]
+    ) -> Tuple[int, int]:
+        if edit_status != 2 or edit_classification in {None, 2} or classification == 2:
+            return 0, 0
+        return 1, 1 if classification == edit_classification else 0
+
+    def _apply_deltas(self, deltas: Dict[int, Tuple[int, int]]) -> None:
+        users_by_delta = defaultdict(list)
+        for user_id, delta in deltas.items():
+            if delta != (0, 0):
+                users_by_delta[delta].append(user_id)
+        if not users_by_delta:
+            return
+
+        with transaction.atomic():
+            UserAccuracy.objects.bulk_create(
+                [UserAccuracy(user_id=user_id) for user_ids in users_by_delta.values() for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+            for (total, correct), user_ids in users_by_delta.items():
+                UserAccuracy.objects.filter(user_id__in=user_ids).update(
+                    total=F("total") + total, correct=F("correct") + correct
+                )
+
+    def get_edit_states(self, edit_ids: Iterable[int]) -> Dict[int, Tuple[int, Optional[int]]]:
+        return {
+            edit_id: (status, classification)
+            for edit_id, status, classification in Edit.objects.filter(id__in=edit_ids).values_list(
+                "id", "status", "classification"
+            )
+        }
+
+    def apply_classification(self, classification: Classification, direction: int) -> None:
+        self.apply_classifications([classification], direction)
+
+    def apply_classifications(self, classifications: Iterable[Classification], direction: int = 1) -> None:
+        # Classifications created or deleted without the model signals (e.g. `bulk_create`)
+        classifications = list(classifications)
+        edit_states = self.get_edit_states({classification.edit_id for classification in classifications})
+
+        deltas = defaultdict(lambda: (0, 0))
+        for classification in classifications:
+            if (edit_state := edit_states.get(classification.edit_id)) is None:
+                continue
+            contribution = self._get_contribution(classification.classification, *edit_state)
+            total, correct = deltas[classification.user_id]
+            deltas[classification.user_id] = (
+                total + contribution[0] * direction,
+                correct + contribution[1] * direction,
+            )
+        self._apply_deltas(deltas)
+
+    def apply_edit_changes(self, previous_states: Dict[int, Tuple[int, Optional[int]]]) -> None:
+        current_states = self.get_edit_states(previous_states.keys())
+        changed_edit_ids = [edit_id for edit_id, state in current_states.items() if previous_states[edit_id] != state]
+        if not changed_edit_ids:
+            return
+
+        deltas = defaultdict(lambda: (0, 0))
+        for edit_id, user_id, classification in Classification.objects.filter(edit_id__in=changed_edit_ids).values_list(
+            "edit_id", "user_id", "classification"
+        ):
+            previous_total, previous_correct = self._get_contribution(classification, *previous_states[edit_id])
+            current_total, current_correct = self._get_contribution(classification, *current_states[edit_id])
+            total, correct = deltas[user_id]
+            deltas[user_id] = (total + current_total - previous_total, correct + current_correct - previous_correct)
+        self._apply_deltas(deltas)
+
+    def recount_users(self, user_ids: Optional[Iterable[int]] = None) -> int:
+        classifications = (
+            Classification.objects.filter(edit__status=2)
+            .exclude(edit__classification=None)
+            .exclude(classification=2)
+            .exclude(edit__classification=2)
+        )
+        users = User.objects.all()
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            classifications = classifications.filter(user_id__in=user_ids)
+            users = users.filter(id__in=user_ids)
+
+        counts = {
+            row["user_id"]: (row["total"], row["correct"])
+            for row in classifications.values("user_id").annotate(
+                total=Count("id"), correct=Count("id", filter=Q(classification=F("edit__classification")))
+            )
+        }
+        existing = {
+            user_accuracy.user_id: user_accuracy for user_accuracy in UserAccuracy.objects.filter(user__in=users)
+        }
+
+        changed = 0
+        with transaction.atomic():
+            for user_id in users.values_list("id", flat=True):
+                total, correct = counts.get(user_id, (0, 0))
+                user_accuracy = existing.get(user_id)
+                if user_accuracy and (user_accuracy.total, user_accuracy.correct) == (total, correct):
+                    continue
+                if user_accuracy is None and total == 0:
+                    continue
+
+                logger.info(f"Updating accuracy for {user_id} to {correct} / {total}")
+                UserAccuracy.objects.update_or_create(user_id=user_id, defaults={"total": total, "correct": correct})
+                changed += 1
+        return changed
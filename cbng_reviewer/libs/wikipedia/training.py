@@ -1,8 +1,10 @@
 import logging
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import replace
 from datetime import datetime, timedelta
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Callable, Iterable
 
 import requests
 from django.conf import settings
@@ -14,6 +16,45 @@ from cbng_reviewer.models import Edit
 logger = logging.getLogger(__name__)
 
 
+class _LookupPool:
+    """
+    Runs the lookups for a single `build_wp_edit` call concurrently.
+
+    Each builder gets its own bounded pool, so concurrent builders do not queue behind each other.
+    The pool threads keep their replica connection across lookups, closing them once the build is done.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wikipedia-training")
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+
+    def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._connections_lock:
+            self._connections.add(connections["replica"])
+        return func(*args)
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        return self._executor.submit(self._run, func, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for connection in self._connections:
+            # The pool threads are done, so close their connections from here
+            connection.inc_thread_sharing()
+            try:
+                connection.close()
+            finally:
+                connection.dec_thread_sharing()
+        self._connections.clear()
+
+    def __enter__(self) -> "_LookupPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
 # These functions are similar to those in https://github.com/cluebotng/bot/blob/main/mysql_functions.php,
 # however we gate the upper bound of time to the time of an edit.
 #
@@ -30,36 +71,52 @@ class WikipediaTraining:
         title = title.replace(" ", "_")
         return title
 
-    def get_edit_metadata(self, revision_id: int) -> Tuple[Optional[str], Optional[str]]:
-        r = self._session.get(
-            "https://en.wikipedia.org/w/api.php",
-            headers={
-                "User-Agent": "ClueBot NG Reviewer - Wikipedia - Fetch Edit Metadata",
-            },
-            timeout=10,
-            params={
-                "format": "json",
-                "action": "query",
-                "rawcontinue": 1,
-                "prop": "revisions",
-                "rvslots": "*",
-                "revids": revision_id,
-                "rvprop": "timestamp",
-            },
-        )
-        r.raise_for_status()
-        data = r.json()
+    def get_edits_metadata(
+        self, revision_ids: Iterable[int], batch_size: int = 50
+    ) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+        revision_ids = list(revision_ids)
+        edits_metadata = {revision_id: (None, None) for revision_id in revision_ids}
+
+        # The API accepts up to 50 revids per request
+        for i in range(0, len(revision_ids), batch_size):
+            batch = revision_ids[i : i + batch_size]
+            r = self._session.get(
+                "https://en.wikipedia.org/w/api.php",
+                headers={
+                    "User-Agent": "ClueBot NG Reviewer - Wikipedia - Fetch Edit Metadata",
+                },
+                timeout=10,
+                params={
+                    "format": "json",
+                    "action": "query",
+                    "rawcontinue": 1,
+                    "prop": "revisions",
+                    "rvslots": "*",
+                    "revids": "|".join(str(revision_id) for revision_id in batch),
+                    "rvprop": "ids|timestamp",
+                },
+            )
+            r.raise_for_status()
+            data = r.json()
 
-        if "badrevids" in data.get("query", {}).keys():
-            logger.warning(f"Bad revision id {revision_id}")
-            return None, None
+            for revision_id in data.get("query", {}).get("badrevids", {}).keys():
+                logger.warning(f"Bad revision id {revision_id}")
 
-        page_data = next(iter(data.get("query", {}).get("pages", {}).values()), None)
-        if not page_data:
-            logger.warning(f"Found no pages for {revision_id}")
-            return None, None
+            for page_data in data.get("query", {}).get("pages", {}).values():
+                for revision in page_data.get("revisions", []):
+                    if revision.get("revid") in edits_metadata:
+                        edits_metadata[revision["revid"]] = (
+                            page_data["title"],
+                            settings.WIKIPEDIA_NAMESPACE_ID_TO_NAME[page_data["ns"]],
+                        )
+
+        for revision_id, (title, _) in edits_metadata.items():
+            if title is None:
+                logger.warning(f"Found no pages for {revision_id}")
+        return edits_metadata
 
-        return page_data["title"], settings.WIKIPEDIA_NAMESPACE_ID_TO_NAME[page_data["ns"]]
+    def get_edit_metadata(self, revision_id: int) -> Tuple[Optional[str], Optional[str]]:
+        return self.get_edits_metadata([revision_id])[revision_id]
 
     def _is_revision_minor(self, revision: Dict[str, Any]) -> bool:
         minor = revision.get("minor", False)
@@ -113,6 +170,8 @@ class WikipediaTraining:
                 comment=revisions[0].get("comment"),
                 text=current_text,
                 revision_id=revisions[0].get("revid"),
+                # Only the first revision of a page has no parent
+                is_creation=revisions[0].get("parentid") == 0,
             )
 
         if len(revisions) > 1:
@@ -129,38 +188,14 @@ class WikipediaTraining:
 
         return current_revision, previous_revision
 
-    def get_page_first_revision_id(self, page_title: str) -> Optional[int]:
-        r = self._session.get(
-            "https://en.wikipedia.org/w/api.php",
-            headers={
-                "User-Agent": "ClueBot NG Reviewer - Wikipedia - Fetch Page Revisions",
-            },
-            timeout=10,
-            params={
-                "format": "json",
-                "action": "query",
-                "prop": "revisions",
-                "titles": page_title,
-                "rvlimit": 1,
-                "rvdir": "newer",
-                "rvprop": "ids",
-            },
-        )
-        r.raise_for_status()
-        data = r.json()
-
-        if page_data := next(iter(data.get("query", {}).get("pages", {}).values()), None):
-            if revision := next(iter(page_data.get("revisions", [])), []):
-                return revision.get("revid")
-
-        return None
-
-    def get_page_creation_metadata(self, page_title: str, namespace: str) -> Tuple[Optional[datetime], Optional[str]]:
+    def get_page_creation_metadata(
+        self, page_title: str, namespace: str
+    ) -> Tuple[Optional[datetime], Optional[str], Optional[int]]:
         with connections["replica"].cursor() as cursor:
             cursor.execute(
                 """
                 -- ClueBot NG Reviewer - Wikipedia - Get Page Creation Metadata
-                SELECT `rev_timestamp`, `actor_name` FROM `page`
+                SELECT `rev_timestamp`, `actor_name`, `rev_id` FROM `page`
                 JOIN `revision` ON `rev_page` = `page_id`
                 JOIN `actor` ON `actor_id` = `rev_actor`
                 WHERE
@@ -177,16 +212,22 @@ class WikipediaTraining:
             )
             if row := cursor.fetchone():
                 if row[0]:
-                    return datetime.strptime(row[0].decode("utf-8"), "%Y%m%d%H%M%S"), row[1].decode("utf-8")
-        return None, None
+                    return datetime.strptime(row[0].decode("utf-8"), "%Y%m%d%H%M%S"), row[1].decode("utf-8"), row[2]
+        return None, None, None
 
-    def get_page_recent_edit_count(self, page_title: str, namespace: str, edit_time: datetime) -> Optional[int]:
+    def get_page_recent_activity(
+        self, page_title: str, namespace: str, edit_time: datetime
+    ) -> Tuple[Optional[int], Optional[int]]:
         with connections["replica"].cursor() as cursor:
             cursor.execute(
                 """
-                -- ClueBot NG Reviewer - Wikipedia - Get Page Recent Edit Count
-                SELECT COUNT(*) as count FROM `page`
+                -- ClueBot NG Reviewer - Wikipedia - Get Page Recent Activity
+                SELECT
+                    COUNT(*) AS `edit_count`,
+                    COALESCE(SUM(`comment_text` LIKE 'Revert%%'), 0) AS `revert_count`
+                FROM `page`
                 JOIN `revision` ON `rev_page` = `page_id`
+                LEFT JOIN `comment` ON `comment_id` = `rev_comment_id`
                 WHERE
                 `page_namespace` = %s
                 AND
@@ -206,37 +247,14 @@ class WikipediaTraining:
                 ],
             )
             if row := cursor.fetchone():
-                return row[0]
+                return row[0], int(row[1])
+        return None, None
+
+    def get_page_recent_edit_count(self, page_title: str, namespace: str, edit_time: datetime) -> Optional[int]:
+        return self.get_page_recent_activity(page_title, namespace, edit_time)[0]
 
     def get_page_recent_revert_count(self, page_title: str, namespace: str, edit_time: datetime) -> Optional[int]:
-        with connections["replica"].cursor() as cursor:
-            cursor.execute(
-                """
-                -- ClueBot NG Reviewer - Wikipedia - Get Page Recent Revert Count
-                SELECT COUNT(*) as count FROM `page`
-                JOIN `revision` ON `rev_page` = `page_id`
-                JOIN `comment` ON `comment_id` = `rev_comment_id`
-                WHERE
-                `page_namespace` = %s
-                AND
-                `page_title` = %s
-                AND
-                `rev_timestamp` > %s
-                AND
-                `rev_timestamp` < %s
-                AND `comment_text` LIKE 'Revert%%'
-                """,
-                [
-                    settings.WIKIPEDIA_NAMESPACE_NAME_TO_ID[namespace.lower()],
-                    self._clean_page_title(page_title),
-                    (edit_time - timedelta(days=settings.CBNG_RECENT_EDIT_WINDOW_DAYS)).strftime(
-                        "%Y%m%d%H%M%S"
-                    ),  # 'Recent Change window'
-                    edit_time.strftime("%Y%m%d%H%M%S"),
-                ],
-            )
-            if row := cursor.fetchone():
-                return row[0]
+        return self.get_page_recent_activity(page_title, namespace, edit_time)[1]
 
     def get_user_edit_count(self, username: str, edit_time: datetime) -> Optional[int]:
         with connections["replica"].cursor() as cursor:
@@ -325,50 +343,66 @@ class WikipediaTraining:
             if row := cursor.fetchone():
                 return row[0]
 
-    def build_wp_edit(self, edit: Edit) -> WpEdit:
+    def build_wp_edit(self, edit: Edit, edit_metadata: Optional[Tuple[Optional[str], Optional[str]]] = None) -> WpEdit:
+        with _LookupPool(max_workers=settings.CBNG_TRAINING_DATA_LOOKUP_WORKERS) as lookup_pool:
+            return self._build_wp_edit(lookup_pool, edit, edit_metadata)
+
+    def _build_wp_edit(
+        self,
+        lookup_pool: _LookupPool,
+        edit: Edit,
+        edit_metadata: Optional[Tuple[Optional[str], Optional[str]]] = None,
+    ) -> WpEdit:
         wp_edit = WpEdit(edit_id=edit.id)
-        page_title, page_namespace = self.get_edit_metadata(edit.id)
+        # Bulk callers pass in the title & namespace from `get_edits_metadata`
+        page_title, page_namespace = edit_metadata if edit_metadata else self.get_edit_metadata(edit.id)
         wp_edit = replace(wp_edit, title=page_title, namespace=page_namespace)
 
         if wp_edit.title and wp_edit.namespace:
-            page_created_at, page_created_by = self.get_page_creation_metadata(
-                page_title=wp_edit.title, namespace=wp_edit.namespace
+            page_creation_metadata = lookup_pool.submit(
+                self.get_page_creation_metadata, wp_edit.title, wp_edit.namespace
             )
+            current_revision, previous_revision = self.get_page_revisions(page_title=wp_edit.title, revision_id=edit.id)
+
+            page_created_at, page_created_by, page_first_revision_id = page_creation_metadata.result()
             wp_edit = replace(wp_edit, creator=page_created_by, page_made_time=page_created_at)
 
-            current_revision, previous_revision = self.get_page_revisions(page_title=wp_edit.title, revision_id=edit.id)
             if current_revision.has_complete_training_data:
+                # The replica knows the first revision of the page, fall back to the parent id when it does not
+                if page_first_revision_id is not None:
+                    current_revision = replace(
+                        current_revision, is_creation=page_first_revision_id == current_revision.revision_id
+                    )
                 wp_edit = replace(wp_edit, current=current_revision)
             if previous_revision.has_complete_training_data:
                 wp_edit = replace(wp_edit, previous=previous_revision, prev_user=previous_revision.user)
 
-        if wp_edit.previous is None and wp_edit.current is not None:
-            if revision_id := self.get_page_first_revision_id(page_title=wp_edit.title):
-                if revision_id == wp_edit.current.revision_id:
-                    wp_edit = replace(wp_edit, current=replace(wp_edit.current, is_creation=True))
-
+        # Everything else only depends on the page & current revision, so is looked up concurrently
+        lookups = {}
         if wp_edit.current:
-            wp_edit = replace(
-                wp_edit,
-                user=wp_edit.current.user,
-                comment=wp_edit.current.comment,
-                user_reg_time=self.get_user_registration_time(wp_edit.current.user),
-                user_edit_count=self.get_user_edit_count(wp_edit.current.user, wp_edit.current.timestamp),
-                user_distinct_pages=self._get_user_distinct_pages_count(
-                    wp_edit.current.user, wp_edit.current.timestamp
+            lookups |= {
+                "user_reg_time": lookup_pool.submit(self.get_user_registration_time, wp_edit.current.user),
+                "user_edit_count": lookup_pool.submit(
+                    self.get_user_edit_count, wp_edit.current.user, wp_edit.current.timestamp
                 ),
-                user_warns=self.get_user_warning_count(wp_edit.current.user, wp_edit.current.timestamp),
-            )
-
-        if wp_edit.title and wp_edit.namespace and wp_edit.current:
-            wp_edit = replace(
-                wp_edit,
-                num_recent_edits=self.get_page_recent_edit_count(
-                    wp_edit.title, wp_edit.namespace, wp_edit.current.timestamp
+                "user_distinct_pages": lookup_pool.submit(
+                    self._get_user_distinct_pages_count, wp_edit.current.user, wp_edit.current.timestamp
                 ),
-                num_recent_reversions=self.get_page_recent_revert_count(
-                    wp_edit.title, wp_edit.namespace, wp_edit.current.timestamp
+                "user_warns": lookup_pool.submit(
+                    self.get_user_warning_count, wp_edit.current.user, wp_edit.current.timestamp
                 ),
+            }
+
+        if wp_edit.title and wp_edit.namespace and wp_edit.current:
+            lookups["page_recent_activity"] = lookup_pool.submit(
+                self.get_page_recent_activity, wp_edit.title, wp_edit.namespace, wp_edit.current.timestamp
             )
 
-        return wp_edit
+        results = {name: future.result() for name, future in lookups.items()}
+        if page_recent_activity := results.pop("page_recent_activity", None):
+            results["num_recent_edits"], results["num_recent_reversions"] = page_recent_activity
+
+        if wp_edit.current:
+            wp_edit = replace(wp_edit, user=wp_edit.current.user, comment=wp_edit.current.comment)
+
+        return replace(wp_edit, **results)
@@ -1,9 +1,11 @@
 import logging
-from typing import Any
+from typing import Any, Iterator
 
 from django.core.management.base import CommandParser
 
+from cbng_reviewer.libs.bulk_classifications import BulkClassifications
 from cbng_reviewer.libs.core import Core
+from cbng_reviewer.libs.models.classification import PendingClassification
 from cbng_reviewer.models import User, Classification, EditGroup
 from cbng_reviewer.utils.command import CommandWithMetrics
 
@@ -13,18 +15,17 @@ logger = logging.getLogger(__name__)
 class Command(CommandWithMetrics):
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("edit-group")
+        parser.add_argument("--batch-size", type=int, default=1000)
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        """Add reviews from bot."""
-        edit_group = EditGroup.objects.get(name=options["edit-group"])
+    def _get_pending_classifications(self, edit_group: EditGroup, user: User) -> Iterator[PendingClassification]:
         core = Core()
-        user = User.objects.get(username="Bot - ClueBot NG")
+        our_classified_edits = set(Classification.objects.filter(user=user).values_list("edit_id", flat=True))
 
         for edit in edit_group.edit_set.all():
             if edit.is_deleted or not edit.has_training_data:
                 continue
 
-            if Classification.objects.filter(edit=edit, user=user).exists():
+            if edit.id in our_classified_edits:
                 logger.debug(f"Already have classification from {user} on {edit.id}")
             else:
                 is_vandalism, score = core.score_edit(edit)
@@ -32,10 +33,23 @@ class Command(CommandWithMetrics):
                     logger.warning(f"Got no data from core for {edit.id}")
                     continue
 
+                if edit.core_score is None:
+                    edit.core_score = score
+                    edit.save(update_fields=["core_score"])
+
                 logger.info(f"Leaving review for {edit.id} by {user.username} ({score})")
-                Classification.objects.create(
-                    edit=edit,
-                    user=user,
+                yield PendingClassification(
+                    edit_id=edit.id,
+                    user_id=user.id,
                     classification=0 if is_vandalism else 1,
                     comment=f"Core score: {score}",
                 )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Add reviews from bot."""
+        edit_group = EditGroup.objects.get(name=options["edit-group"])
+        user = User.objects.get(username="Bot - ClueBot NG")
+
+        BulkClassifications(batch_size=options["batch_size"]).store_in_batches(
+            self._get_pending_classifications(edit_group, user)
+        )
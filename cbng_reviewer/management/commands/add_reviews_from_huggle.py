@@ -1,10 +1,12 @@
 import logging
-from typing import Any
+from typing import Any, Iterator, List, Optional
 
 import requests
 from django.core.management.base import CommandParser
 from django.db.models import Q
 
+from cbng_reviewer.libs.bulk_classifications import BulkClassifications
+from cbng_reviewer.libs.models.classification import PendingClassification
 from cbng_reviewer.models import User, Edit, Classification, TrainingData
 from cbng_reviewer.utils.command import CommandWithMetrics
 
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 class Command(CommandWithMetrics):
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--edit-id")
+        parser.add_argument("--batch-size", type=int, default=1000)
 
     def _get_trusted_users(self):
         r = requests.get(
@@ -26,35 +29,41 @@ class Command(CommandWithMetrics):
         r.raise_for_status()
         return r.text.split("|")[0:-1]
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        """Add reviews from huggle."""
-        user, created = User.objects.get_or_create(username="Bot - Huggle")
-        if created:
-            user.is_bot = True
-            user.is_reviewer = True
-            user.save()
-
-        trusted_users = self._get_trusted_users()
-        our_classified_edits = Classification.objects.filter(user=user).values_list("edit__id", flat=True)
+    def _get_pending_classifications(
+        self, user: User, trusted_users: List[str], edit_id: Optional[str]
+    ) -> Iterator[PendingClassification]:
+        our_classified_edits = set(Classification.objects.filter(user=user).values_list("edit__id", flat=True))
 
-        if options["edit_id"]:
-            edits = Edit.objects.filter(id=options["edit_id"])
+        if edit_id:
+            edits = Edit.objects.filter(id=edit_id)
         else:
             edits = Edit.objects.filter(
                 ~Q(status=2) & ~Q(pk__in=our_classified_edits) & ~Q(is_deleted=True) & ~Q(has_training_data=False)
             )
 
+        training_data_users = dict(TrainingData.objects.filter(edit__in=edits).values_list("edit_id", "user"))
+
         for edit in edits:
             if edit.id in our_classified_edits:
                 logger.info(f"We have already processed {edit.id}")  # make --edit-id more friendly
                 continue
 
-            try:
-                training_data = TrainingData.objects.get(edit=edit)
-            except TrainingData.DoesNotExist:
+            if edit.id not in training_data_users:
                 # We will handle this after `import_training_data` has run
                 continue
 
-            if training_data.user in trusted_users:
+            if training_data_users[edit.id] in trusted_users:
                 logger.info(f"Leaving constructive review for {edit.id} by {user.username}")
-                Classification.objects.create(edit=edit, user=user, classification=1, comment="Trusted User")
+                yield PendingClassification(edit_id=edit.id, user_id=user.id, classification=1, comment="Trusted User")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Add reviews from huggle."""
+        user, created = User.objects.get_or_create(username="Bot - Huggle")
+        if created:
+            user.is_bot = True
+            user.is_reviewer = True
+            user.save()
+
+        BulkClassifications(batch_size=options["batch_size"]).store_in_batches(
+            self._get_pending_classifications(user, self._get_trusted_users(), options["edit_id"])
+        )
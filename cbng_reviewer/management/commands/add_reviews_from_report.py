@@ -1,11 +1,13 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
 from django.core.management.base import CommandParser
 
+from cbng_reviewer.libs.bulk_classifications import BulkClassifications
+from cbng_reviewer.libs.models.classification import PendingClassification
 from cbng_reviewer.libs.report_interface import ReportInterface
-from cbng_reviewer.models import User, Edit, Classification
+from cbng_reviewer.models import User, Edit
 from cbng_reviewer.utils.command import CommandWithMetrics
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 class Command(CommandWithMetrics):
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--edit-id")
+        parser.add_argument("--batch-size", type=int, default=1000)
 
     def _get_report_users(self) -> Dict[str, List[str]]:
         r = requests.get(
@@ -26,13 +29,12 @@ class Command(CommandWithMetrics):
         r.raise_for_status()
         return r.json()
 
-    def handle(self, *args: Any, **options: Any) -> None:
-        """Add reviews from reports."""
+    def _get_pending_classifications(self, target_edit_id: Optional[str]) -> Iterator[PendingClassification]:
         report_interface = ReportInterface()
         username_to_reviewers = {user.username: user for user in User.objects.filter(is_reviewer=True)}
 
         for edit_id, usernames in report_interface.fetch_deferred_users():
-            if options["edit_id"] not in {None, edit_id}:
+            if target_edit_id not in {None, edit_id}:
                 continue
 
             try:
@@ -49,12 +51,15 @@ class Command(CommandWithMetrics):
             for username in usernames:
                 # Most report admins are reviewers, but do not assume this
                 if user := username_to_reviewers.get(username):
-                    if Classification.objects.filter(edit=edit, user=user).exists():
-                        logger.debug(f"Already have classification from {user} on {edit.id}")
-                    else:
-                        logger.info(f"Leaving constructive review for {edit.id} by {user.username}")
-                        Classification.objects.create(
-                            edit=edit, user=user, classification=1, comment="Imported From Report Interface"
-                        )
+                    # Existing classifications are skipped by `BulkClassifications`
+                    yield PendingClassification(
+                        edit_id=edit.id, user_id=user.id, classification=1, comment="Imported From Report Interface"
+                    )
                 else:
                     logger.info(f"{username} is not a reviewer, ignoring for {edit.id}")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Add reviews from reports."""
+        BulkClassifications(batch_size=options["batch_size"]).store_in_batches(
+            self._get_pending_classifications(options["edit_id"])
+        )
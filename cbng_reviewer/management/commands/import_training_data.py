@@ -1,6 +1,6 @@
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+from typing import Any, Optional, Tuple
 
 from django.core.management import CommandParser
 
@@ -24,12 +24,12 @@ class Command(CommandWithMetrics):
         parser.add_argument("--edit-id")
         parser.add_argument("--force", action="store_true")
 
-    def _handle_edit(self, edit: Edit):
+    def _handle_edit(self, edit: Edit, edit_metadata: Tuple[Optional[str], Optional[str]]):
         if self._wikipedia_reader.has_revision_been_deleted(edit.id):
             logger.info("Found deleted revision, skipping training data import")
             return
 
-        wp_edit = self._wikipedia_training.build_wp_edit(edit)
+        wp_edit = self._wikipedia_training.build_wp_edit(edit, edit_metadata)
         if wp_edit.has_complete_training_data:
             logger.info(f"Importing training data from {wp_edit}")
             import_training_data(edit, wp_edit)
@@ -45,9 +45,13 @@ class Command(CommandWithMetrics):
             target_edits = target_edits.exclude(has_training_data=True)
 
         with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
-            futures = []
-            for edit in target_edits:
-                futures.append(executor.submit(self._handle_edit, edit))
+            futures, edits = [], list(target_edits)
+            # Resolve the pages in batches, rather than one API call per edit
+            for i in range(0, len(edits), 50):
+                batch = edits[i : i + 50]
+                edits_metadata = self._wikipedia_training.get_edits_metadata([edit.id for edit in batch])
+                for edit in batch:
+                    futures.append(executor.submit(self._handle_edit, edit, edits_metadata[edit.id]))
 
             for future in futures:
                 try:
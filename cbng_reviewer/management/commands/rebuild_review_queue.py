@@ -0,0 +1,13 @@
+import logging
+from typing import Any
+
+from cbng_reviewer.libs.review_queue import ReviewQueue
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Rebuild the review queue from the edit table."""
+        logger.info(f"Rebuilt review queue with {ReviewQueue().rebuild()} entries")
@@ -0,0 +1,13 @@
+import logging
+from typing import Any
+
+from cbng_reviewer.libs.edit_set.utils import repair_classification_counters
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Rebuild the classification counters on each edit."""
+        logger.info(f"Repaired classification counters for {repair_classification_counters()} edits")
@@ -0,0 +1,13 @@
+import logging
+from typing import Any
+
+from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Rebuild the per-user accuracy counts."""
+        logger.info(f"Repaired accuracy for {UserAccuracyTracker().recount_users()} users")
@@ -0,0 +1,25 @@
+import logging
+from typing import Any
+
+from cbng_reviewer.libs.core import Core
+from cbng_reviewer.models import Edit
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Store core scores for queued edits, used to rank the review queue by uncertainty."""
+        core = Core()
+        for edit in Edit.objects.filter(
+            queuededit__isnull=False, has_training_data=True, is_deleted=False, core_score__isnull=True
+        ):
+            _, score = core.score_edit(edit)
+            if score is None:
+                logger.warning(f"Got no data from core for {edit.id}")
+                continue
+
+            logger.info(f"Storing core score for {edit.id} ({score})")
+            edit.core_score = score
+            edit.save(update_fields=["core_score"])
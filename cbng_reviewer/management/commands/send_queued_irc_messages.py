@@ -0,0 +1,13 @@
+import logging
+from typing import Any
+
+from cbng_reviewer.libs.irc import IrcRelay
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Send any irc messages waiting in the outbox."""
+        logger.info(f"Sent {IrcRelay().send_queued_messages()} queued irc messages")
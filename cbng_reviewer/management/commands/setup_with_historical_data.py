@@ -10,7 +10,8 @@ from django.core.management import CommandParser
 
 from cbng_reviewer.libs.auth.utils import create_user
 from cbng_reviewer.libs.edit_set.parser import EditSetParser
-from cbng_reviewer.libs.edit_set.utils import import_wp_edit_to_edit_group
+from cbng_reviewer.libs.edit_set.utils import import_wp_edits_to_edit_group
+from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
 from cbng_reviewer.libs.utils import download_file
 from cbng_reviewer.models import User, EditGroup, Edit
 from cbng_reviewer.utils.command import CommandWithMetrics
@@ -86,10 +87,12 @@ class Command(CommandWithMetrics):
         target_group = EditGroup.objects.get(name="Legacy Report Interface Import")
         for edit_id, classification in self._load_file("historical_edit_classification.json").items():
             edit, _ = Edit.objects.get_or_create(id=edit_id)
+            previous_state = (edit.status, edit.classification)
             edit.classification = classification
             edit.status = 2
             edit.groups.add(target_group)
             edit.save()
+            UserAccuracyTracker().apply_edit_changes({edit.id: previous_state})
 
     def _ensure_edit_set_data(
         self, local_path: Optional[str] = None, name: Optional[str] = None, skip_existing: bool = False
@@ -105,7 +108,7 @@ class Command(CommandWithMetrics):
             target_group, _ = EditGroup.objects.get_or_create(name=group_name, related_to=target_parent_group)
 
             callback_func = functools.partial(
-                import_wp_edit_to_edit_group,
+                import_wp_edits_to_edit_group,
                 target_group=target_group,
                 skip_existing=skip_existing,
                 force_status=True,
@@ -114,14 +117,14 @@ class Command(CommandWithMetrics):
             if local_path:
                 source_file = PosixPath(local_path) / path
                 if source_file.exists():
-                    editset_parser.read_file(source_file, callback_func)
+                    editset_parser.read_file_in_batches(source_file, callback_func)
             else:
                 with tempfile.NamedTemporaryFile() as file:
                     source_url = f"https://cluebotng-editsets.toolforge.org/editdb/{path}"
                     target_file = PosixPath(file)
                     logger.info(f"Downloading {source_url} to {target_file.as_posix()}")
                     download_file(target_file, source_url)
-                    editset_parser.read_file(target_file, callback_func)
+                    editset_parser.read_file_in_batches(target_file, callback_func)
 
     def _ensure_edit_db_data(
         self, local_path: Optional[str] = None, name: Optional[str] = None, skip_existing: bool = False
@@ -131,7 +134,7 @@ class Command(CommandWithMetrics):
         editset_parser = EditSetParser()
 
         callback_func = functools.partial(
-            import_wp_edit_to_edit_group,
+            import_wp_edits_to_edit_group,
             target_group=target_parent_group,
             skip_existing=skip_existing,
             dynamic_group_from_source=True,
@@ -141,14 +144,14 @@ class Command(CommandWithMetrics):
         if local_path:
             source_file = PosixPath(local_path) / name
             if source_file.exists():
-                editset_parser.read_file(source_file, callback_func)
+                editset_parser.read_file_in_batches(source_file, callback_func)
         else:
             with tempfile.NamedTemporaryFile() as file:
                 source_url = f"https://cluebotng-editsets.toolforge.org/editdb/{name}"
                 target_file = PosixPath(file.name)
                 logger.info(f"Downloading {source_url} to {target_file.as_posix()}")
                 download_file(target_file, source_url)
-                editset_parser.read_file(target_file, callback_func)
+                editset_parser.read_file_in_batches(target_file, callback_func)
 
     def handle(self, *args: Any, **options: Any) -> None:
         if not options["editset_name"] and not options["editdb_name"]:
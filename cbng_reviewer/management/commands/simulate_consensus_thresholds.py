@@ -0,0 +1,43 @@
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import CommandParser
+
+from cbng_reviewer.libs.consensus_simulator import ConsensusSimulator
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--minimum-classifications",
+            type=int,
+            nargs="+",
+            default=[settings.CBNG_MINIMUM_CLASSIFICATIONS_FOR_EDIT],
+        )
+        parser.add_argument(
+            "--minimum-human-classifications",
+            type=int,
+            nargs="+",
+            default=[settings.CBNG_MINIMUM_HUMAN_CLASSIFICATIONS_FOR_EDIT],
+        )
+        parser.add_argument("--ratio", type=float, nargs="+", default=[3])
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Report how the consensus thresholds would change the outcome of classified edits."""
+        simulator = ConsensusSimulator()
+        for simulation in simulator.simulate_all(
+            options["minimum_classifications"], options["minimum_human_classifications"], options["ratio"]
+        ):
+            logger.info(
+                f"minimum={simulation.minimum_classifications} "
+                f"minimum_human={simulation.minimum_human_classifications} "
+                f"ratio={simulation.ratio}: "
+                f"{simulation.completed} completed, "
+                f"{simulation.newly_completed} newly completed, "
+                f"{simulation.no_longer_completed} no longer completed, "
+                f"{simulation.changed_classification} changed classification"
+            )
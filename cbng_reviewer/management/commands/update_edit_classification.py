@@ -1,10 +1,9 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from django.core.management import CommandParser
 
-from cbng_reviewer.models import Edit
+from cbng_reviewer.libs.edit_set.utils import bulk_update_edit_classification
 from cbng_reviewer.utils.command import CommandWithMetrics
 
 logger = logging.getLogger(__name__)
@@ -13,22 +12,12 @@ logger = logging.getLogger(__name__)
 class Command(CommandWithMetrics):
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--force", action="store_true")
-        parser.add_argument("--workers", type=int, default=5)
-
-    def _handle_edit(self, edit: Edit):
-        edit.update_classification()
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, help="Deprecated & ignored, edits are updated in chunks")
 
     def handle(self, *args: Any, **options: Any) -> None:
         """Update edit classification/status based on user classifications."""
-        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
-            futures = []
-            for edit in Edit.objects.all() if options["force"] else Edit.objects.exclude(status=2):
-                executor.submit(self._handle_edit, edit)
-
-            for future in futures:
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.exception(e)
-
-            executor.shutdown()
+        if options["workers"] is not None:
+            logger.warning("--workers is deprecated and ignored, use --batch-size to size each chunk")
+        changed_edits = bulk_update_edit_classification(options["force"], options["batch_size"])
+        logger.info(f"Updated classification for {len(changed_edits)} edits")
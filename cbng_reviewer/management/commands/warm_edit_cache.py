@@ -0,0 +1,21 @@
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import CommandParser
+
+from cbng_reviewer.libs.edit_cache import EditCache
+from cbng_reviewer.utils.command import CommandWithMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CommandWithMetrics):
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--max-edits", type=int, default=settings.CBNG_EDIT_CACHE_WARM_MAX_EDITS)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Cache the WPEdit & diff for the edits currently reserved by reviewers."""
+        edit_cache = EditCache()
+        edit_ids = edit_cache.get_reserved_edit_ids(options["max_edits"])
+        logger.info(f"Warmed cache for {edit_cache.warm(edit_ids)} edits")
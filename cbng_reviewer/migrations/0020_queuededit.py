@@ -0,0 +1,51 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def populate_review_queue(apps, schema_editor):
+    Edit = apps.get_model("cbng_reviewer", "Edit")
+    QueuedEdit = apps.get_model("cbng_reviewer", "QueuedEdit")
+    QueuedEdit.objects.bulk_create(
+        [
+            QueuedEdit(edit_id=edit_id, weight=weight, status=status)
+            for edit_id, weight, status in Edit.objects.filter(is_deleted=False, status__in=[0, 1])
+            .annotate(weight=Max("groups__weight"))
+            .filter(weight__gt=0)
+            .values_list("id", "weight", "status")
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0019_rename_cbng_review_user_id_clienterror_idx_cbng_review_user_id_92b058_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedEdit",
+            fields=[
+                (
+                    "edit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="cbng_reviewer.edit",
+                    ),
+                ),
+                ("weight", models.IntegerField()),
+                ("status", models.IntegerField(choices=[(0, "Pending"), (1, "Partial"), (2, "Done")])),
+            ],
+            options={
+                "indexes": [models.Index(fields=["weight", "status", "edit"], name="cbng_review_weight_84b56c_idx")],
+            },
+        ),
+        migrations.RunPython(populate_review_queue, migrations.RunPython.noop),
+    ]
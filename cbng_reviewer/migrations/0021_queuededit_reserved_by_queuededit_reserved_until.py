@@ -0,0 +1,27 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0020_queuededit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queuededit",
+            name="reserved_by",
+            field=models.ForeignKey(
+                blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddField(
+            model_name="queuededit",
+            name="reserved_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
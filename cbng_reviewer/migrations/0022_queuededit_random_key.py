@@ -0,0 +1,35 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:04
+
+import cbng_reviewer.models
+from django.db import migrations, models
+from django.db.models.functions import Random
+
+
+def randomise_existing_keys(apps, schema_editor):
+    # AddField evaluates the default once, give every existing entry its own key
+    QueuedEdit = apps.get_model("cbng_reviewer", "QueuedEdit")
+    QueuedEdit.objects.update(random_key=Random())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0021_queuededit_reserved_by_queuededit_reserved_until"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="queuededit",
+            name="cbng_review_weight_84b56c_idx",
+        ),
+        migrations.AddField(
+            model_name="queuededit",
+            name="random_key",
+            field=models.FloatField(default=cbng_reviewer.models.generate_random_key),
+        ),
+        migrations.RunPython(randomise_existing_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="queuededit",
+            index=models.Index(fields=["weight", "status", "random_key"], name="cbng_review_weight_96087a_idx"),
+        ),
+    ]
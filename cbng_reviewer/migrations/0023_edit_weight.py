@@ -0,0 +1,30 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:06
+
+from django.db import migrations, models
+
+
+def populate_edit_weight(apps, schema_editor):
+    Edit = apps.get_model("cbng_reviewer", "Edit")
+    EditGroup = apps.get_model("cbng_reviewer", "EditGroup")
+    for edit_group in EditGroup.objects.filter(weight__gt=0).order_by("weight"):
+        Edit.objects.filter(groups=edit_group, weight__lt=edit_group.weight).update(weight=edit_group.weight)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0022_queuededit_random_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="edit",
+            name="weight",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_edit_weight, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="edit",
+            index=models.Index(fields=["is_deleted", "status", "weight"], name="cbng_review_is_dele_7bc7a4_idx"),
+        ),
+    ]
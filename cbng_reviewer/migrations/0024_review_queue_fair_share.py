@@ -0,0 +1,39 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_queued_edit_group(apps, schema_editor):
+    EditGroup = apps.get_model("cbng_reviewer", "EditGroup")
+    QueuedEdit = apps.get_model("cbng_reviewer", "QueuedEdit")
+    # Later groups win, leaving each entry on its highest weighted group
+    for edit_group in EditGroup.objects.filter(weight__gt=0).order_by("weight", "-id"):
+        QueuedEdit.objects.filter(edit__groups=edit_group).update(edit_group=edit_group)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0023_edit_weight"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="editgroup",
+            name="queue_pass",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="queuededit",
+            name="edit_group",
+            field=models.ForeignKey(
+                blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to="cbng_reviewer.editgroup"
+            ),
+        ),
+        migrations.RunPython(populate_queued_edit_group, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="queuededit",
+            index=models.Index(fields=["edit_group", "status", "random_key"], name="cbng_review_edit_gr_f08bf7_idx"),
+        ),
+    ]
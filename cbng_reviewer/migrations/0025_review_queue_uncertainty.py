@@ -0,0 +1,27 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0024_review_queue_fair_share"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="edit",
+            name="core_score",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="queuededit",
+            name="uncertainty",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="queuededit",
+            index=models.Index(fields=["uncertainty", "edit"], name="cbng_review_uncerta_c3f1c3_idx"),
+        ),
+    ]
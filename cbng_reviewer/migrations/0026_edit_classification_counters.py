@@ -0,0 +1,64 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:14
+
+from django.db import migrations, models
+from django.db.models import Count, Case, When, IntegerField
+
+
+def populate_classification_counters(apps, schema_editor):
+    Edit = apps.get_model("cbng_reviewer", "Edit")
+    Classification = apps.get_model("cbng_reviewer", "Classification")
+
+    edits = []
+    for row in (
+        Classification.objects.values("edit_id")
+        .annotate(
+            vandalism_classifications=Count(Case(When(classification=0, then=1), output_field=IntegerField())),
+            constructive_classifications=Count(Case(When(classification=1, then=1), output_field=IntegerField())),
+            skipped_classifications=Count(Case(When(classification=2, then=1), output_field=IntegerField())),
+            human_classifications=Count(Case(When(user__is_bot=False, then=1), output_field=IntegerField())),
+        )
+        .order_by()
+    ):
+        edits.append(Edit(id=row.pop("edit_id"), **row))
+
+    Edit.objects.bulk_update(
+        edits,
+        [
+            "vandalism_classifications",
+            "constructive_classifications",
+            "skipped_classifications",
+            "human_classifications",
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0025_review_queue_uncertainty"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="edit",
+            name="constructive_classifications",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="edit",
+            name="human_classifications",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="edit",
+            name="skipped_classifications",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="edit",
+            name="vandalism_classifications",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_classification_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def populate_user_accuracy(apps, schema_editor):
+    Classification = apps.get_model("cbng_reviewer", "Classification")
+    UserAccuracy = apps.get_model("cbng_reviewer", "UserAccuracy")
+
+    UserAccuracy.objects.bulk_create(
+        [
+            UserAccuracy(user_id=row["user_id"], total=row["total"], correct=row["correct"])
+            for row in Classification.objects.filter(edit__status=2)
+            .exclude(edit__classification=None)
+            .exclude(classification=2)
+            .exclude(edit__classification=2)
+            .values("user_id")
+            .annotate(total=Count("id"), correct=Count("id", filter=Q(classification=F("edit__classification"))))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0026_edit_classification_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserAccuracy",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("total", models.IntegerField(default=0)),
+                ("correct", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_user_accuracy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0027_user_accuracy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IrcOutboxMessage",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("channel", models.CharField(max_length=255)),
+                ("body", models.TextField()),
+                ("attempts", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.13 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0028_irc_outbox"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="queuededit",
+            name="cbng_review_uncerta_c3f1c3_idx",
+        ),
+        migrations.AddIndex(
+            model_name="queuededit",
+            index=models.Index(fields=["weight", "status", "uncertainty"], name="cbng_review_weight_3e6134_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="queuededit",
+            index=models.Index(fields=["edit_group", "status", "uncertainty"], name="cbng_review_edit_gr_3554f4_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.13 on 2026-10-18 05:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0029_queued_edit_bucket_uncertainty_index"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="editgroup",
+            name="queue_pass",
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cbng_reviewer", "0030_remove_editgroup_queue_pass"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ircoutboxmessage",
+            name="claimed_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
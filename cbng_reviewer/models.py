@@ -1,20 +1,34 @@
 import logging
-from typing import Optional
+import random
+from typing import Optional, Dict
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.db.models import Count, Case, When, IntegerField
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
 from social_django.models import UserSocialAuth
 
 from cbng_reviewer.hooks import (
     notify_irc_about_deleted_account,
     notify_irc_about_pending_account,
-    update_edit_classification_from_classification,
-    import_training_data_for_edit,
-    notify_irc_about_pending_edit,
+    send_classified_many_from_classification,
+    send_created_many_from_edit,
+    update_edit_classification_from_classified_edits,
+    import_training_data_for_created_edits,
+    notify_irc_about_created_edits,
+    publish_created_edit_events,
+    publish_classified_edit_events,
+    update_review_queue_from_edit,
+    update_review_queue_from_edit_groups,
+    track_edit_group_weight_change,
+    update_review_queue_from_edit_group,
+    update_edit_counters_from_classification,
+    update_edit_counters_from_deleted_classification,
+    update_user_accuracy_from_classification,
+    update_user_accuracy_from_deleted_classification,
 )
+from cbng_reviewer.signals import created_many, classified_many
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +43,17 @@ CLASSIFICATIONS = (
     (2, "Skipped"),
 )
 CLASSIFICATION_IDS = {i for i, _ in CLASSIFICATIONS}
+CLASSIFICATION_COUNTER_FIELDS = {
+    0: "vandalism_classifications",
+    1: "constructive_classifications",
+    2: "skipped_classifications",
+}
+CLASSIFICATION_COUNTER_AGGREGATES = {
+    "vandalism_classifications": Count(Case(When(classification=0, then=1), output_field=IntegerField())),
+    "constructive_classifications": Count(Case(When(classification=1, then=1), output_field=IntegerField())),
+    "skipped_classifications": Count(Case(When(classification=2, then=1), output_field=IntegerField())),
+    "human_classifications": Count(Case(When(user__is_bot=False, then=1), output_field=IntegerField())),
+}
 EDIT_SET_TYPES = (
     (0, "Generic"),
     (1, "Reported False Positives"),
@@ -37,6 +62,35 @@ EDIT_SET_TYPES = (
 )
 
 
+def generate_random_key() -> float:
+    return random.random()  # nosec: B311
+
+
+def get_consensus_classification(
+    vandalism: int,
+    constructive: int,
+    skipped: int,
+    human_classifications: int,
+    minimum_classifications: int,
+    minimum_human_classifications: int,
+    ratio: float = 3,
+) -> Optional[int]:
+    """Return the agreed classification for the given counts, if there is one."""
+    if (
+        max(constructive, vandalism, skipped) < minimum_classifications
+        or human_classifications < minimum_human_classifications
+    ):
+        return None
+
+    if 2 * skipped > vandalism + constructive + skipped:
+        return 2
+    if constructive >= ratio * vandalism:
+        return 1
+    if vandalism >= ratio * constructive:
+        return 0
+    return None
+
+
 class User(AbstractUser):
     is_reviewer = models.BooleanField(default=False)
     is_admin = models.BooleanField(default=False)
@@ -93,6 +147,9 @@ class Edit(models.Model):
     status = models.IntegerField(choices=STATUSES, default=0)
     classification = models.IntegerField(choices=CLASSIFICATIONS, null=True)
 
+    # Highest weight of our groups, maintained by `ReviewQueue` so the queue does not need to join on `groups`
+    weight = models.IntegerField(default=0)
+
     # Internal flags
     is_deleted = models.BooleanField(default=False)
     has_training_data = models.BooleanField(default=False)
@@ -101,6 +158,13 @@ class Edit(models.Model):
     last_updated = models.DateTimeField(auto_now_add=True)
     number_of_reviewers = models.IntegerField(default=0)
     number_of_agreeing_reviewers = models.IntegerField(default=0)
+    core_score = models.FloatField(null=True, blank=True)
+
+    # Classification counters, maintained by the `Classification` signals
+    vandalism_classifications = models.IntegerField(default=0)
+    constructive_classifications = models.IntegerField(default=0)
+    skipped_classifications = models.IntegerField(default=0)
+    human_classifications = models.IntegerField(default=0)
 
     def update_training_data_flag(self, force: bool = False):
         if self.has_training_data and not force:
@@ -117,24 +181,19 @@ class Edit(models.Model):
             self.has_training_data = has_training_data
             self.save(update_fields=["has_training_data"])
 
-    def update_classification(
+    def apply_classification_counters(
         self,
         skip_completed_with_no_internal_classifications: bool = True,
         skip_deleted_edits_with_classifications: bool = True,
     ) -> bool:
+        """Apply the consensus rules to the in-memory classification counters, without saving."""
         original_status, original_classification = self.status, self.classification
 
-        counts = Classification.objects.filter(edit=self).aggregate(
-            vandalism=Count(Case(When(classification=0, then=1), output_field=IntegerField())),
-            constructive=Count(Case(When(classification=1, then=1), output_field=IntegerField())),
-            skipped=Count(Case(When(classification=2, then=1), output_field=IntegerField())),
-            human=Count(Case(When(user__is_bot=False, then=1), output_field=IntegerField())),
-        )
         vandalism, constructive, skipped, human_classifications = (
-            counts["vandalism"],
-            counts["constructive"],
-            counts["skipped"],
-            counts["human"],
+            self.vandalism_classifications,
+            self.constructive_classifications,
+            self.skipped_classifications,
+            self.human_classifications,
         )
         total_classifications = vandalism + constructive + skipped
 
@@ -151,30 +210,24 @@ class Edit(models.Model):
             return False
 
         self.status = 0 if total_classifications == 0 else 1
-        if (
-            max(constructive, max(vandalism, skipped)) >= settings.CBNG_MINIMUM_CLASSIFICATIONS_FOR_EDIT
-            and human_classifications >= settings.CBNG_MINIMUM_HUMAN_CLASSIFICATIONS_FOR_EDIT
-        ):
-            if 2 * skipped > vandalism + constructive + skipped:
-                self.classification = 2
-                self.status = 2
-
-            elif constructive >= 3 * vandalism:
-                self.classification = 1
-                self.status = 2
-
-            elif vandalism >= 3 * constructive:
-                self.classification = 0
-                self.status = 2
+        classification = get_consensus_classification(
+            vandalism,
+            constructive,
+            skipped,
+            human_classifications,
+            settings.CBNG_MINIMUM_CLASSIFICATIONS_FOR_EDIT,
+            settings.CBNG_MINIMUM_HUMAN_CLASSIFICATIONS_FOR_EDIT,
+        )
+        if classification is not None:
+            self.classification = classification
+            self.status = 2
 
         if self.status == 2:
             original_number_of_reviewers = self.number_of_reviewers
-            self.number_of_reviewers = Classification.objects.filter(edit=self).count()
+            self.number_of_reviewers = total_classifications
 
             original_number_of_agreeing_reviewers = self.number_of_agreeing_reviewers
-            self.number_of_agreeing_reviewers = Classification.objects.filter(
-                edit=self, classification=self.classification
-            ).count()
+            self.number_of_agreeing_reviewers = {0: vandalism, 1: constructive, 2: skipped}[self.classification]
 
             if (
                 self.number_of_reviewers != original_number_of_reviewers
@@ -186,22 +239,49 @@ class Edit(models.Model):
 
         if self.status != original_status or self.classification != original_classification:
             logger.info(f"Updating {self.id} to {self.get_classification_display()} [{self.get_status_display()}]")
+        return True
+
+    def update_classification(
+        self,
+        skip_completed_with_no_internal_classifications: bool = True,
+        skip_deleted_edits_with_classifications: bool = True,
+    ) -> bool:
+        original_status, original_classification = self.status, self.classification
+
+        self.refresh_from_db(fields=list(CLASSIFICATION_COUNTER_AGGREGATES.keys()))
+        if not self.apply_classification_counters(
+            skip_completed_with_no_internal_classifications, skip_deleted_edits_with_classifications
+        ):
+            return False
 
         if self.status != original_status and self.status == 2 and self.classification is not None:
             from cbng_reviewer.libs.irc import IrcRelay
             from cbng_reviewer.libs.messages import Messages
 
-            IrcRelay().send_message(Messages().notify_irc_about_edit_completion(self))
+            from cbng_reviewer.libs.edit_events import EditEventStream
+
+            IrcRelay().queue_message(Messages().notify_irc_about_edit_completion(self))
+            EditEventStream().publish("completed", [self.id])
+
+        # Leave the counters alone, they may have been incremented since we read them
+        self.save(update_fields=["status", "classification", "number_of_reviewers", "number_of_agreeing_reviewers"])
+
+        if self.status != original_status or self.classification != original_classification:
+            from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
 
-        self.save()
+            UserAccuracyTracker().apply_edit_changes({self.id: (original_status, original_classification)})
         return True
 
+    def get_classification_counts(self) -> Dict[str, int]:
+        return Classification.objects.filter(edit=self).aggregate(**CLASSIFICATION_COUNTER_AGGREGATES)
+
     class Meta:
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["is_deleted"]),
             models.Index(fields=["has_training_data"]),
             models.Index(fields=["is_deleted", "status"]),
+            models.Index(fields=["is_deleted", "status", "weight"]),
         ]
 
 
@@ -216,6 +296,38 @@ class Classification(models.Model):
         constraints = [models.UniqueConstraint(fields=["edit", "user"], name="one_edit_classification_per_user")]
 
 
+class UserAccuracy(models.Model):
+    # Classifications by the user on completed (non-skipped) edits, maintained by `UserAccuracyTracker`
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    total = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+
+
+class QueuedEdit(models.Model):
+    edit = models.OneToOneField(Edit, on_delete=models.CASCADE, primary_key=True)
+    weight = models.IntegerField()
+    status = models.IntegerField(choices=STATUSES)
+    edit_group = models.ForeignKey(EditGroup, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Distance of the core score from the vandalism threshold, lower is more informative to review
+    uncertainty = models.FloatField(null=True, blank=True)
+
+    # Random sort key, re-rolled when the entry changes bucket, so a random edit can be found with an index seek
+    random_key = models.FloatField(default=generate_random_key)
+
+    # Short-lived hold for a reviewer who has pre-fetched the edit
+    reserved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    reserved_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["weight", "status", "random_key"]),
+            models.Index(fields=["edit_group", "status", "random_key"]),
+            models.Index(fields=["weight", "status", "uncertainty"]),
+            models.Index(fields=["edit_group", "status", "uncertainty"]),
+        ]
+
+
 class CurrentRevision(models.Model):
     edit = models.OneToOneField(Edit, on_delete=models.CASCADE)
     is_minor = models.BooleanField()
@@ -252,6 +364,15 @@ class TrainingData(models.Model):
     page_num_recent_reverts = models.IntegerField()
 
 
+class IrcOutboxMessage(models.Model):
+    created = models.DateTimeField(auto_now_add=True)
+    channel = models.CharField(max_length=255)
+    body = models.TextField()
+    attempts = models.IntegerField(default=0)
+    # Set while a drainer is sending the message
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
+
 class ClientError(models.Model):
     user = models.ForeignKey(User, on_delete=models.PROTECT)
     created = models.DateTimeField(auto_now_add=True)
@@ -269,9 +390,23 @@ class ClientError(models.Model):
         ]
 
 
+# The review queue & counters are internal state, so are maintained regardless of the environment
+post_save.connect(update_edit_counters_from_classification, sender=Classification)
+post_delete.connect(update_edit_counters_from_deleted_classification, sender=Classification)
+post_save.connect(update_user_accuracy_from_classification, sender=Classification)
+post_delete.connect(update_user_accuracy_from_deleted_classification, sender=Classification)
+post_save.connect(update_review_queue_from_edit, sender=Edit)
+pre_save.connect(track_edit_group_weight_change, sender=EditGroup)
+post_save.connect(update_review_queue_from_edit_group, sender=EditGroup)
+m2m_changed.connect(update_review_queue_from_edit_groups, sender=Edit.groups.through)
+
 if not settings.IN_TEST:
     pre_delete.connect(notify_irc_about_deleted_account, sender=User)
     post_save.connect(notify_irc_about_pending_account, sender=User)
-    post_save.connect(update_edit_classification_from_classification, sender=Classification)
-    post_save.connect(import_training_data_for_edit, sender=Edit)
-    post_save.connect(notify_irc_about_pending_edit, sender=Edit)
+    post_save.connect(send_classified_many_from_classification, sender=Classification)
+    post_save.connect(send_created_many_from_edit, sender=Edit)
+    classified_many.connect(update_edit_classification_from_classified_edits, sender=Classification)
+    created_many.connect(import_training_data_for_created_edits, sender=Edit)
+    created_many.connect(notify_irc_about_created_edits, sender=Edit)
+    created_many.connect(publish_created_edit_events, sender=Edit)
+    classified_many.connect(publish_classified_edit_events, sender=Classification)
@@ -221,6 +221,7 @@ REDIS_HOST = CONFIG["redis"]["host"]
 REDIS_PORT = CONFIG["redis"]["port"]
 REDIS_DB = CONFIG["redis"]["db"]
 REDIS_PASSWORD = CONFIG["redis"]["password"]
+REDIS_EDIT_CACHE_DB = CONFIG["redis"]["edit_cache_db"]
 
 CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
@@ -232,6 +233,40 @@ CELERY_BROKER_URL = (
     else f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
 )
 CELERY_BROKER_CONNECTION_TIMEOUT = 1
+CELERY_BEAT_SCHEDULE = {
+    # Picks up anything left in the outbox, for example when the drain scheduled on commit was lost
+    "send-queued-irc-messages": {
+        "task": "cbng_reviewer.tasks.send_queued_irc_messages",
+        "schedule": 300,
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Rendered WPEdit payloads & diffs, shared between the web and celery workers.
+    # A separate database on the same Redis instance shares its maxmemory & eviction policy with the celery queues,
+    # so `EditCache` bounds its own size; every entry expires, is capped in size & lives in a fixed set of slots.
+    "edits": (
+        {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "edits",
+            "OPTIONS": {"MAX_ENTRIES": 500},
+        }
+        if IN_TEST
+        else {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": (
+                f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_EDIT_CACHE_DB}"
+                if REDIS_PASSWORD
+                else f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_EDIT_CACHE_DB}"
+            ),
+            "KEY_PREFIX": "cbng_reviewer",
+            "TIMEOUT": 3600,
+        }
+    ),
+}
 
 CBNG_MINIMUM_CLASSIFICATIONS_FOR_EDIT = 2
 CBNG_MINIMUM_HUMAN_CLASSIFICATIONS_FOR_EDIT = 1
@@ -242,9 +277,28 @@ CBNG_SAMPLED_EDITS_QUANTITY = 1  # An edit a day keeps the daemons at bay
 CBNG_SAMPLED_EDITS_LOOKBACK_DAYS = 7
 CBNG_SAMPLED_EDITS_EDIT_SET = "Sampled Main Namespace Edits"
 CBNG_REPORT_EDIT_SET = "Report Interface Import"
+CBNG_REVIEW_RESERVATION_SECONDS = 300
+CBNG_REVIEW_RESERVATION_MAX_EDITS = 10
+CBNG_REVIEW_QUEUE_FAIR_SHARE = False  # Serve groups in proportion to their weight, rather than strictly by weight
+CBNG_REVIEW_QUEUE_GROUPS_CACHE_SECONDS = 60
+CBNG_REVIEW_QUEUE_UNCERTAINTY = False  # Serve edits with a core score closest to the threshold first
+CBNG_CORE_VANDALISM_THRESHOLD = 0.95  # Changing this requires `rebuild_review_queue`
+CBNG_EDIT_CACHE_WARM_MAX_EDITS = 200
+CBNG_EDIT_CACHE_MAX_ENTRY_BYTES = 512 * 1024
+CBNG_EDIT_CACHE_SLOTS = 500  # Per payload type, so at most 2 * 500 * 512KiB
+CBNG_EDIT_CLASSIFICATION_DEBOUNCE_SECONDS = 5
+CBNG_BULK_CLASSIFICATION_MAX_ENTRIES = 5000
+CBNG_IRC_OUTBOX_SEND_INTERVAL_SECONDS = 0.5
+CBNG_IRC_OUTBOX_RETRY_SECONDS = 60
+CBNG_IRC_OUTBOX_MAX_ATTEMPTS = 5
+CBNG_IRC_OUTBOX_BATCH_SIZE = 20
+CBNG_IRC_OUTBOX_CLAIM_SECONDS = 120  # Comfortably longer than sending a batch takes
+CBNG_EDIT_EVENT_STREAM_MAX_LENGTH = 1000000
+CBNG_TRAINING_DATA_LOOKUP_WORKERS = 4  # Per build, each lookup thread holds one replica connection
 CBNG_ADMIN_ONLY = CONFIG["cbng"]["admin_only"]
 CBNG_ENABLE_IRC_MESSAGING = CONFIG["cbng"]["enable_irc_messaging"]
 CBNG_ENABLE_USER_MESSAGING = CONFIG["cbng"]["enable_user_messaging"]
+CBNG_ENABLE_EDIT_EVENT_STREAM = CONFIG["cbng"]["enable_edit_event_stream"]
 
 # No default metrics
 PROMETHEUS_METRIC_NAMESPACE = "cbng_reviewer"
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Lifecycle events carrying many edits at once, sent with `edit_ids`.
+# Bulk operations send one of these per batch, rather than relying on the per-row model signals.
+created_many = Signal()
+classified_many = Signal()
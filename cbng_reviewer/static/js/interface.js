@@ -1,4 +1,12 @@
 let isProcessingClassification = false;
+let reservedEditIds = [];
+let reservedEditIdsExpiry = 0;
+let emptyQueuePollDelay = 0;
+let emptyQueuePollTimer = null;
+
+// Back off while the queue is empty, so idle reviewers barely touch the API
+const emptyQueuePollMinDelay = 5 * 1000;
+const emptyQueuePollMaxDelay = 5 * 60 * 1000;
 
 function showSpinner() {
     document.getElementById("spinner").style.display = "block";
@@ -74,7 +82,7 @@ function classifyEdit(csrftoken, classification, confirmation) {
     console.debug("Classifying " + editId + " as " + classification + " (" + confirmation + ")");
     showSpinner();
 
-    fetch("/api/v1/reviewer/classify-edit/", {
+    fetch("/api/v1/reviewer/classify-edit-and-next/", {
         method: "POST",
         headers: {
             "Content-Type": "application/json;charset=UTF-8",
@@ -112,9 +120,16 @@ function classifyEdit(csrftoken, classification, confirmation) {
             return;
         }
 
-        // We are done - onto the next
+        // We are done - onto the next, which the API already selected for us
         isProcessingClassification = false;
-        loadNextEditId();
+        document.getElementById("comment").value = "";
+        if (data["next_edit_id"]) {
+            reservedEditIds = reservedEditIds.filter(function(id) { return id !== data["next_edit_id"]; });
+            renderEdit(data["next_edit_id"]);
+        } else {
+            showAlert("No Pending Edit Found");
+            scheduleEmptyQueuePoll();
+        }
     })
     .catch(function() {
         showAlert('Failed to classify edit');
@@ -139,15 +154,60 @@ function renderEdit(editId) {
         }
         document.getElementById("edit_id").innerText = editId;
         let iframe = document.getElementById("iframe");
-        iframe.setAttribute("src", url);
         iframe.onload = function() { hideSpinner(); }
+
+        // The iframe is credentialless, so fetch our own diff and hand it over as srcdoc
+        if (urlType === "l") {
+            fetch("/api/v1/edit/" + editId + "/diff/")
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.text();
+            })
+            .then(function(html) {
+                iframe.removeAttribute("src");
+                iframe.setAttribute("srcdoc", html);
+            })
+            .catch(function() {
+                showAlert('Failed to retrieve diff');
+            });
+            return;
+        }
+
+        iframe.removeAttribute("srcdoc");
+        iframe.setAttribute("src", url);
     }
 }
 
-function loadNextEditId() {
+function takeReservedEditId() {
+    if (Date.now() >= reservedEditIdsExpiry) {
+        reservedEditIds = [];
+    }
+    return reservedEditIds.shift();
+}
+
+function scheduleEmptyQueuePoll() {
+    if (emptyQueuePollTimer) return;
+    emptyQueuePollDelay = Math.min(Math.max(emptyQueuePollDelay * 2, emptyQueuePollMinDelay), emptyQueuePollMaxDelay);
+    console.debug("Queue is empty, checking again in " + (emptyQueuePollDelay / 1000) + "s");
+    emptyQueuePollTimer = setTimeout(function() {
+        emptyQueuePollTimer = null;
+        loadNextEditId(true);
+    }, emptyQueuePollDelay);
+}
+
+function loadNextEditId(isPoll) {
     document.getElementById("comment").value = "";
 
-    fetch("/api/v1/reviewer/next-edit/")
+    // Use an edit we already hold a reservation for, if we have one
+    let editId = takeReservedEditId();
+    if (editId) {
+        renderEdit(editId);
+        return;
+    }
+
+    fetch("/api/v1/reviewer/next-edits/")
     .then(function(response) {
         if (!response.ok) {
             showAlert('Failed to retrieve pending edit');
@@ -159,9 +219,18 @@ function loadNextEditId() {
         if (!data) {
             showAlert('Unexpected response from API');
         } else if (data["message"]) {
-            showAlert(data["message"]);
+            if (!isPoll) {
+                showAlert(data["message"]);
+            }
+            scheduleEmptyQueuePoll();
         } else {
-            renderEdit(data["edit_id"]);
+            if (isPoll) {
+                document.getElementById('modal-overlay').style.display = 'none';
+            }
+            emptyQueuePollDelay = 0;
+            reservedEditIds = data["edit_ids"];
+            reservedEditIdsExpiry = Date.now() + (data["expires_in"] * 1000);
+            renderEdit(takeReservedEditId());
         }
     })
     .catch(function() {
@@ -1,27 +1,53 @@
 import logging
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
+import requests
 from celery import shared_task
+from django.db import transaction, Error as DatabaseError
 
 from cbng_reviewer.libs.edit_set import utils
 
+if TYPE_CHECKING:
+    from cbng_reviewer.libs.wikipedia.training import WikipediaTraining
+    from cbng_reviewer.models import Edit
+
 logger = logging.getLogger(__name__)
 
 
 @shared_task
 def update_edit_classification(edit_id: int) -> None:
+    from cbng_reviewer.libs.debounce import EditClassificationDebouncer
     from cbng_reviewer.models import Edit
 
-    edit = Edit.objects.get(id=edit_id)
-    edit.update_classification()
+    with transaction.atomic():
+        # Only one worker recomputes an edit at a time, anyone else defers rather than waiting on the lock
+        edit = Edit.objects.select_for_update(skip_locked=True).filter(id=edit_id).first()
+        if edit is None:
+            if not Edit.objects.filter(id=edit_id).exists():
+                raise Edit.DoesNotExist(edit_id)
+
+            logger.info(f"Classification update already in progress for {edit_id}, deferring")
+            EditClassificationDebouncer().schedule(edit_id)
+            return
+
+        edit.update_classification()
 
 
 @shared_task
-def import_training_data(edit_id: int, force: bool = False) -> None:
-    from cbng_reviewer.models import Edit
+def update_pending_edit_classifications() -> None:
+    from cbng_reviewer.libs.debounce import EditClassificationDebouncer
+
+    logger.info(f"Updated classification for {EditClassificationDebouncer().drain()} pending edits")
+
+
+def _import_training_data(
+    edit: "Edit",
+    force: bool,
+    wikipedia_training: "WikipediaTraining",
+    edit_metadata: Optional[Tuple[Optional[str], Optional[str]]] = None,
+) -> None:
     from cbng_reviewer.libs.wikipedia.reader import WikipediaReader
-    from cbng_reviewer.libs.wikipedia.training import WikipediaTraining
 
-    edit = Edit.objects.get(id=edit_id)
     if edit.has_training_data and not force:
         logger.info(f"Edit already has training data: {edit.id}")
         return
@@ -31,6 +57,56 @@ def import_training_data(edit_id: int, force: bool = False) -> None:
         return
 
     logger.info(f"Fetching training data for {edit.id}")
-    wp_edit = WikipediaTraining().build_wp_edit(edit)
+    wp_edit = wikipedia_training.build_wp_edit(edit, edit_metadata)
     if wp_edit.has_complete_training_data:
         utils.import_training_data(edit, wp_edit)
+
+
+@shared_task
+def import_training_data(edit_id: int, force: bool = False) -> None:
+    from cbng_reviewer.libs.wikipedia.training import WikipediaTraining
+    from cbng_reviewer.models import Edit
+
+    _import_training_data(Edit.objects.get(id=edit_id), force, WikipediaTraining())
+
+
+@shared_task
+def import_training_data_for_edits(edit_ids: List[int], force: bool = False) -> None:
+    from cbng_reviewer.libs.wikipedia.training import WikipediaTraining
+    from cbng_reviewer.models import Edit
+
+    edits = list(Edit.objects.filter(id__in=edit_ids))
+    if not force:
+        edits = [edit for edit in edits if not edit.has_training_data]
+
+    # Resolve the page for the whole batch up front, rather than one API call per edit
+    wikipedia_training = WikipediaTraining()
+    edits_metadata = wikipedia_training.get_edits_metadata([edit.id for edit in edits])
+    for edit in edits:
+        try:
+            _import_training_data(edit, force, wikipedia_training, edits_metadata[edit.id])
+        except (requests.RequestException, DatabaseError) as e:
+            # One failed lookup should not lose the rest of the batch
+            logger.error(f"Failed to import training data for {edit.id}: {e}")
+
+
+@shared_task
+def refresh_review_queue_for_edit_group(edit_group_id: int) -> None:
+    from cbng_reviewer.libs.review_queue import ReviewQueue
+    from cbng_reviewer.models import EditGroup
+
+    ReviewQueue().refresh_edit_group(EditGroup.objects.get(id=edit_group_id))
+
+
+@shared_task
+def warm_edit_cache(edit_ids: Optional[List[int]] = None) -> None:
+    from cbng_reviewer.libs.edit_cache import EditCache
+
+    logger.info(f"Warmed cache for {EditCache().warm(edit_ids)} edits")
+
+
+@shared_task
+def send_queued_irc_messages() -> None:
+    from cbng_reviewer.libs.irc import IrcRelay
+
+    logger.info(f"Sent {IrcRelay().send_queued_messages()} queued irc messages")
@@ -0,0 +1,129 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from cbng_reviewer.libs.bulk_classifications import BulkClassifications
+from cbng_reviewer.libs.edit_set.utils import bulk_update_edit_classification, repair_classification_counters
+from cbng_reviewer.libs.models.classification import PendingClassification
+from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
+from cbng_reviewer.models import Edit, User, Classification, UserAccuracy
+from cbng_reviewer.signals import classified_many
+
+
+class BulkClassificationsTestCase(TestCase):
+    def testStoreSkipsExistingAndDuplicatePairs(self):
+        edit_1 = Edit.objects.create(id=1234)
+        edit_2 = Edit.objects.create(id=4321)
+        user = User.objects.create(username="Bot - Test", is_bot=True)
+        Classification.objects.create(edit=edit_1, user=user, classification=0)
+
+        classifications = BulkClassifications().store(
+            [
+                PendingClassification(edit_id=edit_1.id, user_id=user.id, classification=1),
+                PendingClassification(edit_id=edit_2.id, user_id=user.id, classification=1, comment="First"),
+                PendingClassification(edit_id=edit_2.id, user_id=user.id, classification=0, comment="Second"),
+                PendingClassification(edit_id=9999, user_id=user.id, classification=1),
+                PendingClassification(edit_id=edit_2.id, user_id=user.id, classification=5000),
+            ]
+        )
+
+        self.assertEqual([(c.edit_id, c.classification) for c in classifications], [(edit_2.id, 1)])
+        self.assertEqual(Classification.objects.get(edit=edit_1, user=user).classification, 0)
+        self.assertEqual(Classification.objects.get(edit=edit_2, user=user).comment, "First")
+        self.assertFalse(Classification.objects.filter(edit_id=9999).exists())
+
+    @patch.object(classified_many, "send")
+    def testStoreSendsClassifiedMany(self, mock_send):
+        edit = Edit.objects.create(id=1234)
+        users = [User.objects.create(username=f"test-user-{i}") for i in range(2)]
+
+        BulkClassifications().store(
+            [PendingClassification(edit_id=edit.id, user_id=user.id, classification=0) for user in users]
+        )
+        mock_send.assert_called_once_with(sender=Classification, edit_ids=[edit.id])
+
+        # Consensus is left to the `classified_many` consumer
+        bulk_update_edit_classification(force=True, edit_ids=[edit.id])
+        edit.refresh_from_db()
+        self.assertEqual(edit.status, 2)
+        self.assertEqual(edit.classification, 0)
+        self.assertEqual(edit.vandalism_classifications, 2)
+        self.assertEqual(edit.number_of_reviewers, 2)
+        self.assertEqual(UserAccuracy.objects.get(user=users[0]).total, 1)
+        self.assertEqual(UserAccuracyTracker().recount_users(), 0)
+
+    def testStoreIncrementsEditCounters(self):
+        edits = [Edit.objects.create(id=edit_id) for edit_id in (1234, 4321)]
+        bot = User.objects.create(username="Bot - Test", is_bot=True)
+        human = User.objects.create(username="test-user")
+        Classification.objects.create(edit=edits[0], user=human, classification=0)
+
+        BulkClassifications().store(
+            [
+                PendingClassification(edit_id=edits[0].id, user_id=bot.id, classification=0),
+                PendingClassification(edit_id=edits[1].id, user_id=bot.id, classification=1),
+                PendingClassification(edit_id=edits[1].id, user_id=human.id, classification=2),
+            ]
+        )
+
+        edits[0].refresh_from_db()
+        self.assertEqual((edits[0].vandalism_classifications, edits[0].human_classifications), (2, 1))
+        edits[1].refresh_from_db()
+        self.assertEqual((edits[1].constructive_classifications, edits[1].skipped_classifications), (1, 1))
+        self.assertEqual(edits[1].human_classifications, 1)
+        self.assertEqual(repair_classification_counters(), 0)
+
+    def testStoreCountsAccuracyOnFinishedEdit(self):
+        edit = Edit.objects.create(id=1234, status=2, classification=1)
+        user = User.objects.create(username="Bot - Test", is_bot=True)
+
+        BulkClassifications().store([PendingClassification(edit_id=edit.id, user_id=user.id, classification=1)])
+        self.assertEqual(UserAccuracy.objects.get(user=user).total, 1)
+        self.assertEqual(UserAccuracyTracker().recount_users(), 0)
+
+        bulk_update_edit_classification(force=True, edit_ids=[edit.id])
+        self.assertEqual(UserAccuracyTracker().recount_users(), 0)
+
+    def testStoreNothing(self):
+        self.assertEqual(BulkClassifications().store([]), [])
+
+    def testStoreOnlyCountsInsertedRows(self):
+        edits = [Edit.objects.create(id=edit_id, status=2, classification=1) for edit_id in (1234, 4321)]
+        user = User.objects.create(username="Bot - Test", is_bot=True)
+        bulk_create = Classification.objects.bulk_create
+
+        def racing_bulk_create(classifications, **kwargs):
+            # Another writer stores the first pair after our check
+            if not Classification.objects.filter(edit=edits[0], user=user).exists():
+                Classification.objects.create(edit=edits[0], user=user, classification=1)
+            return bulk_create(classifications, **kwargs)
+
+        with patch.object(Classification.objects, "bulk_create", side_effect=racing_bulk_create):
+            classifications = BulkClassifications().store(
+                [PendingClassification(edit_id=edit.id, user_id=user.id, classification=1) for edit in edits]
+            )
+
+        self.assertEqual([classification.edit_id for classification in classifications], [edits[1].id])
+        self.assertEqual(UserAccuracy.objects.get(user=user).total, 2)
+        self.assertEqual(UserAccuracyTracker().recount_users(), 0)
+        self.assertEqual(repair_classification_counters(), 0)
+
+        # Re-importing the same entries changes nothing
+        self.assertEqual(
+            BulkClassifications().store(
+                [PendingClassification(edit_id=edit.id, user_id=user.id, classification=1) for edit in edits]
+            ),
+            [],
+        )
+        self.assertEqual(UserAccuracy.objects.get(user=user).total, 2)
+
+    @patch.object(BulkClassifications, "store", autospec=True, side_effect=BulkClassifications.store)
+    def testStoreInBatches(self, mock_store):
+        edits = [Edit.objects.create(id=edit_id) for edit_id in range(1, 6)]
+        user = User.objects.create(username="Bot - Test", is_bot=True)
+
+        stored = BulkClassifications(batch_size=2).store_in_batches(
+            PendingClassification(edit_id=edit.id, user_id=user.id, classification=0) for edit in edits
+        )
+        self.assertEqual(stored, 5)
+        self.assertEqual([len(call.args[1]) for call in mock_store.call_args_list], [2, 2, 1])
@@ -0,0 +1,38 @@
+from django.test import TestCase
+
+from cbng_reviewer.libs.consensus_simulator import ConsensusSimulator
+from cbng_reviewer.models import Edit
+
+
+class ConsensusSimulatorTestCase(TestCase):
+    def setUp(self):
+        # Completed as vandalism with 2 votes
+        Edit.objects.create(id=1, status=2, classification=0, vandalism_classifications=2, human_classifications=2)
+        # In progress with a 2:1 split
+        Edit.objects.create(
+            id=2, status=1, vandalism_classifications=2, constructive_classifications=1, human_classifications=3
+        )
+        # Historical, no internal classifications
+        Edit.objects.create(id=3, status=2, classification=1)
+
+    def testCurrentThresholdsMatchStoredState(self):
+        simulation = ConsensusSimulator().simulate(2, 1, 3)
+        self.assertEqual(simulation.completed, 1)
+        self.assertEqual(simulation.newly_completed, 0)
+        self.assertEqual(simulation.no_longer_completed, 0)
+        self.assertEqual(simulation.changed_classification, 0)
+
+    def testCombinations(self):
+        simulations = ConsensusSimulator().simulate_all([2, 3], [1], [2, 3])
+        self.assertEqual(
+            [
+                (s.minimum_classifications, s.ratio, s.completed, s.newly_completed, s.no_longer_completed)
+                for s in simulations
+            ],
+            [
+                (2, 2, 2, 1, 0),
+                (2, 3, 1, 0, 0),
+                (3, 2, 0, 0, 1),
+                (3, 3, 0, 0, 1),
+            ],
+        )
@@ -0,0 +1,77 @@
+from unittest.mock import patch, MagicMock
+
+import redis
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from cbng_reviewer import tasks
+from cbng_reviewer.libs.debounce import EditClassificationDebouncer
+from cbng_reviewer.models import Edit, User, Classification
+
+
+@patch("cbng_reviewer.libs.debounce.get_redis_client")
+class EditClassificationDebouncerTestCase(TestCase):
+    @override_settings(CBNG_EDIT_CLASSIFICATION_DEBOUNCE_SECONDS=5)
+    @patch.object(tasks.update_pending_edit_classifications, "apply_async")
+    def testScheduleOnlyOnceWhilePending(self, mock_apply_async, mock_get_redis_client):
+        client = mock_get_redis_client.return_value
+        client.set.side_effect = [True, None]
+
+        EditClassificationDebouncer().schedule(1234)
+        EditClassificationDebouncer().schedule(1234)
+
+        client.sadd.assert_called_with(EditClassificationDebouncer.pending_key, 1234)
+        self.assertEqual(client.sadd.call_count, 2)
+        mock_apply_async.assert_called_once_with(countdown=5)
+
+    @override_settings(CBNG_EDIT_CLASSIFICATION_DEBOUNCE_SECONDS=5)
+    @patch.object(tasks.update_edit_classification, "apply_async")
+    def testFallbackWithoutRedis(self, mock_apply_async, mock_get_redis_client):
+        mock_get_redis_client.return_value.sadd.side_effect = redis.ConnectionError()
+
+        EditClassificationDebouncer().schedule(1234)
+        mock_apply_async.assert_called_once_with([1234], countdown=5)
+
+    def testDrainInBatches(self, mock_get_redis_client):
+        for edit_id in range(1, 4):
+            edit = Edit.objects.create(id=edit_id)
+            for i in range(2):
+                Classification.objects.create(
+                    edit=edit, user=User.objects.get_or_create(username=f"test-user-{i}")[0], classification=0
+                )
+
+        client = mock_get_redis_client.return_value
+        client.spop = MagicMock(side_effect=[[b"1", b"2"], [b"3"], []])
+
+        self.assertEqual(EditClassificationDebouncer().drain(batch_size=2), 3)
+        client.delete.assert_called_once_with(EditClassificationDebouncer.scheduled_key)
+        self.assertEqual(set(Edit.objects.values_list("status", flat=True)), {2})
+
+    def testDrainKeepsCounters(self, mock_get_redis_client):
+        # Counters ahead of the stored classifications, as when another classification is mid-commit
+        Edit.objects.create(id=1, vandalism_classifications=2, human_classifications=2)
+        mock_get_redis_client.return_value.spop = MagicMock(side_effect=[[b"1"], []])
+
+        self.assertEqual(EditClassificationDebouncer().drain(), 1)
+        edit = Edit.objects.get(id=1)
+        self.assertEqual((edit.status, edit.classification, edit.number_of_reviewers), (2, 0, 2))
+        self.assertEqual((edit.vandalism_classifications, edit.human_classifications), (2, 2))
+
+    @patch.object(EditClassificationDebouncer, "schedule_many")
+    def testDrainDefersLockedEdits(self, mock_schedule_many, mock_get_redis_client):
+        Edit.objects.create(id=1)
+        mock_get_redis_client.return_value.spop = MagicMock(side_effect=[[b"1", b"2"], []])
+
+        with patch.object(Edit.objects, "select_for_update", return_value=Edit.objects.none()):
+            self.assertEqual(EditClassificationDebouncer().drain(), 0)
+        mock_schedule_many.assert_called_once_with([1])
+
+    @override_settings(CBNG_EDIT_CLASSIFICATION_DEBOUNCE_SECONDS=5)
+    @patch.object(tasks.update_pending_edit_classifications, "apply_async")
+    def testScheduleMany(self, mock_apply_async, mock_get_redis_client):
+        client = mock_get_redis_client.return_value
+        client.set.return_value = True
+
+        EditClassificationDebouncer().schedule_many([1, 2, 3])
+        client.sadd.assert_called_once_with(EditClassificationDebouncer.pending_key, 1, 2, 3)
+        mock_apply_async.assert_called_once_with(countdown=5)
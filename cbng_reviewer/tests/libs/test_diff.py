@@ -0,0 +1,48 @@
+from django.test import TestCase
+
+from cbng_reviewer.libs.diff import DiffRenderer
+from cbng_reviewer.libs.models.diff import DiffLine
+from cbng_reviewer.models import Edit, CurrentRevision, PreviousRevision
+
+
+class DiffRendererTestCase(TestCase):
+    def testWordLevelChange(self):
+        self.assertEqual(
+            DiffRenderer().get_diff_lines("The cat sat", "The dog sat"),
+            [DiffLine("change", 1, "The <del>cat</del> sat", 1, "The <ins>dog</ins> sat")],
+        )
+
+    def testAddedAndRemovedLines(self):
+        self.assertEqual(
+            DiffRenderer(context_lines=1).get_diff_lines("a\nb\nc", "a\nc\nd"),
+            [
+                DiffLine("context", 1, "a", 1, "a"),
+                DiffLine("change", 2, "<del>b</del>"),
+                DiffLine("context", 3, "c", 2, "c"),
+                DiffLine("change", current_line_number=3, current_html="<ins>d</ins>"),
+            ],
+        )
+
+    def testGapBetweenChanges(self):
+        previous = "\n".join(f"line {i}" for i in range(20))
+        current = previous.replace("line 1\n", "line one\n").replace("line 18", "line eighteen")
+        diff_lines = DiffRenderer(context_lines=1).get_diff_lines(previous, current)
+        self.assertEqual([diff_line.change_type for diff_line in diff_lines].count("gap"), 1)
+
+    def testEscapesHtml(self):
+        self.assertEqual(
+            DiffRenderer().get_diff_lines("", "<script>"),
+            [DiffLine("change", current_line_number=1, current_html="<ins>&lt;script&gt;</ins>")],
+        )
+
+    def testRenderEdit(self):
+        edit = Edit.objects.create(id=1234)
+        CurrentRevision.objects.create(edit=edit, timestamp=1, is_minor=False, is_creation=False, text=b"New Text")
+        PreviousRevision.objects.create(edit=edit, timestamp=0, is_minor=False, text=b"Old Text")
+
+        html = DiffRenderer().render_edit(edit)
+        self.assertIn("<del>Old</del>", html)
+        self.assertIn("<ins>New</ins>", html)
+
+    def testRenderEditWithoutRevision(self):
+        self.assertIsNone(DiffRenderer().render_edit(Edit.objects.create(id=1234)))
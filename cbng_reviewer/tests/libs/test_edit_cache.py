@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from cbng_reviewer.libs.edit_cache import EditCache
+from cbng_reviewer.models import Edit, CurrentRevision, PreviousRevision, TrainingData, EditGroup, QueuedEdit, User
+
+
+class EditCacheTestCase(TestCase):
+    def _create_edit(self, edit_id: int) -> Edit:
+        edit = Edit.objects.create(id=edit_id)
+        TrainingData.objects.create(
+            edit=edit,
+            timestamp=1753826200,
+            comment="Example Change",
+            user="Bob Smith",
+            user_edit_count=4,
+            user_distinct_pages=2,
+            user_warns=0,
+            user_reg_time=1753824103,
+            prev_user="Alice Smith",
+            page_title="Very Important",
+            page_namespace=0,
+            page_created_time=1753814103,
+            page_creator="Dog",
+            page_num_recent_edits=1,
+            page_num_recent_reverts=0,
+        )
+        CurrentRevision.objects.create(edit=edit, timestamp=1, is_minor=False, is_creation=False, text=b"New Text")
+        PreviousRevision.objects.create(edit=edit, timestamp=0, is_minor=False, text=b"Old Text")
+        edit.update_training_data_flag()
+        return edit
+
+    def testDiffIsCached(self):
+        edit = self._create_edit(1234)
+        html = EditCache().get_diff(edit)
+        self.assertIn("<del>Old</del>", html)
+
+        CurrentRevision.objects.filter(edit=edit).update(text=b"Other Text")
+        self.assertEqual(EditCache().get_diff(edit), html)
+
+        EditCache().invalidate_edit(edit)
+        self.assertIn("<ins>Other</ins>", EditCache().get_diff(edit))
+
+    def testWpEditFollowsReviewState(self):
+        edit = self._create_edit(1234)
+        self.assertIn("<status>Pending</status>", EditCache().get_wp_edit(edit))
+
+        edit.status, edit.classification = 2, 0
+        edit.save()
+        wp_edit = EditCache().get_wp_edit(edit)
+        self.assertIn("<status>Done</status>", wp_edit)
+        self.assertIn("<isVandalism>true</isVandalism>", wp_edit)
+
+    def testMissingData(self):
+        edit = Edit.objects.create(id=1234)
+        self.assertIsNone(EditCache().get_wp_edit(edit))
+        self.assertIsNone(EditCache().get_diff(edit))
+
+    @override_settings(CBNG_EDIT_CACHE_MAX_ENTRY_BYTES=10)
+    def testOversizedPayloadNotCached(self):
+        edit = self._create_edit(1234)
+        self.assertIn("<del>Old</del>", EditCache().get_diff(edit))
+
+        CurrentRevision.objects.filter(edit=edit).update(text=b"Other Text")
+        self.assertIn("<ins>Other</ins>", EditCache().get_diff(edit))
+
+    @override_settings(CBNG_EDIT_CACHE_SLOTS=10)
+    def testEditsSharingASlot(self):
+        edits = [self._create_edit(edit_id) for edit_id in (1, 11)]
+        CurrentRevision.objects.filter(edit=edits[1]).update(text=b"Other Text")
+
+        self.assertIn("<del>Old</del>", EditCache().get_diff(edits[0]))
+        self.assertIn("<ins>Other</ins>", EditCache().get_diff(edits[1]))
+
+        # The newer edit took over the slot, so the first is rendered again rather than served the wrong diff
+        CurrentRevision.objects.filter(edit=edits[0]).update(text=b"Another Text")
+        self.assertIn("<ins>Another</ins>", EditCache().get_diff(edits[0]))
+        self.assertEqual(EditCache().warm([1, 11]), 2)
+
+    def testWarmReservedEdits(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        for edit_id in range(1, 6):
+            self._create_edit(edit_id).groups.add(edit_group)
+        Edit.objects.create(id=6).groups.add(edit_group)
+
+        # Nothing is reserved, so there is nothing about to be served
+        self.assertEqual(EditCache().warm(), 0)
+
+        # Edit 6 is reserved, though has nothing to cache
+        user = User.objects.create(username="test-user")
+        for edit_id in [1, 2, 6]:
+            QueuedEdit.objects.filter(edit_id=edit_id).update(
+                reserved_by=user, reserved_until=timezone.now() + timedelta(seconds=300)
+            )
+        self.assertEqual(EditCache().warm(), 2)
+        self.assertEqual(EditCache().warm(), 0)
+
+        self.assertEqual(EditCache().warm([1, 2, 3, 4]), 2)
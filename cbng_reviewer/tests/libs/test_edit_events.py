@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import redis
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from cbng_reviewer.libs.edit_events import EditEventStream
+from cbng_reviewer.libs.models.edit_event import EditEvent
+
+
+@patch("cbng_reviewer.libs.edit_events.get_redis_client")
+class EditEventStreamTestCase(TestCase):
+    @override_settings(CBNG_ENABLE_EDIT_EVENT_STREAM=False)
+    def testPublishDisabled(self, mock_get_redis_client):
+        self.assertFalse(EditEventStream().publish("created", [1234]))
+        mock_get_redis_client.assert_not_called()
+
+    def testPublishUnknownType(self, mock_get_redis_client):
+        with self.assertRaises(ValueError):
+            EditEventStream().publish("exploded", [1234])
+
+    @override_settings(CBNG_ENABLE_EDIT_EVENT_STREAM=True, CBNG_EDIT_EVENT_STREAM_MAX_LENGTH=100)
+    def testPublishOnCommit(self, mock_get_redis_client):
+        pipeline = mock_get_redis_client.return_value.pipeline.return_value.__enter__.return_value
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(EditEventStream().publish("completed", [1, 2]))
+            pipeline.xadd.assert_not_called()
+
+        self.assertEqual(
+            [c.args for c in pipeline.xadd.call_args_list],
+            [
+                (EditEventStream.stream_key, {"type": "completed", "edit_id": 1}),
+                (EditEventStream.stream_key, {"type": "completed", "edit_id": 2}),
+            ],
+        )
+        self.assertEqual(pipeline.xadd.call_args.kwargs, {"maxlen": 100, "approximate": True})
+        pipeline.execute.assert_called_once()
+
+    def testCreateConsumerGroup(self, mock_get_redis_client):
+        client = mock_get_redis_client.return_value
+        client.xgroup_create.side_effect = [True, redis.ResponseError("BUSYGROUP Consumer Group name already exists")]
+
+        self.assertTrue(EditEventStream().create_consumer_group("trainer"))
+        self.assertFalse(EditEventStream().create_consumer_group("trainer"))
+        client.xgroup_create.assert_called_with(EditEventStream.stream_key, "trainer", id="$", mkstream=True)
+
+    def testReadAndAcknowledge(self, mock_get_redis_client):
+        client = mock_get_redis_client.return_value
+        client.xreadgroup.return_value = [
+            [
+                EditEventStream.stream_key.encode("utf-8"),
+                [
+                    (b"1-0", {b"type": b"created", b"edit_id": b"1234"}),
+                    (b"2-0", {b"type": b"completed", b"edit_id": b"1234"}),
+                ],
+            ]
+        ]
+        client.xack.return_value = 2
+
+        events = EditEventStream().read("trainer", "worker-1", count=10)
+        self.assertEqual(
+            events,
+            [EditEvent(id="1-0", type="created", edit_id=1234), EditEvent(id="2-0", type="completed", edit_id=1234)],
+        )
+        client.xreadgroup.assert_called_once_with(
+            "trainer", "worker-1", {EditEventStream.stream_key: ">"}, count=10, block=None
+        )
+
+        self.assertEqual(EditEventStream().acknowledge("trainer", events), 2)
+        client.xack.assert_called_once_with(EditEventStream.stream_key, "trainer", "1-0", "2-0")
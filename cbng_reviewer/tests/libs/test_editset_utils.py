@@ -1,11 +1,19 @@
 import functools
+from unittest.mock import MagicMock
 
 from django.conf import settings
+from django.db.models.signals import post_save
 from django.test import TestCase
 
+from cbng_reviewer.hooks import send_created_many_from_edit
 from cbng_reviewer.libs.edit_set.parser import EditSetParser
-from cbng_reviewer.libs.edit_set.utils import import_wp_edit_to_edit_group
-from cbng_reviewer.models import EditGroup
+from cbng_reviewer.libs.edit_set.utils import (
+    import_wp_edit_to_edit_group,
+    import_wp_edits_to_edit_group,
+    add_edits_to_edit_group,
+)
+from cbng_reviewer.models import EditGroup, Edit, QueuedEdit
+from cbng_reviewer.signals import created_many
 
 
 class EditSetUtilsTestCase(TestCase):
@@ -42,3 +50,51 @@ class EditSetUtilsTestCase(TestCase):
         self.assertEqual(edit.status, 2)
         self.assertEqual(edit.classification, 0)
         self.assertFalse(edit.has_training_data)
+
+    def testImportSendsOneEventPerBatch(self):
+        target_group = EditGroup.objects.create(name="imported-from-multiple")
+        callback_func = functools.partial(import_wp_edits_to_edit_group, target_group=target_group, skip_existing=False)
+
+        # The per-row adapter is connected outside of tests, it must not fire for imported edits
+        receiver = MagicMock()
+        post_save.connect(send_created_many_from_edit, sender=Edit)
+        created_many.connect(receiver, sender=Edit)
+        try:
+            EditSetParser().read_file_in_batches(
+                settings.BASE_DIR / "cbng_reviewer" / "tests" / "data" / "editsets" / "multiple.xml", callback_func
+            )
+        finally:
+            created_many.disconnect(receiver, sender=Edit)
+            post_save.disconnect(send_created_many_from_edit, sender=Edit)
+
+        receiver.assert_called_once()
+        self.assertEqual(
+            receiver.call_args.kwargs["edit_ids"], sorted(target_group.edit_set.values_list("id", flat=True))
+        )
+        self.assertEqual(len(receiver.call_args.kwargs["edit_ids"]), 3)
+        self.assertEqual(set(Edit.objects.values_list("status", flat=True)), {2})
+
+    def testImportBatched(self):
+        callback_func = MagicMock()
+
+        EditSetParser().read_file_in_batches(
+            settings.BASE_DIR / "cbng_reviewer" / "tests" / "data" / "editsets" / "multiple.xml",
+            callback_func,
+            batch_size=2,
+        )
+        self.assertEqual([len(c.kwargs["wp_edits"]) for c in callback_func.call_args_list], [2, 1])
+
+    def testAddEditsToEditGroupSendsOneEvent(self):
+        edit_group = EditGroup.objects.create(name="Sampled Edits", weight=40)
+        Edit.objects.create(id=1)
+        receiver = MagicMock()
+        created_many.connect(receiver, sender=Edit)
+        try:
+            self.assertEqual(add_edits_to_edit_group(edit_group, [1, 2, 3]), [2, 3])
+        finally:
+            created_many.disconnect(receiver, sender=Edit)
+
+        receiver.assert_called_once()
+        self.assertEqual(receiver.call_args.kwargs["edit_ids"], [2, 3])
+        self.assertEqual(set(edit_group.edit_set.values_list("id", flat=True)), {1, 2, 3})
+        self.assertEqual(set(QueuedEdit.objects.values_list("edit_id", flat=True)), {1, 2, 3})
@@ -1,8 +1,15 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import requests
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils import timezone
 
+from cbng_reviewer import tasks
 from cbng_reviewer.libs.irc import IrcRelay
 from cbng_reviewer.libs.models.message import Message
+from cbng_reviewer.models import IrcOutboxMessage
 
 
 class IrcRelayTestCase(TestCase):
@@ -26,3 +33,67 @@ class IrcRelayTestCase(TestCase):
             CBNG_ENABLE_IRC_MESSAGING=True,
         ):
             self.assertFalse(IrcRelay().send_message(self.message))
+
+    def testQueueMessageSkippedWhenDisabled(self):
+        with override_settings(CBNG_ENABLE_IRC_MESSAGING=False):
+            self.assertFalse(IrcRelay().queue_message(Message(body="Hello", channel="#development")))
+        self.assertFalse(IrcOutboxMessage.objects.exists())
+
+
+@override_settings(
+    CBNG_ENABLE_IRC_MESSAGING=True,
+    CBNG_IRC_OUTBOX_SEND_INTERVAL_SECONDS=0,
+    CBNG_IRC_OUTBOX_MAX_ATTEMPTS=2,
+    CBNG_IRC_OUTBOX_BATCH_SIZE=2,
+)
+@patch("cbng_reviewer.libs.irc.get_redis_client")
+class IrcOutboxTestCase(TestCase):
+    @patch.object(tasks.send_queued_irc_messages, "apply_async")
+    def testQueueMessageSchedulesDrainOnCommit(self, mock_apply_async, mock_get_redis_client):
+        mock_get_redis_client.return_value.set.side_effect = [True, None]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(IrcRelay().queue_message(Message(body="Hello ", channel="#development")))
+            self.assertTrue(IrcRelay().queue_message(Message(body="World", channel="#development")))
+            mock_apply_async.assert_not_called()
+
+        mock_apply_async.assert_called_once_with(countdown=0)
+        self.assertEqual(
+            list(IrcOutboxMessage.objects.order_by("id").values_list("channel", "body")),
+            [("#development", "Hello"), ("#development", "World")],
+        )
+
+    @patch.object(tasks.send_queued_irc_messages, "apply_async")
+    @patch.object(IrcRelay, "send_message")
+    def testSendQueuedMessages(self, mock_send_message, mock_apply_async, mock_get_redis_client):
+        mock_send_message.side_effect = [True, False, True, requests.ConnectionError()]
+        for body in ["1", "2", "3"]:
+            IrcOutboxMessage.objects.create(channel="#development", body=body)
+
+        self.assertEqual(IrcRelay().send_queued_messages(), 2)
+        self.assertEqual(list(IrcOutboxMessage.objects.values_list("body", "attempts")), [("2", 1)])
+        mock_apply_async.assert_called_once()
+
+        # The second failure drops the message
+        self.assertEqual(IrcRelay().send_queued_messages(), 0)
+        self.assertFalse(IrcOutboxMessage.objects.exists())
+
+    @patch.object(IrcRelay, "send_message", return_value=True)
+    def testSendQueuedMessagesInBatches(self, mock_send_message, mock_get_redis_client):
+        for body in ["1", "2", "3", "4", "5"]:
+            IrcOutboxMessage.objects.create(channel="#development", body=body)
+        # Held by another drainer
+        IrcOutboxMessage.objects.filter(body="2").update(claimed_until=timezone.now() + timedelta(seconds=60))
+
+        with patch.object(
+            IrcRelay, "_claim_queued_messages", autospec=True, side_effect=IrcRelay._claim_queued_messages
+        ) as mock_claim:
+            self.assertEqual(IrcRelay().send_queued_messages(), 4)
+        # Two full batches, then an empty claim ends the drain
+        self.assertEqual(mock_claim.call_count, 3)
+        self.assertEqual(list(IrcOutboxMessage.objects.values_list("body", flat=True)), ["2"])
+
+        # Once the claim lapses, the message is picked up again
+        IrcOutboxMessage.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(IrcRelay().send_queued_messages(), 1)
+        self.assertFalse(IrcOutboxMessage.objects.exists())
@@ -0,0 +1,297 @@
+from collections import Counter
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+
+from cbng_reviewer.libs.edit_set.utils import mark_edit_as_deleted
+from cbng_reviewer.libs.review_queue import ReviewQueue
+from cbng_reviewer.models import Edit, EditGroup, QueuedEdit, User, Classification
+from cbng_reviewer.tasks import refresh_review_queue_for_edit_group
+
+
+class ReviewQueueTestCase(TestCase):
+    def testEditQueuedWhenAddedToGroup(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+        edit.groups.add(edit_group)
+        queued_edit = QueuedEdit.objects.get(edit=edit)
+        self.assertEqual(queued_edit.weight, 20)
+        self.assertEqual(queued_edit.status, 0)
+
+    def testEditQueuedFromReverseGroupAdd(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+
+        edit_group.edit_set.add(edit)
+        self.assertTrue(QueuedEdit.objects.filter(edit=edit).exists())
+
+    def testEditUsesHighestGroupWeight(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+        edit.groups.add(EditGroup.objects.create(name="Group 2", weight=40))
+        self.assertEqual(QueuedEdit.objects.get(edit=edit).weight, 40)
+
+    def testEditRemovedWhenRemovedFromGroup(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(edit_group)
+
+        edit.groups.remove(edit_group)
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    def testEditRemovedWhenGroupCleared(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(edit_group)
+
+        edit_group.edit_set.clear()
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    def testEditRemovedWhenEditGroupsCleared(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+
+        edit.groups.clear()
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    def testZeroWeightGroupNotQueued(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=0))
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    @patch("cbng_reviewer.tasks.refresh_review_queue_for_edit_group.apply_async")
+    def testGroupWeightChangeMovesBucket(self, mock_apply_async):
+        mock_apply_async.side_effect = lambda args: refresh_review_queue_for_edit_group(*args)
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(edit_group)
+
+        edit_group.weight = 30
+        with self.captureOnCommitCallbacks(execute=True):
+            edit_group.save()
+        self.assertEqual(QueuedEdit.objects.get(edit=edit).weight, 30)
+
+        edit_group.weight = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            edit_group.save()
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    @patch("cbng_reviewer.tasks.refresh_review_queue_for_edit_group.apply_async")
+    def testGroupRenameDoesNotRefresh(self, mock_apply_async):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        Edit.objects.create(id=1234).groups.add(edit_group)
+
+        edit_group.name = "Group 2"
+        with self.captureOnCommitCallbacks(execute=True):
+            edit_group.save()
+        mock_apply_async.assert_not_called()
+
+    def testStatusChangeMovesBucket(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+
+        edit.status = 1
+        edit.save()
+        self.assertEqual(QueuedEdit.objects.get(edit=edit).status, 1)
+
+        edit.status = 2
+        edit.save()
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    def testDeletedEditRemoved(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+
+        mark_edit_as_deleted(edit)
+        self.assertFalse(QueuedEdit.objects.filter(edit=edit).exists())
+
+    def testRebuild(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        for edit_id in range(1, 6):
+            Edit.objects.create(id=edit_id).groups.add(edit_group)
+        Edit.objects.create(id=6, status=2).groups.add(edit_group)
+
+        QueuedEdit.objects.all().delete()
+        self.assertEqual(ReviewQueue().rebuild(), 5)
+        self.assertEqual(set(QueuedEdit.objects.values_list("edit_id", flat=True)), {1, 2, 3, 4, 5})
+
+    def testNextEditSkipsClassified(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        for edit_id in range(1, 11):
+            Edit.objects.create(id=edit_id).groups.add(edit_group)
+
+        user = User.objects.create(username="test-user")
+        for edit_id in range(1, 10):
+            Classification.objects.create(user=user, edit_id=edit_id, classification=0)
+
+        for _ in range(10):
+            self.assertEqual(ReviewQueue().get_next_edit_id(user), 10)
+
+    def testRandomKeyRerolledOnStatusChange(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+        QueuedEdit.objects.filter(edit=edit).update(random_key=2.0)
+
+        edit.status = 1
+        edit.save()
+        self.assertLess(QueuedEdit.objects.get(edit=edit).random_key, 1.0)
+
+    def testNextEditCoversWholeBucket(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        for edit_id in range(1, 4):
+            Edit.objects.create(id=edit_id).groups.add(edit_group)
+
+        # The lowest key is reached both directly and by wrapping around from the end
+        QueuedEdit.objects.filter(edit_id=1).update(random_key=0.2)
+        QueuedEdit.objects.filter(edit_id=2).update(random_key=0.5)
+        QueuedEdit.objects.filter(edit_id=3).update(random_key=0.8)
+
+        user = User.objects.create(username="test-user")
+        seen = {ReviewQueue().get_next_edit_id(user) for _ in range(100)}
+        self.assertEqual(seen, {1, 2, 3})
+
+    @patch("cbng_reviewer.tasks.refresh_review_queue_for_edit_group.apply_async")
+    def testEditWeightFollowsGroups(self, mock_apply_async):
+        mock_apply_async.side_effect = lambda args: refresh_review_queue_for_edit_group(*args)
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        self.assertEqual(Edit.objects.get(id=1234).weight, 0)
+
+        edit.groups.add(edit_group)
+        self.assertEqual(Edit.objects.get(id=1234).weight, 20)
+
+        edit_group.weight = 30
+        with self.captureOnCommitCallbacks(execute=True):
+            edit_group.save()
+        self.assertEqual(Edit.objects.get(id=1234).weight, 30)
+
+        edit.groups.remove(edit_group)
+        self.assertEqual(Edit.objects.get(id=1234).weight, 0)
+
+    def testRebuildRepairsEditWeight(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+        Edit.objects.filter(id=1234).update(weight=0)
+
+        self.assertEqual(ReviewQueue().rebuild(), 1)
+        self.assertEqual(Edit.objects.get(id=1234).weight, 20)
+        self.assertEqual(QueuedEdit.objects.get(edit=edit).weight, 20)
+
+    def testEditQueuedInHighestWeightedGroup(self):
+        edit_group_1 = EditGroup.objects.create(name="Group 1", weight=20)
+        edit_group_2 = EditGroup.objects.create(name="Group 2", weight=40)
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(edit_group_1)
+        self.assertEqual(QueuedEdit.objects.get(edit=edit).edit_group, edit_group_1)
+
+        edit.groups.add(edit_group_2)
+        self.assertEqual(QueuedEdit.objects.get(edit=edit).edit_group, edit_group_2)
+
+    @override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=True)
+    def testFairShareServesGroupsByWeight(self):
+        edit_group_1 = EditGroup.objects.create(name="Group 1", weight=30)
+        edit_group_2 = EditGroup.objects.create(name="Group 2", weight=10)
+        for edit_id in range(1, 41):
+            Edit.objects.create(id=edit_id).groups.add(edit_group_1 if edit_id <= 20 else edit_group_2)
+
+        user = User.objects.create(username="test-user")
+        served = Counter()
+        for edit_id in ReviewQueue().reserve_edit_ids(user, 20):
+            served[QueuedEdit.objects.get(edit_id=edit_id).edit_group_id] += 1
+        self.assertEqual(served, {edit_group_1.id: 15, edit_group_2.id: 5})
+
+    @override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=True)
+    def testFairShareIdleGroupDoesNotCatchUp(self):
+        edit_group_1 = EditGroup.objects.create(name="Group 1", weight=10)
+        edit_group_2 = EditGroup.objects.create(name="Group 2", weight=10)
+        for edit_id in range(1, 11):
+            Edit.objects.create(id=edit_id).groups.add(edit_group_1)
+
+        user = User.objects.create(username="test-user")
+        self.assertEqual(len(ReviewQueue().reserve_edit_ids(user, 5)), 5)
+
+        # Group 2 becomes active after group 1 has been served, it should alternate rather than monopolise
+        for edit_id in range(11, 21):
+            Edit.objects.create(id=edit_id).groups.add(edit_group_2)
+        cache.delete("review-queue-edit-groups")
+
+        served = [
+            QueuedEdit.objects.get(edit_id=edit_id).edit_group_id
+            for edit_id in ReviewQueue().reserve_edit_ids(User.objects.create(username="test-user-2"), 4)
+        ]
+        self.assertEqual(sorted(served), sorted([edit_group_1.id, edit_group_1.id, edit_group_2.id, edit_group_2.id]))
+
+    @override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=True)
+    def testFairShareOnlyAdvancesOnReservation(self):
+        edit_group_1 = EditGroup.objects.create(name="Group 1", weight=10)
+        edit_group_2 = EditGroup.objects.create(name="Group 2", weight=10)
+        Edit.objects.create(id=1).groups.add(edit_group_1)
+        Edit.objects.create(id=2).groups.add(edit_group_2)
+
+        user = User.objects.create(username="test-user")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ReviewQueue().get_next_edit_id(user), 1)
+            self.assertEqual(ReviewQueue().get_next_edit_id(user), 1)
+        # Peeking at the next edit only reads
+        self.assertTrue(all(query["sql"].startswith("SELECT") for query in queries.captured_queries))
+
+        self.assertEqual(ReviewQueue().reserve_edit_ids(user, 1), [1])
+        self.assertEqual(ReviewQueue().get_next_edit_id(User.objects.create(username="test-user-2")), 2)
+
+    @override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=True)
+    def testFairShareServesEditsWithoutGroup(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=10)
+        for edit_id in range(1, 5):
+            Edit.objects.create(id=edit_id).groups.add(edit_group)
+        QueuedEdit.objects.filter(edit_id__in=[3, 4]).update(edit_group=None)
+
+        user = User.objects.create(username="test-user")
+        self.assertEqual(set(ReviewQueue().reserve_edit_ids(user, 4)), {1, 2, 3, 4})
+
+    @override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=False)
+    def testPriorityServesHighestWeightFirst(self):
+        edit_group_1 = EditGroup.objects.create(name="Group 1", weight=30)
+        edit_group_2 = EditGroup.objects.create(name="Group 2", weight=10)
+        for edit_id in range(1, 11):
+            Edit.objects.create(id=edit_id).groups.add(edit_group_1 if edit_id <= 5 else edit_group_2)
+
+        user = User.objects.create(username="test-user")
+        self.assertEqual(set(ReviewQueue().reserve_edit_ids(user, 5)), {1, 2, 3, 4, 5})
+
+    @override_settings(CBNG_CORE_VANDALISM_THRESHOLD=0.9)
+    def testUncertaintyFromCoreScore(self):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+        self.assertIsNone(QueuedEdit.objects.get(edit=edit).uncertainty)
+
+        edit.core_score = 0.7
+        edit.save(update_fields=["core_score"])
+        self.assertAlmostEqual(QueuedEdit.objects.get(edit=edit).uncertainty, 0.2)
+
+    @override_settings(CBNG_REVIEW_QUEUE_UNCERTAINTY=True, CBNG_CORE_VANDALISM_THRESHOLD=0.9)
+    def testUncertaintyServesClosestToThresholdFirst(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        for edit_id, core_score in [(1, 0.1), (2, 0.85), (3, None), (4, 0.99)]:
+            Edit.objects.create(id=edit_id, core_score=core_score).groups.add(edit_group)
+
+        user = User.objects.create(username="test-user")
+        self.assertEqual(ReviewQueue().reserve_edit_ids(user, 4), [2, 4, 1, 3])
+
+    @override_settings(CBNG_REVIEW_QUEUE_UNCERTAINTY=True, CBNG_CORE_VANDALISM_THRESHOLD=0.9)
+    def testUncertaintyRespectsGroupWeight(self):
+        high_group = EditGroup.objects.create(name="Group 1", weight=40)
+        low_group = EditGroup.objects.create(name="Group 2", weight=20)
+        Edit.objects.create(id=1, core_score=0.1).groups.add(high_group)
+        Edit.objects.create(id=2, core_score=0.9).groups.add(low_group)
+
+        user = User.objects.create(username="test-user")
+        with override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=False):
+            self.assertEqual(ReviewQueue().get_next_edit_id(user), 1)
+        with override_settings(CBNG_REVIEW_QUEUE_FAIR_SHARE=True):
+            self.assertEqual(ReviewQueue().get_next_edit_id(user), 1)
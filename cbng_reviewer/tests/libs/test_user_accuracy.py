@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from cbng_reviewer.libs.edit_set.utils import bulk_update_edit_classification
+from cbng_reviewer.libs.report_interface import ReportInterface
+from cbng_reviewer.libs.user_accuracy import UserAccuracyTracker
+from cbng_reviewer.models import User, Edit, Classification, UserAccuracy
+
+
+class UserAccuracyTrackerTestCase(TestCase):
+    def _get_accuracy(self, user: User):
+        user_accuracy = UserAccuracy.objects.filter(user=user).first()
+        return (user_accuracy.total, user_accuracy.correct) if user_accuracy else (0, 0)
+
+    def testEditCompletion(self):
+        edit = Edit.objects.create(id=1234)
+        user_1 = User.objects.create(username="user-1")
+        user_2 = User.objects.create(username="user-2")
+        user_3 = User.objects.create(username="user-3")
+        Classification.objects.create(edit=edit, user=user_1, classification=0)
+        Classification.objects.create(edit=edit, user=user_2, classification=0)
+        Classification.objects.create(edit=edit, user=user_3, classification=2)
+        self.assertEqual(self._get_accuracy(user_1), (0, 0))
+
+        edit.update_classification()
+        self.assertEqual(edit.status, 2)
+        self.assertEqual(self._get_accuracy(user_1), (1, 1))
+        self.assertEqual(self._get_accuracy(user_2), (1, 1))
+        self.assertEqual(self._get_accuracy(user_3), (0, 0))
+
+    def testClassificationChange(self):
+        edit = Edit.objects.create(id=1234, status=2, classification=0)
+        user = User.objects.create(username="user")
+        Classification.objects.create(edit=edit, user=user, classification=1)
+        self.assertEqual(self._get_accuracy(user), (1, 0))
+
+        UserAccuracyTracker().apply_edit_changes({edit.id: (2, 0)})
+        self.assertEqual(self._get_accuracy(user), (1, 0))
+
+        Edit.objects.filter(id=edit.id).update(classification=1)
+        UserAccuracyTracker().apply_edit_changes({edit.id: (2, 0)})
+        self.assertEqual(self._get_accuracy(user), (1, 1))
+
+    def testBulkUpdate(self):
+        edits = [Edit.objects.create(id=edit_id) for edit_id in range(1, 4)]
+        users = [User.objects.create(username=f"user-{i}") for i in range(2)]
+        for edit in edits:
+            for user in users:
+                Classification.objects.create(edit=edit, user=user, classification=1)
+
+        bulk_update_edit_classification()
+        self.assertEqual([self._get_accuracy(user) for user in users], [(3, 3), (3, 3)])
+
+    @patch.object(ReportInterface, "fetch_edit_ids_requiring_review")
+    def testReportedEditsReclassified(self, mock_fetch_edit_ids_requiring_review):
+        edit = Edit.objects.create(id=1234, status=2, classification=0)
+        user = User.objects.create(username="user")
+        Classification.objects.create(edit=edit, user=user, classification=1)
+        self.assertEqual(self._get_accuracy(user), (1, 0))
+
+        mock_fetch_edit_ids_requiring_review.return_value = {edit.id}
+        ReportInterface().create_entries_for_reported_edits()
+        self.assertEqual(self._get_accuracy(user), (1, 1))
+        self.assertEqual(UserAccuracyTracker().recount_users(), 0)
+
+    def testDeletedClassification(self):
+        edit = Edit.objects.create(id=1234, status=2, classification=0)
+        user = User.objects.create(username="user")
+        classification = Classification.objects.create(edit=edit, user=user, classification=0)
+        self.assertEqual(self._get_accuracy(user), (1, 1))
+
+        classification.delete()
+        self.assertEqual(self._get_accuracy(user), (0, 0))
+
+    def testRecountUsers(self):
+        edit = Edit.objects.create(id=1234, status=2, classification=0)
+        user = User.objects.create(username="user")
+        Classification.objects.create(edit=edit, user=user, classification=0)
+        UserAccuracy.objects.filter(user=user).update(total=10, correct=2)
+
+        self.assertEqual(UserAccuracyTracker().recount_users(), 1)
+        self.assertEqual(self._get_accuracy(user), (1, 1))
+        self.assertEqual(UserAccuracyTracker().recount_users(), 0)
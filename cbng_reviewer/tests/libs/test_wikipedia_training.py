@@ -0,0 +1,154 @@
+from dataclasses import replace
+from datetime import datetime
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from cbng_reviewer.libs.models.edit_set import WpEdit, WpRevision
+from cbng_reviewer.libs.wikipedia.training import WikipediaTraining, _LookupPool
+from cbng_reviewer.models import Edit
+
+
+@patch.object(WikipediaTraining, "get_page_recent_activity", return_value=(5, 1))
+@patch.object(WikipediaTraining, "get_user_warning_count", return_value=2)
+@patch.object(WikipediaTraining, "_get_user_distinct_pages_count", return_value=3)
+@patch.object(WikipediaTraining, "get_user_edit_count", return_value=6)
+@patch.object(WikipediaTraining, "get_user_registration_time", return_value=datetime(2020, 1, 1))
+@patch.object(WikipediaTraining, "get_page_creation_metadata", return_value=(datetime(2010, 1, 1), "Creator", 1000))
+@patch.object(WikipediaTraining, "get_edit_metadata", return_value=("Example", "main"))
+class WikipediaTrainingBuilderTestCase(TestCase):
+    def setUp(self):
+        self.current_revision = WpRevision(
+            timestamp=datetime(2025, 7, 15), user="Example User", comment="Hello", text="text", revision_id=1234
+        )
+        self.previous_revision = WpRevision(
+            timestamp=datetime(2025, 7, 14), user="Previous User", text="old", revision_id=1234
+        )
+
+    def testBuildWpEdit(self, *mocks):
+        with patch.object(
+            WikipediaTraining, "get_page_revisions", return_value=(self.current_revision, self.previous_revision)
+        ):
+            wp_edit = WikipediaTraining().build_wp_edit(Edit(id=1234))
+
+        self.assertEqual(
+            wp_edit,
+            WpEdit(
+                edit_id=1234,
+                title="Example",
+                namespace="main",
+                comment="Hello",
+                user="Example User",
+                creator="Creator",
+                user_edit_count=6,
+                user_distinct_pages=3,
+                user_warns=2,
+                prev_user="Previous User",
+                user_reg_time=datetime(2020, 1, 1),
+                page_made_time=datetime(2010, 1, 1),
+                num_recent_edits=5,
+                num_recent_reversions=1,
+                current=self.current_revision,
+                previous=self.previous_revision,
+            ),
+        )
+
+    def testBuildWpEditPageCreationFromReplica(self, mock_edit_metadata, mock_creation_metadata, *mocks):
+        mock_creation_metadata.return_value = (datetime(2010, 1, 1), "Creator", 1234)
+        with patch.object(WikipediaTraining, "get_page_revisions", return_value=(self.current_revision, WpRevision())):
+            wp_edit = WikipediaTraining().build_wp_edit(Edit(id=1234))
+        self.assertTrue(wp_edit.current.is_creation)
+
+        # The replica wins over the parent id
+        mock_creation_metadata.return_value = (datetime(2010, 1, 1), "Creator", 1000)
+        creation_revision = replace(self.current_revision, is_creation=True)
+        with patch.object(WikipediaTraining, "get_page_revisions", return_value=(creation_revision, WpRevision())):
+            wp_edit = WikipediaTraining().build_wp_edit(Edit(id=1234))
+        self.assertFalse(wp_edit.current.is_creation)
+
+    def testBuildWpEditMissingRevision(self, *mocks):
+        with patch.object(WikipediaTraining, "get_page_revisions", return_value=(WpRevision(), WpRevision())):
+            wp_edit = WikipediaTraining().build_wp_edit(Edit(id=1234))
+
+        self.assertEqual(
+            wp_edit,
+            WpEdit(
+                edit_id=1234, title="Example", namespace="main", creator="Creator", page_made_time=datetime(2010, 1, 1)
+            ),
+        )
+
+
+class WikipediaTrainingMetadataTestCase(TestCase):
+    @patch("cbng_reviewer.libs.wikipedia.training.connections")
+    def testLookupPoolReusesReplicaConnection(self, mock_connections):
+        with _LookupPool(max_workers=1) as lookup_pool:
+            futures = [lookup_pool.submit(lambda value: value * 2, value) for value in (1, 21)]
+            self.assertEqual([future.result() for future in futures], [2, 42])
+            mock_connections.__getitem__.return_value.close.assert_not_called()
+
+        mock_connections.__getitem__.assert_called_with("replica")
+        mock_connections.__getitem__.return_value.close.assert_called_once()
+
+    @patch("requests.Session.get")
+    def testGetEditsMetadataBatched(self, mock_get):
+        mock_get.return_value.json.side_effect = [
+            {
+                "query": {
+                    "badrevids": {"3": {"revid": 3}},
+                    "pages": {
+                        "10": {"pageid": 10, "ns": 0, "title": "Example", "revisions": [{"revid": 1}, {"revid": 2}]},
+                        "20": {"pageid": 20, "ns": 2, "title": "User:Example", "revisions": [{"revid": 4}]},
+                    },
+                }
+            },
+            {"query": {"pages": {"30": {"pageid": 30, "ns": 0, "title": "Other", "revisions": [{"revid": 5}]}}}},
+        ]
+
+        edits_metadata = WikipediaTraining().get_edits_metadata([1, 2, 3, 4, 5], batch_size=4)
+        self.assertEqual(
+            edits_metadata,
+            {
+                1: ("Example", "main"),
+                2: ("Example", "main"),
+                3: (None, None),
+                4: ("User:Example", "user"),
+                5: ("Other", "main"),
+            },
+        )
+        self.assertEqual([c.kwargs["params"]["revids"] for c in mock_get.call_args_list], ["1|2|3|4", "5"])
+
+    @patch.object(WikipediaTraining, "get_edit_metadata")
+    @patch.object(WikipediaTraining, "get_page_revisions", return_value=(WpRevision(), WpRevision()))
+    @patch.object(WikipediaTraining, "get_page_creation_metadata", return_value=(None, None, None))
+    def testBuildWpEditUsesPrefetchedMetadata(self, mock_creation_metadata, mock_page_revisions, mock_edit_metadata):
+        wp_edit = WikipediaTraining().build_wp_edit(Edit(id=1234), ("Example", "main"))
+        self.assertEqual((wp_edit.title, wp_edit.namespace), ("Example", "main"))
+        mock_edit_metadata.assert_not_called()
+
+    @patch("requests.Session.get")
+    def testGetPageRevisionsCreation(self, mock_get):
+        mock_get.return_value.json.return_value = {
+            "query": {
+                "pages": {
+                    "10": {
+                        "pageid": 10,
+                        "ns": 0,
+                        "title": "Example",
+                        "revisions": [
+                            {
+                                "revid": 1234,
+                                "parentid": 0,
+                                "user": "Example User",
+                                "timestamp": "2025-07-15T00:00:00Z",
+                                "slots": {"main": {"*": "text"}},
+                            }
+                        ],
+                    }
+                }
+            }
+        }
+
+        current, previous = WikipediaTraining().get_page_revisions("Example", 1234)
+        self.assertTrue(current.is_creation)
+        self.assertFalse(previous.has_complete_training_data)
+        self.assertEqual(mock_get.call_count, 1)
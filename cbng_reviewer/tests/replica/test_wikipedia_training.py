@@ -10,15 +10,21 @@ class WikipediaTrainingTestCase(WikipediaReplicaTransactionTestCase):
     # Database based
     def testGetPageCreationMetadata(self):
         wikipedia_training = WikipediaTraining()
-        created_at, created_by = wikipedia_training.get_page_creation_metadata("User:ClueBot NG", "user")
+        created_at, created_by, first_revision_id = wikipedia_training.get_page_creation_metadata(
+            "User:ClueBot NG", "user"
+        )
         self.assertEqual(created_at, datetime(2010, 10, 20, 17, 3, 30))
         self.assertEqual(created_by, "NaomiAmethyst")
+        self.assertEqual(first_revision_id, 391868471)
 
     def testGetMissingPageCreationMetadata(self):
         wikipedia_training = WikipediaTraining()
-        created_at, created_by = wikipedia_training.get_page_creation_metadata("Wibble Wobble", "main")
+        created_at, created_by, first_revision_id = wikipedia_training.get_page_creation_metadata(
+            "Wibble Wobble", "main"
+        )
         self.assertIsNone(created_at)
         self.assertIsNone(created_by)
+        self.assertIsNone(first_revision_id)
 
     @load_replica_sql("page_recent_edit_count")
     def testGetPageRecentEditCount(self):
@@ -36,6 +42,15 @@ class WikipediaTrainingTestCase(WikipediaReplicaTransactionTestCase):
         )
         self.assertEqual(recent_edit_count, 1)
 
+    @load_replica_sql("page_recent_revert_count")
+    def testGetPageRecentActivity(self):
+        wikipedia_training = WikipediaTraining()
+        recent_edit_count, recent_revert_count = wikipedia_training.get_page_recent_activity(
+            "Juicy Juggles", "main", datetime(2024, 7, 15)
+        )
+        self.assertEqual(recent_edit_count, 5)
+        self.assertEqual(recent_revert_count, 1)
+
     @load_replica_sql("user_edit_count")
     def testGetUserEditCount(self):
         wikipedia_training = WikipediaTraining()
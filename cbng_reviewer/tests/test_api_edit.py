@@ -1,7 +1,7 @@
 from django.test import TestCase
 
 from cbng_reviewer.libs.edit_set.dumper import EditSetDumper
-from cbng_reviewer.models import Edit, TrainingData, CurrentRevision, PreviousRevision
+from cbng_reviewer.models import Edit, TrainingData, CurrentRevision, PreviousRevision, User
 
 
 class ApiEditTestCase(TestCase):
@@ -108,3 +108,18 @@ class ApiEditTestCase(TestCase):
         r = self.client.get(f"/api/v1/edit/{edit.id}/dump-wpedit/")
         self.assertEqual(r.status_code, 200)
         self.assertEqual(r.text, wp_edit)
+
+    def testRenderDiff(self):
+        edit = Edit.objects.create(id=1234)
+        CurrentRevision.objects.create(edit=edit, timestamp=1, is_minor=False, is_creation=True, text=b"New Text")
+
+        r = self.client.get(f"/api/v1/edit/{edit.id}/diff/")
+        self.assertEqual(r.status_code, 302)
+
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True))
+        r = self.client.get(f"/api/v1/edit/{edit.id}/diff/")
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("<ins>New Text</ins>", r.content.decode("utf-8"))
+
+        r = self.client.get("/api/v1/edit/4321/diff/")
+        self.assertEqual(r.status_code, 404)
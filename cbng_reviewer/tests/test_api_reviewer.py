@@ -1,5 +1,10 @@
+from datetime import timedelta
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils import timezone
+from freezegun import freeze_time
 
 from cbng_reviewer.models import Edit, User, Classification, EditGroup
 
@@ -121,6 +126,84 @@ class ApiReviewerTestCase(TestCase):
         data = r.json()
         self.assertEqual(data["edit_id"], edit_2.id)
 
+    def testNextEditsReservesInPriorityOrder(self):
+        edit_group_1 = EditGroup.objects.create(name="Group 1", weight=20)
+        edit_1 = Edit.objects.create(id=1234)
+        edit_1.groups.add(edit_group_1)
+
+        edit_group_2 = EditGroup.objects.create(name="Group 2", weight=15)
+        edit_2 = Edit.objects.create(id=4321)
+        edit_2.groups.add(edit_group_2)
+
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        r = self.client.get("/api/v1/reviewer/next-edits/?count=5")
+        self.assertEqual(r.status_code, 200)
+        data = r.json()
+        self.assertEqual(data["edit_ids"], [edit_1.id, edit_2.id])
+        self.assertEqual(data["expires_in"], 300)
+
+        # Re-fetching hands back the same reservations
+        r = self.client.get("/api/v1/reviewer/next-edits/?count=1")
+        self.assertEqual(r.json()["edit_ids"], [edit_1.id])
+
+    @patch("cbng_reviewer.tasks.warm_edit_cache.apply_async")
+    def testNextEditsWarmsEditCache(self, mock_apply_async):
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(EditGroup.objects.create(name="Group 1", weight=20))
+
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.get("/api/v1/reviewer/next-edits/")
+        self.assertEqual(r.json()["edit_ids"], [edit.id])
+        mock_apply_async.assert_called_once_with([[edit.id]])
+
+    def testNextEditsInvalidCount(self):
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        r = self.client.get("/api/v1/reviewer/next-edits/?count=abc")
+        self.assertEqual(r.status_code, 400)
+
+    def testNextEditsNoPendingEdits(self):
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        r = self.client.get("/api/v1/reviewer/next-edits/")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"edit_ids": [], "message": "No Pending Edit Found"})
+
+    def testReservedEditNotServedToOtherReviewers(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(edit_group)
+
+        self.client.force_login(user=User.objects.create(username="test-user-1", is_reviewer=True, is_admin=True))
+        r = self.client.get("/api/v1/reviewer/next-edits/")
+        self.assertEqual(r.json()["edit_ids"], [edit.id])
+
+        self.client.force_login(user=User.objects.create(username="test-user-2", is_reviewer=True, is_admin=True))
+        r = self.client.get("/api/v1/reviewer/next-edit/")
+        self.assertIsNone(r.json()["edit_id"])
+
+        # Once the reservation has expired the edit is back in the pool
+        with freeze_time(timezone.now() + timedelta(seconds=301)):
+            r = self.client.get("/api/v1/reviewer/next-edit/")
+            self.assertEqual(r.json()["edit_id"], edit.id)
+
+    def testClassificationReleasesReservation(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit = Edit.objects.create(id=1234)
+        edit.groups.add(edit_group)
+
+        self.client.force_login(user=User.objects.create(username="test-user-1", is_reviewer=True, is_admin=True))
+        self.client.get("/api/v1/reviewer/next-edits/")
+        r = self.client.post(
+            "/api/v1/reviewer/classify-edit/",
+            content_type="application/json",
+            data={"edit_id": edit.id, "classification": 0},
+        )
+        self.assertEqual(r.status_code, 200)
+
+        self.client.force_login(user=User.objects.create(username="test-user-2", is_reviewer=True, is_admin=True))
+        r = self.client.get("/api/v1/reviewer/next-edit/")
+        self.assertEqual(r.json()["edit_id"], edit.id)
+
     def testClassifyEditNoConfirmation(self):
         edit_group = EditGroup.objects.create(name="Group 1", weight=20)
         edit_1 = Edit.objects.create(id=1234, classification=1)
@@ -243,3 +326,93 @@ class ApiReviewerTestCase(TestCase):
             },
         )
         self.assertEqual(r.status_code, 200)
+
+    def testClassifyEditAndNext(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit_1 = Edit.objects.create(id=1234)
+        edit_1.groups.add(edit_group)
+        edit_2 = Edit.objects.create(id=4321)
+        edit_2.groups.add(edit_group)
+
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        r = self.client.post(
+            "/api/v1/reviewer/classify-edit-and-next/",
+            content_type="application/json",
+            data={"edit_id": edit_1.id, "classification": 0},
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"message": "Review stored", "next_edit_id": edit_2.id})
+        self.assertTrue(Classification.objects.filter(edit=edit_1, classification=0).exists())
+
+        r = self.client.post(
+            "/api/v1/reviewer/classify-edit-and-next/",
+            content_type="application/json",
+            data={"edit_id": edit_2.id, "classification": 1},
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"message": "Review stored", "next_edit_id": None})
+
+    def testClassifyEditAndNextNeedingConfirmation(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit_1 = Edit.objects.create(id=1234, classification=1)
+        edit_1.groups.add(edit_group)
+
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        r = self.client.post(
+            "/api/v1/reviewer/classify-edit-and-next/",
+            content_type="application/json",
+            data={"edit_id": edit_1.id, "classification": 0},
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"require_confirmation": True})
+        self.assertFalse(Classification.objects.filter(edit=edit_1).exists())
+
+    def testClassifyEditAndNextBadClassification(self):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        edit_1 = Edit.objects.create(id=1234)
+        edit_1.groups.add(edit_group)
+
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True, is_admin=True))
+        r = self.client.post(
+            "/api/v1/reviewer/classify-edit-and-next/",
+            content_type="application/json",
+            data={"edit_id": edit_1.id, "classification": 5000},
+        )
+        self.assertEqual(r.status_code, 400)
+
+    def testBulkClassifyRequiresAdmin(self):
+        self.client.force_login(user=User.objects.create(username="test-user", is_reviewer=True))
+        r = self.client.post("/api/v1/reviewer/bulk-classify/", content_type="application/json", data=[])
+        self.assertEqual(r.status_code, 403)
+
+    def testBulkClassify(self):
+        edit_1 = Edit.objects.create(id=1234)
+        edit_2 = Edit.objects.create(id=4321)
+        bot = User.objects.create(username="Bot - Test", is_bot=True)
+        Classification.objects.create(edit=edit_1, user=bot, classification=1)
+
+        self.client.force_login(user=User.objects.create(username="test-admin", is_admin=True))
+        r = self.client.post(
+            "/api/v1/reviewer/bulk-classify/",
+            content_type="application/json",
+            data=[
+                {"edit_id": edit_1.id, "username": bot.username, "classification": 1},
+                {"edit_id": edit_2.id, "username": bot.username, "classification": 0, "comment": "Core score: 0.99"},
+            ],
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), {"stored": 1, "skipped": 1})
+        self.assertEqual(Classification.objects.get(edit=edit_2, user=bot).comment, "Core score: 0.99")
+
+    def testBulkClassifyUnknownUser(self):
+        edit = Edit.objects.create(id=1234)
+
+        self.client.force_login(user=User.objects.create(username="test-admin", is_admin=True))
+        r = self.client.post(
+            "/api/v1/reviewer/bulk-classify/",
+            content_type="application/json",
+            data=[{"edit_id": edit.id, "username": "Bot - Missing", "classification": 1}],
+        )
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["usernames"], ["Bot - Missing"])
+        self.assertFalse(Classification.objects.exists())
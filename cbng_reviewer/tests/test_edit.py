@@ -1,7 +1,20 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 
+from cbng_reviewer.libs.edit_set.utils import repair_classification_counters, bulk_update_edit_classification
+from cbng_reviewer.libs.irc import IrcRelay
 from cbng_reviewer.libs.models.message import Message
-from cbng_reviewer.models import Edit, User, Classification, TrainingData, CurrentRevision, PreviousRevision
+from cbng_reviewer.models import (
+    Edit,
+    User,
+    Classification,
+    TrainingData,
+    CurrentRevision,
+    PreviousRevision,
+    EditGroup,
+    QueuedEdit,
+)
 
 TRAINING_DATA_FIELDS = {
     "timestamp": 0,
@@ -202,3 +215,105 @@ class EditClassificationTestCase(TestCase):
         edit.update_classification()
         self.assertEqual(edit.status, 2)
         self.assertEqual(edit.classification, 0)
+
+
+class EditClassificationCounterTestCase(TestCase):
+    def testCountersFollowClassifications(self):
+        edit = Edit.objects.create(id=1234)
+        bot = User.objects.create(username="test-bot", is_bot=True)
+        Classification.objects.create(edit=edit, user=User.objects.create(username="test-user-1"), classification=0)
+        Classification.objects.create(edit=edit, user=User.objects.create(username="test-user-2"), classification=1)
+        bot_classification = Classification.objects.create(edit=edit, user=bot, classification=0)
+
+        edit.refresh_from_db()
+        self.assertEqual(edit.vandalism_classifications, 2)
+        self.assertEqual(edit.constructive_classifications, 1)
+        self.assertEqual(edit.skipped_classifications, 0)
+        self.assertEqual(edit.human_classifications, 2)
+
+        bot_classification.classification = 2
+        bot_classification.save()
+        edit.refresh_from_db()
+        self.assertEqual(edit.vandalism_classifications, 1)
+        self.assertEqual(edit.skipped_classifications, 1)
+
+        Classification.objects.filter(edit=edit).delete()
+        edit.refresh_from_db()
+        self.assertEqual(edit.vandalism_classifications, 0)
+        self.assertEqual(edit.constructive_classifications, 0)
+        self.assertEqual(edit.skipped_classifications, 0)
+        self.assertEqual(edit.human_classifications, 0)
+
+    def testRepairCounters(self):
+        edit = Edit.objects.create(id=1234)
+        Edit.objects.create(id=4321)
+        Classification.objects.create(edit=edit, user=User.objects.create(username="test-user"), classification=0)
+        Edit.objects.filter(id=1234).update(vandalism_classifications=5, human_classifications=0)
+        Edit.objects.filter(id=4321).update(skipped_classifications=1)
+
+        self.assertEqual(repair_classification_counters(), 2)
+        self.assertEqual(repair_classification_counters(), 0)
+        edit.refresh_from_db()
+        self.assertEqual(edit.vandalism_classifications, 1)
+        self.assertEqual(edit.human_classifications, 1)
+        self.assertEqual(Edit.objects.get(id=4321).skipped_classifications, 0)
+
+
+class BulkEditClassificationTestCase(TestCase):
+    def _classify(self, edit: Edit, classifications):
+        for i, classification in enumerate(classifications):
+            Classification.objects.create(
+                edit=edit, user=User.objects.get_or_create(username=f"test-user-{i}")[0], classification=classification
+            )
+
+    @patch.object(IrcRelay, "queue_message")
+    def testMatchesPerEditRules(self, mock_queue_message):
+        edit_group = EditGroup.objects.create(name="Group 1", weight=20)
+        scenarios = {
+            1: [],
+            2: [0],
+            3: [0, 0],
+            4: [1, 1, 1, 0],
+            5: [0, 1],
+            6: [2, 2, 2, 0],
+        }
+        for edit_id, classifications in scenarios.items():
+            edit = Edit.objects.create(id=edit_id)
+            edit.groups.add(edit_group)
+            self._classify(edit, classifications)
+        Edit.objects.create(id=7, status=2, classification=1)
+
+        changed_edits = bulk_update_edit_classification()
+        self.assertEqual({edit.id for edit in changed_edits}, {2, 3, 4, 5, 6})
+
+        results = {edit.id: (edit.status, edit.classification) for edit in Edit.objects.all()}
+        self.assertEqual(
+            results, {1: (0, None), 2: (1, None), 3: (2, 0), 4: (2, 1), 5: (1, None), 6: (2, 2), 7: (2, 1)}
+        )
+        self.assertEqual(Edit.objects.get(id=4).number_of_agreeing_reviewers, 3)
+
+        # Completed edits leave the queue & are announced in one message
+        self.assertEqual(set(QueuedEdit.objects.values_list("edit_id", flat=True)), {1, 2, 5})
+        mock_queue_message.assert_called_once()
+        self.assertIn("3 edits classified", mock_queue_message.call_args[0][0].body)
+
+    @patch.object(IrcRelay, "queue_message")
+    def testUpdatesInChunks(self, mock_queue_message):
+        for edit_id in range(1, 6):
+            self._classify(Edit.objects.create(id=edit_id), [0, 0])
+
+        changed_edits = bulk_update_edit_classification(batch_size=2)
+        self.assertEqual([edit.id for edit in changed_edits], [1, 2, 3, 4, 5])
+        # Each chunk of 2, 2 & 1 edits is committed & announced on its own
+        self.assertEqual(mock_queue_message.call_count, 3)
+        self.assertEqual(set(Edit.objects.values_list("status", flat=True)), {2})
+
+    @patch.object(IrcRelay, "queue_message")
+    def testForceIncludesCompletedEdits(self, mock_queue_message):
+        edit = Edit.objects.create(id=1234, status=2, classification=0)
+        self._classify(edit, [1])
+
+        self.assertEqual(bulk_update_edit_classification(), [])
+        self.assertEqual([edit.id for edit in bulk_update_edit_classification(force=True)], [1234])
+        self.assertEqual(Edit.objects.get(id=1234).status, 1)
+        mock_queue_message.assert_not_called()
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from cbng_reviewer import tasks
+from cbng_reviewer.hooks import (
+    import_training_data_for_created_edits,
+    notify_irc_about_created_edits,
+    update_edit_classification_from_classified_edits,
+)
+from cbng_reviewer.libs.debounce import EditClassificationDebouncer
+from cbng_reviewer.libs.irc import IrcRelay
+from cbng_reviewer.models import Edit
+
+
+class LifecycleEventsTestCase(TestCase):
+    @patch.object(tasks.import_training_data_for_edits, "apply_async")
+    @patch.object(tasks.import_training_data, "apply_async")
+    def testImportTrainingDataBatched(self, mock_import_training_data, mock_import_training_data_for_edits):
+        with self.captureOnCommitCallbacks(execute=True):
+            import_training_data_for_created_edits(edit_ids=[1])
+            mock_import_training_data.assert_not_called()
+        mock_import_training_data.assert_called_once_with([1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_training_data_for_created_edits(edit_ids=[1, 2, 3])
+        mock_import_training_data_for_edits.assert_called_once_with([[1, 2, 3]])
+
+    @patch.object(IrcRelay, "queue_message")
+    def testNotifyIrcBatched(self, mock_queue_message):
+        for edit_id in [1, 2, 3]:
+            Edit.objects.create(id=edit_id)
+
+        notify_irc_about_created_edits(edit_ids=[1, 2, 3])
+        mock_queue_message.assert_called_once()
+        self.assertIn("3 edits added", mock_queue_message.call_args[0][0].body)
+
+    @patch.object(IrcRelay, "queue_message")
+    def testNotifyIrcSkipsReviewedEdits(self, mock_queue_message):
+        Edit.objects.create(id=1, status=2, classification=0)
+
+        notify_irc_about_created_edits(edit_ids=[1])
+        mock_queue_message.assert_not_called()
+
+    @patch.object(EditClassificationDebouncer, "schedule_many")
+    @patch("cbng_reviewer.libs.debounce.get_redis_client")
+    def testClassifiedEditsDebounced(self, mock_get_redis_client, mock_schedule_many):
+        update_edit_classification_from_classified_edits(edit_ids=[1, 2])
+        mock_schedule_many.assert_called_once_with([1, 2])
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import requests
+from django.test import TestCase
+
+from cbng_reviewer import tasks
+from cbng_reviewer.libs.debounce import EditClassificationDebouncer
+from cbng_reviewer.libs.models.edit_set import WpEdit
+from cbng_reviewer.libs.wikipedia.reader import WikipediaReader
+from cbng_reviewer.libs.wikipedia.training import WikipediaTraining
+from cbng_reviewer.models import Edit, User, Classification
+
+
+class UpdateEditClassificationTaskTestCase(TestCase):
+    def testUpdatesEdit(self):
+        edit = Edit.objects.create(id=1234)
+        Classification.objects.create(edit=edit, user=User.objects.create(username="test-user"), classification=0)
+
+        tasks.update_edit_classification(edit.id)
+        self.assertEqual(Edit.objects.get(id=1234).status, 1)
+
+    def testMissingEdit(self):
+        with self.assertRaises(Edit.DoesNotExist):
+            tasks.update_edit_classification(1234)
+
+    @patch.object(EditClassificationDebouncer, "schedule")
+    def testDefersLockedEdit(self, mock_schedule):
+        edit = Edit.objects.create(id=1234)
+        Classification.objects.create(edit=edit, user=User.objects.create(username="test-user"), classification=0)
+
+        # Simulate another worker holding the row lock, `SKIP LOCKED` returns nothing
+        with patch.object(Edit.objects, "select_for_update", return_value=Edit.objects.none()):
+            tasks.update_edit_classification(edit.id)
+
+        mock_schedule.assert_called_once_with(1234)
+        self.assertEqual(Edit.objects.get(id=1234).status, 0)
+
+
+class ImportTrainingDataForEditsTaskTestCase(TestCase):
+    @patch.object(WikipediaReader, "has_revision_been_deleted", return_value=False)
+    @patch.object(WikipediaTraining, "build_wp_edit", return_value=WpEdit())
+    @patch.object(WikipediaTraining, "get_edits_metadata")
+    def testMetadataFetchedOnce(self, mock_get_edits_metadata, mock_build_wp_edit, mock_has_revision_been_deleted):
+        Edit.objects.create(id=1)
+        Edit.objects.create(id=2)
+        Edit.objects.create(id=3, has_training_data=True)
+        mock_get_edits_metadata.return_value = {1: ("Page 1", "main"), 2: ("Page 2", "main")}
+
+        tasks.import_training_data_for_edits([1, 2, 3])
+        mock_get_edits_metadata.assert_called_once_with([1, 2])
+        self.assertEqual(
+            sorted((c.args[0].id, c.args[1]) for c in mock_build_wp_edit.call_args_list),
+            [(1, ("Page 1", "main")), (2, ("Page 2", "main"))],
+        )
+
+    @patch.object(WikipediaReader, "has_revision_been_deleted", return_value=False)
+    @patch.object(WikipediaTraining, "build_wp_edit")
+    @patch.object(WikipediaTraining, "get_edits_metadata", return_value={1: (None, None), 2: (None, None)})
+    def testLookupFailureSkipsEdit(self, mock_get_edits_metadata, mock_build_wp_edit, mock_has_revision_been_deleted):
+        Edit.objects.create(id=1)
+        Edit.objects.create(id=2)
+        mock_build_wp_edit.side_effect = [requests.ConnectionError(), WpEdit()]
+
+        tasks.import_training_data_for_edits([1, 2])
+        self.assertEqual(mock_build_wp_edit.call_count, 2)
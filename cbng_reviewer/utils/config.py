@@ -59,6 +59,7 @@ def load_config(base_dir: Path, in_test: bool) -> Dict[str, Any]:
             "admin_only": os.environ.get("CBNG_ADMIN_ONLY") == "true",
             "enable_irc_messaging": os.environ.get("CBNG_ENABLE_IRC_MESSAGING") == "true",
             "enable_user_messaging": os.environ.get("CBNG_ENABLE_USER_MESSAGING") == "true",
+            "enable_edit_event_stream": os.environ.get("CBNG_ENABLE_EDIT_EVENT_STREAM") != "false",
         },
         "irc_relay": {
             "host": os.environ.get("IRC_RELAY_HOST", "irc-relay"),
@@ -81,6 +82,7 @@ def load_config(base_dir: Path, in_test: bool) -> Dict[str, Any]:
             "host": os.environ.get("REDIS_HOST", "redis.tool-cluebotng-review.svc.tools.local"),
             "port": 6379,
             "db": 0,
+            "edit_cache_db": int(os.environ.get("REDIS_EDIT_CACHE_DB", 1)),
             "password": os.environ.get("REDIS_PASSWORD"),
         },
     }
@@ -90,7 +92,11 @@ def load_config(base_dir: Path, in_test: bool) -> Dict[str, Any]:
         cfg["mysql"]["default"] |= {"host": "127.0.0.1", "port": 3306}
         cfg["mysql"]["replica"] |= {"host": "127.0.0.1", "port": 3306}
         cfg["redis"] |= {"host": "127.0.0.1", "port": 6379}
-        cfg["cbng"] |= {"enable_irc_messaging": False, "enable_user_messaging": False}
+        cfg["cbng"] |= {
+            "enable_irc_messaging": False,
+            "enable_user_messaging": False,
+            "enable_edit_event_stream": False,
+        }
 
     else:
         # Load local settings if the file exists